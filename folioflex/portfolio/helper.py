@@ -6,15 +6,24 @@ module.
 
 """
 
+import hashlib
+import json
 from datetime import date, datetime, timedelta
-from typing import Any, Dict, Optional, Union
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 import pandas_market_calendars as mcal
 from dateutil.parser import parse
+from pyxirr import xirr
 
 from folioflex.utils import config_helper, custom_logger
 
+if TYPE_CHECKING:
+    from pandas.io.formats.style import Styler
+
 logger = custom_logger.setup_logging(__name__)
 
 
@@ -29,7 +38,8 @@ def check_stock_dates(
 
     This function checks that the transaction dates are valid stock market
     dates. If the dates are not valid, then the dates will be fixed to the
-    previous valid date.
+    previous valid date. All of the dates are checked and fixed at once with
+    a binary search of the stock market dates.
 
     Note:
         Currently using date as the check, but may move to datetime,
@@ -54,6 +64,8 @@ def check_stock_dates(
                 list of dates that are not valid
             fix_tx_df : DataFrame
                 transactions dataframe with fixed dates if fix=True
+            fix_dt : dict
+                the fixed date of each invalid date if fix=True
 
     """
     if not isinstance(tx_df, pd.DataFrame) and not isinstance(tx_df, (str, date)):
@@ -80,48 +92,53 @@ def check_stock_dates(
     # date checks
     tx_df_min = tx_df["date"].min() - timedelta(days=7)
     tx_df_max = tx_df["date"].max()
-    stock_dates = mcal.get_calendar("NYSE").schedule(
-        start_date=tx_df_min, end_date=tx_df_max
-    )
-    stock_dates["market_open"] = convert_date_to_timezone(
-        stock_dates["market_open"], timezone
-    )
-    stock_dates["market_close"] = convert_date_to_timezone(
-        stock_dates["market_close"], timezone
+    stock_dates = get_trading_calendar().market_dates(
+        start=tx_df_min, end=tx_df_max, timezone=timezone
     )
-    stock_dates = pd.to_datetime(stock_dates["market_open"]).dt.date
+    stock_days = stock_dates.values.astype("datetime64[D]")
 
     # change datetime to date
     if isinstance(tx_df["date"].iloc[0], datetime):
         tx_df["date"] = pd.to_datetime(tx_df["date"]).dt.date
     fix_tx_df = tx_df.copy()
 
-    # Get dates which are not within market hours
-    invalid_dt = fix_tx_df["date"][~fix_tx_df["date"].isin(stock_dates)]
-    invalid_dt_unique = list(invalid_dt.unique())
-
-    if fix and len(invalid_dt_unique) > 0:
-        fix_dt_unique = []
-        for i in invalid_dt_unique:
-            fix_dt = stock_dates[stock_dates < i].iloc[-1]
-            fix_dt_unique.append(fix_dt)
-            fix_tx_df.loc[fix_tx_df["date"] == i, "date"] = fix_dt
+    # Get dates which are not within market hours, the position is the
+    # previous valid date of each date
+    tx_days = pd.to_datetime(fix_tx_df["date"]).values.astype("datetime64[D]")
+    position = np.searchsorted(stock_days, tx_days, side="left")
+    is_valid = stock_days[np.minimum(position, len(stock_days) - 1)] == tx_days
+    invalid_days = pd.unique(tx_days[~is_valid])
+    fix_dt = {}
+
+    if fix and len(invalid_days) > 0:
+        fix_days = stock_days[position[~is_valid] - 1]
+        fix_tx_df.loc[~is_valid, "date"] = pd.DatetimeIndex(fix_days).date
+        fix_dt = dict(
+            zip(
+                pd.DatetimeIndex(invalid_days).date,
+                pd.DatetimeIndex(
+                    stock_days[np.searchsorted(stock_days, invalid_days) - 1]
+                ).date,
+                strict=True,
+            )
+        )
         if warning:
+            first_invalid_dt = next(iter(fix_dt))
             logger.warning(
-                f"{len(invalid_dt)} transaction(s) dates were fixed to previous "
-                f"valid date such as {invalid_dt_unique[0]} updated "
-                f"to {fix_dt_unique[0]} \n"
+                f"{(~is_valid).sum()} transaction(s) dates were fixed to previous "
+                f"valid date such as {first_invalid_dt} updated "
+                f"to {fix_dt[first_invalid_dt]} \n"
             )
+        is_valid[:] = True
 
     # Checking that dates were fixed
-    invalid_dt = fix_tx_df["date"][~fix_tx_df["date"].isin(stock_dates)].to_list()
-    invalid_dt = [datetime.strftime(i, "%Y-%m-%d") for i in invalid_dt]
+    invalid_dt = pd.DatetimeIndex(tx_days[~is_valid]).strftime("%Y-%m-%d").to_list()
     if len(invalid_dt) > 0:
         logger.warning(
             f"{len(invalid_dt)} transaction(s) dates were done outside of stock market "
             f"dates such as {invalid_dt[0]} \n"
         )
-    return {"invalid_dt": invalid_dt, "fix_tx_df": fix_tx_df}
+    return {"invalid_dt": invalid_dt, "fix_tx_df": fix_tx_df, "fix_dt": fix_dt}
 
 
 def convert_date_to_timezone(
@@ -159,17 +176,15 @@ def convert_date_to_timezone(
 
 def most_recent_stock_date() -> date:
     """Get the most recent stock date."""
-    stock_dates = mcal.get_calendar("NYSE").schedule(
-        start_date=date.today() - timedelta(days=7), end_date=date.today()
-    )
-    return stock_dates["market_open"].max().date()
+    return get_trading_calendar().previous_date(date.today()).date()
 
 
 def prettify_dataframe(dataframe: pd.DataFrame) -> pd.DataFrame:
     """
     Prettify a dataframe with formatting.
 
-    Changes columns with pct to have percentage formatting.
+    Changes columns with pct to have percentage formatting. The dataframe is
+    not changed, so the numeric values can still be used after formatting.
 
     Parameters
     ----------
@@ -185,11 +200,104 @@ def prettify_dataframe(dataframe: pd.DataFrame) -> pd.DataFrame:
     if not isinstance(dataframe, pd.DataFrame):
         raise ValueError("dataframe must be a pandas DataFrame")
 
+    dataframe = dataframe.copy()
     pct_cols = dataframe.filter(like="pct").columns
     for pct_col in pct_cols:
-        dataframe[pct_col] = dataframe[pct_col].apply(
-            lambda x: "{:.2%}".format(x) if x is not None else "NaN"
-        )
+        dataframe[pct_col] = format_pct(dataframe[pct_col])
+
+    return dataframe
+
+
+def format_pct(series: pd.Series) -> pd.Series:
+    """
+    Format a series as percentages.
+
+    The values are formatted together rather than one at a time, which gives
+    the same strings as `"{:.2%}".format` with None shown as "NaN".
+
+    Parameters
+    ----------
+    series : Series
+        series of fractions to format
+
+    Returns
+    -------
+    Series
+        series of percentage strings
+
+    """
+    values = series.to_numpy(dtype=object)
+    numbers = pd.to_numeric(series, errors="coerce").to_numpy(dtype="float64")
+    formatted = np.char.mod("%.2f%%", numbers * 100).astype(object)
+    formatted[np.equal(values, None)] = "NaN"
+
+    return pd.Series(formatted, index=series.index, name=series.name)
+
+
+def style_dataframe(dataframe: pd.DataFrame) -> "Styler":
+    """
+    Style a dataframe for display.
+
+    The pct columns are formatted as percentages when the styler is rendered,
+    e.g. with `to_html`, so the dataframe keeps its numeric values.
+
+    Parameters
+    ----------
+    dataframe : DataFrame
+        dataframe to style
+
+    Returns
+    -------
+    Styler
+        styler of the dataframe
+
+    """
+    if not isinstance(dataframe, pd.DataFrame):
+        raise ValueError("dataframe must be a pandas DataFrame")
+
+    pct_cols = dataframe.filter(like="pct").columns
+    return dataframe.style.format("{:.2%}", subset=pct_cols, na_rep="NaN")
+
+
+def compact_dtypes(
+    dataframe: pd.DataFrame, float32_cols: Optional[list] = None
+) -> pd.DataFrame:
+    """
+    Convert a dataframe to compact dtypes.
+
+    String columns are converted to categories, dates with a time zone are
+    converted to datetime64 without a time zone and the float32 columns are
+    converted to float32.
+
+    Parameters
+    ----------
+    dataframe : DataFrame
+        dataframe to convert
+    float32_cols : list (optional)
+        columns to convert to float32, which are only converted if in the dataframe
+
+    Returns
+    -------
+    DataFrame
+        dataframe with compact dtypes
+
+    """
+    if not isinstance(dataframe, pd.DataFrame):
+        raise ValueError("dataframe must be a pandas DataFrame")
+    if float32_cols is None:
+        float32_cols = []
+
+    dataframe = dataframe.copy()
+    for col in dataframe.columns:
+        series = dataframe[col]
+        if pd.api.types.is_object_dtype(series) and (
+            pd.api.types.infer_dtype(series, skipna=True) == "string"
+        ):
+            dataframe[col] = series.astype("category")
+        elif isinstance(series.dtype, pd.DatetimeTZDtype):
+            dataframe[col] = series.dt.tz_localize(None)
+        elif col in float32_cols and pd.api.types.is_float_dtype(series):
+            dataframe[col] = series.astype("float32")
 
     return dataframe
 
@@ -240,3 +348,507 @@ def convert_lookback(lookback: Union[str, int, date]) -> int:
             f"lookback must be a string, int, or date and not {type(lookback)}"
         )
     return converted_lookback
+
+
+def hash_file(path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """
+    Get the content hash of a file.
+
+    Parameters
+    ----------
+    path : str
+        the path to the file
+    chunk_size : int (default is 1 MiB)
+        the number of bytes read at a time
+
+    Returns
+    -------
+    file_hash : str
+        the sha256 hash of the file
+
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha256.update(chunk)
+
+    return sha256.hexdigest()
+
+
+@lru_cache(maxsize=256)
+def hash_file_version(path: str, size: int, mtime: int) -> str:
+    """
+    Get the content hash of a version of a file.
+
+    The hash is cached by the size and modified time of the file, so
+    portfolios that read the same file share a single hash of it.
+
+    Parameters
+    ----------
+    path : str
+        the path to the file
+    size : int
+        the size of the file in bytes
+    mtime : int
+        the modified time of the file in nanoseconds
+
+    Returns
+    -------
+    file_hash : str
+        the sha256 hash of the file
+
+    """
+    return hash_file(path)
+
+
+def hash_options(options: Dict[str, Any]) -> str:
+    """
+    Get the hash of config options.
+
+    Parameters
+    ----------
+    options : dict
+        the config options to hash
+
+    Returns
+    -------
+    options_hash : str
+        the sha256 hash of the options
+
+    """
+    options_json = json.dumps(options, sort_keys=True, default=str)
+
+    return hashlib.sha256(options_json.encode()).hexdigest()
+
+
+def xirr_batch(
+    dates: np.ndarray,
+    amounts: np.ndarray,
+    lengths: np.ndarray,
+    guess: float = 0.1,
+    tol: float = 1e-12,
+    max_iter: int = 200,
+) -> np.ndarray:
+    """
+    Calculate the xirr of a batch of cash flow series at once.
+
+    The series are padded to the same length and every step of the solver is
+    done on all of the series at once:
+       - bracket: search outwards from the guess until the npv changes sign
+       - solve: newton iterations that fall back to bisection when the step
+         leaves the bracket, until all of the series converge
+
+    The rate r solves sum(amount / (1 + r) ** (days / 365)) = 0, which is the
+    same as `pyxirr.xirr`. The solver works on y = log(1 + r) and the cash flows
+    are scaled so the discount factors do not overflow.
+
+    The batched solver is only used on series whose cash flows change sign once
+    in date order, which have a single rate. Series that change sign more than
+    once can have several rates, so they use `pyxirr.xirr` to get the same rate,
+    as do series with an extreme rate (below -80% or above 1000%) where the npv
+    is too steep for the solvers to agree on whether there is a solution.
+
+    Parameters
+    ----------
+    dates : array
+        2d array of the cash flow dates (series x cash flows)
+    amounts : array
+        2d array of the cash flow amounts (series x cash flows)
+    lengths : array
+        the number of cash flows in each series, the rest is padding
+    guess : float (optional)
+        the initial guess of the rate
+    tol : float (optional)
+        the tolerance of the log rate
+    max_iter : int (optional)
+        the maximum number of iterations
+
+    Returns
+    -------
+    rates : array
+        the annual rate of each series, NaN when there is no solution (same as
+        None in `pyxirr.xirr`)
+
+    """
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    amounts = np.asarray(amounts, dtype="float64")
+    lengths = np.asarray(lengths)
+    rates = np.full(len(lengths), np.nan)
+    if len(lengths) == 0:
+        return rates
+
+    # years from the first cash flow of each series with padding removed
+    mask = np.arange(amounts.shape[1]) < lengths[:, None]
+    days = dates.astype("int64").astype("float64")
+    first_days = np.where(mask, days, np.inf).min(axis=1, keepdims=True)
+    years = np.where(mask, (days - first_days) / 365, 0.0)
+    amounts = np.where(mask, amounts, 0.0)
+    max_years = years.max(axis=1)
+
+    def npv(y: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the scaled npv and derivative of npv at log rate y."""
+        t = years[rows]
+        t_ref = np.where(y < 0, max_years[rows], 0.0)[:, None]
+        values = amounts[rows] * np.exp(-y[:, None] * (t - t_ref))
+        return values.sum(axis=1), -(values * (t - t_ref)).sum(axis=1)
+
+    # count the sign changes of the cash flows in date order
+    order = np.argsort(np.where(mask, years, np.inf), axis=1, kind="stable")
+    signs = np.sign(np.take_along_axis(amounts, order, axis=1))
+    last_signs = np.where(signs != 0, signs, np.nan)
+    last_signs = pd.DataFrame(last_signs).ffill(axis=1).to_numpy()
+    sign_changes = (last_signs[:, 1:] * last_signs[:, :-1] < 0).sum(axis=1)
+
+    # a rate only exists when there are positive and negative cash flows
+    rows = np.flatnonzero(sign_changes == 1)
+
+    # bracket the root by searching outwards from the guess
+    y_guess = np.log1p(guess)
+    lo = np.full(len(rows), y_guess)
+    hi = np.full(len(rows), y_guess)
+    with np.errstate(all="ignore"):
+        lo_value = npv(lo, rows)[0]
+        hi_value = lo_value.copy()
+        found = lo_value == 0
+        bracket = np.stack([lo, hi, lo_value])
+        width = 0.05
+        while width < 128 and not found.all():
+            for bound, bound_value, side in ((hi, hi_value, 1), (lo, lo_value, -1)):
+                search = np.flatnonzero(~found)
+                point = y_guess + side * width
+                value = npv(np.full(len(search), point), rows[search])[0]
+                change = np.sign(value) != np.sign(bound_value[search])
+                new = search[change]
+                bracket[0, new] = np.minimum(bound[new], point)
+                bracket[1, new] = np.maximum(bound[new], point)
+                bracket[2, new] = np.where(side == 1, bound_value[new], value[change])
+                found[new] = True
+                bound[search] = point
+                bound_value[search] = value
+            width *= 2
+    lo, hi, lo_value = bracket[:, found]
+    rows = rows[found]
+
+    # newton iterations kept inside the bracket
+    y = np.full(len(rows), y_guess).clip(lo, hi)
+    converged = np.zeros(len(rows), dtype=bool)
+    with np.errstate(all="ignore"):
+        for _ in range(max_iter):
+            active = np.flatnonzero(~converged)
+            if len(active) == 0:
+                break
+            value, derivative = npv(y[active], rows[active])
+            same_sign = np.sign(value) == np.sign(lo_value[active])
+            lo[active] = np.where(same_sign, y[active], lo[active])
+            lo_value[active] = np.where(same_sign, value, lo_value[active])
+            hi[active] = np.where(same_sign, hi[active], y[active])
+            newton = y[active] - value / derivative
+            inside = (newton > np.minimum(lo[active], hi[active])) & (
+                newton < np.maximum(lo[active], hi[active])
+            )
+            new_y = np.where(inside, newton, (lo[active] + hi[active]) / 2)
+            new_y = np.where(value == 0, y[active], new_y)
+            converged[active] = np.abs(new_y - y[active]) < tol * (1 + abs(new_y))
+            y[active] = new_y
+    rates[rows[converged]] = np.expm1(y[converged])
+
+    # series with several rates or an extreme rate use pyxirr
+    extreme = ~((rates > -0.8) & (rates < 10))
+    for row in np.flatnonzero((sign_changes > 1) | ((sign_changes == 1) & extreme)):
+        rate = xirr(
+            dates[row, : lengths[row]], amounts[row, : lengths[row]], silent=True
+        )
+        rates[row] = np.nan if rate is None else rate
+
+    return rates
+
+
+class TradingCalendar:
+    """
+    A TradingCalendar class used to look up NYSE trading days.
+
+    Creating the NYSE schedule is slow, mostly from calculating the holidays,
+    so the schedule is created once and kept for the process:
+       - the schedule is extended by whole years when dates are outside of it
+       - the schedule can be saved to a parquet file to be used across processes
+       - the lookups use a binary search on the sorted trading days
+
+    Parameters
+    ----------
+    path : str (optional)
+        the parquet file to save the schedule to, relative paths are prefixed
+        with CONFIG_PATH
+
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        """Initialize the TradingCalendar class."""
+        if path is not None and not Path(path).is_absolute():
+            path = config_helper.CONFIG_PATH / path
+        self.path = Path(path) if path is not None else None
+        self.schedule = pd.DataFrame(
+            {
+                "market_open": pd.DatetimeIndex([], tz="UTC"),
+                "market_close": pd.DatetimeIndex([], tz="UTC"),
+            },
+            index=pd.DatetimeIndex([]),
+        )
+        self._market_dates: Dict[str, pd.DatetimeIndex] = {}
+        if self.path is not None and self.path.exists():
+            schedule = pd.read_parquet(self.path)
+            # schedules saved without the market close are created again
+            if set(self.schedule.columns) <= set(schedule.columns):
+                self.schedule = schedule[self.schedule.columns]
+
+    def market_dates(
+        self,
+        start: Optional[Union[str, date, datetime]] = None,
+        end: Optional[Union[str, date, datetime]] = None,
+        timezone: Optional[str] = None,
+    ) -> pd.DatetimeIndex:
+        """
+        Get the trading days between dates.
+
+        Parameters
+        ----------
+        start : date (optional)
+            the first date to include, default is the start of the schedule
+        end : date (optional)
+            the last date to include, default is the end of the schedule
+        timezone : str (optional)
+            timezone of the market open to get the date of, default is the
+            trading session date
+
+        Returns
+        -------
+        market_dates : DatetimeIndex
+            the trading days
+
+        """
+        if start is not None or end is not None:
+            self._extend(
+                start=start if start is not None else end,
+                end=end if end is not None else start,
+            )
+        market_dates = self._get_market_dates(timezone)
+        if start is not None:
+            market_dates = market_dates[market_dates >= pd.Timestamp(start)]
+        if end is not None:
+            market_dates = market_dates[market_dates <= pd.Timestamp(end)]
+
+        return market_dates
+
+    def previous_date(
+        self,
+        dates: Any,
+        inclusive: bool = True,
+        timezone: Optional[str] = None,
+    ) -> Any:
+        """
+        Get the trading day on or before dates.
+
+        Parameters
+        ----------
+        dates : date, list, or Series
+            dates to get the previous trading day of
+        inclusive : bool (optional)
+            whether a trading day is its own previous trading day
+        timezone : str (optional)
+            timezone of the market open to get the date of, default is the
+            trading session date
+
+        Returns
+        -------
+        previous_dates : Timestamp, DatetimeIndex, or Series
+            the previous trading day in the same shape as dates
+
+        """
+        return self._snap(
+            dates, side="right" if inclusive else "left", offset=-1, timezone=timezone
+        )
+
+    def next_date(
+        self,
+        dates: Any,
+        inclusive: bool = True,
+        timezone: Optional[str] = None,
+    ) -> Any:
+        """
+        Get the trading day on or after dates.
+
+        Parameters
+        ----------
+        dates : date, list, or Series
+            dates to get the next trading day of
+        inclusive : bool (optional)
+            whether a trading day is its own next trading day
+        timezone : str (optional)
+            timezone of the market open to get the date of, default is the
+            trading session date
+
+        Returns
+        -------
+        next_dates : Timestamp, DatetimeIndex, or Series
+            the next trading day in the same shape as dates
+
+        """
+        return self._snap(
+            dates, side="left" if inclusive else "right", offset=0, timezone=timezone
+        )
+
+    def market_close(self, day: Union[str, date, datetime]) -> Optional[pd.Timestamp]:
+        """
+        Get the market close of a trading day.
+
+        Parameters
+        ----------
+        day : date
+            the trading day to get the market close of
+
+        Returns
+        -------
+        market_close : Timestamp
+            the market close in UTC, None if the day is not a trading day
+
+        """
+        day = pd.Timestamp(day).normalize()
+        self._extend(start=day, end=day)
+        if day not in self.schedule.index:
+            return None
+
+        return self.schedule.loc[day, "market_close"]
+
+    def save(self) -> None:
+        """Save the schedule to the parquet file."""
+        if self.path is None:
+            raise ValueError("The trading calendar does not have a path to save to")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.schedule.to_parquet(self.path)
+
+    def _snap(self, dates: Any, side: str, offset: int, timezone: Optional[str]) -> Any:
+        """Move dates to the trading day found with a binary search."""
+        is_series = isinstance(dates, pd.Series)
+        is_scalar = isinstance(dates, (str, date, datetime))
+        day_index = pd.DatetimeIndex(pd.to_datetime([dates] if is_scalar else dates))
+        day_index = day_index.tz_localize(None) if day_index.tz else day_index
+        day_index = day_index.normalize()
+        # a week of padding gives a trading day on each side of the dates
+        self._extend(
+            start=day_index.min() - timedelta(days=7),
+            end=day_index.max() + timedelta(days=7),
+        )
+
+        market_dates = self._get_market_dates(timezone)
+        idx = np.searchsorted(market_dates.values, day_index.values, side=side) + offset
+        snapped = market_dates[idx]
+
+        if is_scalar:
+            return snapped[0]
+        if is_series:
+            return pd.Series(snapped, index=dates.index, name=dates.name)
+        return snapped
+
+    def _get_market_dates(self, timezone: Optional[str]) -> pd.DatetimeIndex:
+        """Get the trading days as the date of the market open in timezone."""
+        if timezone is None:
+            return self.schedule.index
+        if timezone == "local":
+            timezone = config_helper.LOCAL_TIMEZONE
+        key = str(timezone)
+        if key not in self._market_dates:
+            market_open = self.schedule["market_open"].dt.tz_convert(timezone)
+            self._market_dates[key] = pd.DatetimeIndex(
+                market_open.dt.tz_localize(None).dt.normalize()
+            )
+        return self._market_dates[key]
+
+    def _extend(
+        self,
+        start: Union[str, date, datetime],
+        end: Union[str, date, datetime],
+    ) -> None:
+        """Extend the schedule by whole years to include the dates."""
+        start = pd.Timestamp(start)
+        end = pd.Timestamp(end)
+        if not self.schedule.empty:
+            first_year = self.schedule.index[0].year
+            last_year = self.schedule.index[-1].year
+            if first_year <= start.year and end.year <= last_year:
+                return
+            years = [(start.year, first_year - 1), (last_year + 1, end.year)]
+        else:
+            years = [(start.year, end.year)]
+
+        nyse = _nyse_calendar()
+        schedules = [self.schedule]
+        for first_year, last_year in years:
+            if first_year > last_year:
+                continue
+            logger.debug(f"Creating NYSE schedule from {first_year} to {last_year}")
+            schedule = nyse.schedule(
+                start_date=f"{first_year}-01-01", end_date=f"{last_year}-12-31"
+            )
+            schedules.append(schedule[["market_open", "market_close"]])
+        self.schedule = pd.concat(
+            [schedule for schedule in schedules if not schedule.empty]
+        ).sort_index()
+        self._market_dates = {}
+        if self.path is not None:
+            self.save()
+
+
+@lru_cache(maxsize=None)
+def _nyse_calendar() -> mcal.MarketCalendar:
+    """Get the NYSE market calendar."""
+    return mcal.get_calendar("NYSE")
+
+
+@lru_cache(maxsize=None)
+def get_trading_calendar() -> TradingCalendar:
+    """
+    Get the trading calendar of the process.
+
+    The calendar is only saved to a file after `set_trading_calendar` is
+    called with a path.
+
+    Returns
+    -------
+    trading_calendar : TradingCalendar
+        the trading calendar shared by the process
+
+    """
+    return TradingCalendar()
+
+
+def set_trading_calendar(path: Optional[Union[str, Path]] = None) -> TradingCalendar:
+    """
+    Set the file that the trading calendar of the process is saved to.
+
+    The saved schedule is loaded if the file exists, otherwise the schedule of
+    the calendar is saved to the file.
+
+    Parameters
+    ----------
+    path : str (optional)
+        the parquet file to save the schedule to, relative paths are prefixed
+        with CONFIG_PATH, if None the calendar is not saved
+
+    Returns
+    -------
+    trading_calendar : TradingCalendar
+        the trading calendar shared by the process
+
+    """
+    trading_calendar = get_trading_calendar()
+    saved_calendar = TradingCalendar(path=path)
+    if saved_calendar.path == trading_calendar.path:
+        return trading_calendar
+
+    trading_calendar.path = saved_calendar.path
+    if not saved_calendar.schedule.empty:
+        trading_calendar.schedule = saved_calendar.schedule
+        trading_calendar._market_dates = {}
+    elif trading_calendar.path is not None and not trading_calendar.schedule.empty:
+        trading_calendar.save()
+
+    return trading_calendar
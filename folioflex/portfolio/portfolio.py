@@ -13,6 +13,7 @@ The Portfolio class has a number of objects, such as:
 
 The Manager class has a number of objects, such as:
     - portfolios : the portfolios that are managed
+    - errors : the portfolios that could not be built with workers
 
     There are functions in class as well:
     - get_summary : this function will provide the summary of all portfolios
@@ -20,22 +21,35 @@ The Manager class has a number of objects, such as:
 """
 
 import datetime
+import json
 import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from io import StringIO
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple, Union
 
 import numpy as np
 import pandas as pd
-import pandas_market_calendars as mcal
 import plotly.express as px
+import pyarrow.dataset as ds
 import requests
 from pyxirr import xirr
 
 from folioflex.portfolio.helper import (
     check_stock_dates,
+    compact_dtypes,
     convert_date_to_timezone,
     convert_lookback,
+    get_trading_calendar,
+    hash_file_version,
+    hash_options,
+    most_recent_stock_date,
+    prettify_dataframe,
+    set_trading_calendar,
+    xirr_batch,
 )
+from folioflex.portfolio.store import PriceStore
 from folioflex.portfolio.wrappers import Yahoo
 from folioflex.utils import config_helper, custom_logger
 
@@ -43,6 +57,27 @@ pd.options.display.float_format = "{:,.2f}".format
 
 logger = custom_logger.setup_logging(__name__)
 
+VIEW_CACHE_SIZE = 32  # number of views and performances each portfolio caches
+FLOW_COLUMNS = ["units", "cost", "dividend", "price"]  # not carried between dates
+TX_COLUMNS = ["date", "ticker", "type", "units", "cost"]  # required transaction fields
+TX_DTYPES = {"ticker": str, "type": str, "broker": str, "units": float, "cost": float}
+TX_DATE_FORMAT = "%m/%d/%Y"
+TX_CHUNK_SIZE = 100_000  # rows of a transactions file read at a time
+COLUMNAR_FORMATS = (".parquet", ".feather")  # typed transaction file formats
+SNAPSHOT_FRAMES = ["transactions", "price_history", "transactions_history"]
+SNAPSHOT_MANIFEST = "manifest.json"
+PORTFOLIO_VIEWS = [  # summed over the tickers for the portfolio
+    "cost",
+    "cumulative_cost",
+    "cumulative_cost_without_dividend",
+    "market_value",
+    "return",
+    "unrealized",
+    "realized",
+    "dividend",
+    "cumulative_dividend",
+]
+
 if TYPE_CHECKING:
     import plotly.graph_objects as go
 
@@ -67,6 +102,15 @@ class Portfolio:
         the location of the config file
     portfolio : str
         the name of the portfolio to analyze
+    stock_history : DataFrame (optional)
+        stock history that was already downloaded, which is filtered to the
+        tickers of the portfolio instead of downloading again
+    build : bool (default is True)
+        whether to build the price and transactions history, if False only the
+        transactions are loaded and `_build` needs to be called
+    ledger : DataFrame (optional)
+        transactions that were already read from the transactions file, which
+        are filtered to the portfolio instead of reading the file again
 
     """
 
@@ -74,47 +118,992 @@ class Portfolio:
         self,
         config_path: str,
         portfolio: str,
+        stock_history: Optional[pd.DataFrame] = None,
+        build: bool = True,
+        ledger: Optional[pd.DataFrame] = None,
     ) -> None:
         """Initialize the Portfolio class."""
+        self._set_config(config_path=config_path, portfolio=portfolio)
+        logger.info(f"creating '{self.name}' portfolio")
+        self._load_transactions(ledger=ledger)
+        if build:
+            self._build(stock_history=stock_history)
+
+    def _load_transactions(self, ledger: Optional[pd.DataFrame] = None) -> None:
+        """
+        Load the transactions of the portfolio.
+
+        Parameters
+        ----------
+        ledger : DataFrame (optional)
+            transactions that were already read from the transactions file
+
+        """
+        self.transactions = self.get_transactions(
+            filter_type=self.filter_type,
+            filter_broker=self.filter_broker,
+            other_fields=self.other_fields,
+            username=self.username,
+            password=self.password,
+            ledger=ledger,
+        )
+        self._min_year = self.transactions["date"].min().year
+        self.tickers = list(self.transactions["ticker"].unique())
+
+    def _set_config(self, config_path: str, portfolio: str) -> None:
+        """
+        Set the options of the portfolio from its config section.
+
+        The fingerprints of the inputs are taken before anything is read, so
+        a snapshot records the inputs that the portfolio was built from.
+
+        Parameters
+        ----------
+        config_path : str
+            the location of the config file
+        portfolio : str
+            the name of the portfolio to analyze
+
+        """
         config_dict = config_helper.get_config_options(
             config_path, "investments", portfolio
         )
+        self.config_path = config_path
         self.file = self.load_transaction_file(config_dict["tx_file"])
         logger.info(f"retrieved filename {self.file}")
         self.username = config_dict.get("username", None)
         self.password = config_dict.get("password", None)
         self.name = config_dict["name"]
-        logger.info(f"creating '{self.name}' portfolio")
         self.filter_type = config_dict["filter_type"]
         self.filter_broker = config_dict["filter_broker"]
         self.funds = config_dict["funds"]
         self.delisted = config_dict["delisted"]
         self.benchmarks = config_dict["benchmarks"]
         self.other_fields = config_dict["other_fields"]
-        self.transactions = self.get_transactions(
-            filter_type=self.filter_type,
-            filter_broker=self.filter_broker,
+        self.history_offline = config_dict.get("history_offline", None)
+        self.history_store = config_dict.get("history_store", None)
+        self.stock_splits = config_dict.get("stock_splits", False)
+        self.compact_dtypes = config_dict.get("compact_dtypes", False)
+        self.sparse_history = config_dict.get("sparse_history", False)
+        self.calendar_path = config_dict.get("calendar_path", None)
+        if self.calendar_path:
+            set_trading_calendar(
+                path=(
+                    "trading_calendar.parquet"
+                    if self.calendar_path is True
+                    else self.calendar_path
+                )
+            )
+        self._fingerprints = self._get_fingerprints(config_dict=config_dict)
+
+    def _get_fingerprints(
+        self, config_dict: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Get the fingerprints of the inputs of the portfolio.
+
+        Files are fingerprinted by size, modified time and content hash. The
+        content hash is only calculated again when the size or modified time
+        changed, so portfolios created from the same files hash them once.
+
+        Parameters
+        ----------
+        config_dict : dict (optional)
+            the config section of the portfolio, which is read if not provided
+
+        Returns
+        -------
+        fingerprints : dict
+            the fingerprints of the inputs
+               - config: hash of the config section of the portfolio
+               - tx_file: fingerprint of the transactions file, None if the
+                 file is downloaded
+               - history_file: fingerprint of the offline price history
+               - market_date: the last trading date of downloaded prices
+
+        """
+        if config_dict is None:
+            config_dict = config_helper.get_config_options(
+                self.config_path, "investments", self.name
+            )
+        previous = getattr(self, "_fingerprints", None) or {}
+
+        tx_file = None
+        if not (self.username and self.password) and os.path.isfile(self.file):
+            tx_file = self._fingerprint_file(self.file, previous.get("tx_file"))
+        history_file = None
+        market_date = None
+        if self.history_offline:
+            history_file = self._fingerprint_file(
+                self.history_offline, previous.get("history_file")
+            )
+        else:
+            market_date = str(most_recent_stock_date())
+
+        fingerprints = {
+            "config": hash_options(config_dict),
+            "tx_file": tx_file,
+            "history_file": history_file,
+            "market_date": market_date,
+        }
+
+        return fingerprints
+
+    @staticmethod
+    def _fingerprint_file(
+        path: str, previous: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Get the fingerprint of a file.
+
+        Parameters
+        ----------
+        path : str
+            the path to the file
+        previous : dict (optional)
+            the last fingerprint of the file, which is reused if the file has
+            the same size and modified time
+
+        Returns
+        -------
+        fingerprint : dict
+            the path, size, modified time and content hash of the file
+
+        """
+        stat = os.stat(path)
+        if (
+            previous is not None
+            and previous["path"] == str(path)
+            and previous["size"] == stat.st_size
+            and previous["mtime"] == stat.st_mtime_ns
+        ):
+            return previous
+
+        fingerprint = {
+            "path": str(path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": hash_file_version(str(path), stat.st_size, stat.st_mtime_ns),
+        }
+
+        return fingerprint
+
+    def _get_changed_inputs(self, fingerprints: Dict[str, Any]) -> List[str]:
+        """
+        Get the inputs that changed from the fingerprints of the portfolio.
+
+        Files are compared by content hash, so a file that is saved again
+        without changes is not changed. A downloaded transactions file has no
+        fingerprint and is always changed.
+
+        Parameters
+        ----------
+        fingerprints : dict
+            the fingerprints to compare to the fingerprints of the portfolio
+
+        Returns
+        -------
+        changed : list
+            the inputs that changed
+               - config
+               - transactions
+               - prices
+
+        """
+
+        def file_hash(fingerprint: Optional[Dict[str, Any]]) -> Optional[str]:
+            return None if fingerprint is None else fingerprint["hash"]
+
+        changed = []
+        if fingerprints["config"] != self._fingerprints["config"]:
+            changed.append("config")
+        if fingerprints["tx_file"] is None or file_hash(
+            fingerprints["tx_file"]
+        ) != file_hash(self._fingerprints["tx_file"]):
+            changed.append("transactions")
+        if (
+            file_hash(fingerprints["history_file"])
+            != file_hash(self._fingerprints["history_file"])
+            or fingerprints["market_date"] != self._fingerprints["market_date"]
+        ):
+            changed.append("prices")
+
+        return changed
+
+    def is_stale(self) -> bool:
+        """
+        Check if the inputs of the portfolio changed since it was built.
+
+        Returns
+        -------
+        stale : bool
+            whether the config section, transactions file or prices changed
+
+        """
+        return bool(self._get_changed_inputs(self._get_fingerprints()))
+
+    def refresh(self) -> List[str]:
+        """
+        Build again the stages of the portfolio whose inputs changed.
+
+        The stages that are built again depend on the inputs that changed:
+           - config: the portfolio is built again
+           - transactions: the transactions are read again and the price
+             history is only downloaded again if there are new stock tickers
+             or earlier years
+           - prices: the price history is downloaded or read again and the
+             transactions are only adjusted again if the stock splits changed
+        The transactions history is then calculated from the transactions and
+        price history.
+
+        Returns
+        -------
+        changed : list
+            the inputs that changed
+
+        """
+        fingerprints = self._get_fingerprints()
+        changed = self._get_changed_inputs(fingerprints)
+        if not changed:
+            logger.info(f"'{self.name}' portfolio is up to date")
+            return changed
+        logger.info(f"refreshing '{self.name}' portfolio for changed {changed}")
+        self._fingerprints = fingerprints
+
+        if "config" in changed:
+            self._set_config(config_path=self.config_path, portfolio=self.name)
+            self._load_transactions()
+            self._build()
+            return changed
+
+        reloaded = False
+        update_prices = "prices" in changed
+        if "transactions" in changed:
+            stock_tickers = set(self._get_stock_tickers())
+            min_year = self._min_year
+            self._load_transactions()
+            reloaded = True
+            if (
+                not set(self._get_stock_tickers()) <= stock_tickers
+                or self._min_year < min_year
+            ):
+                update_prices = True
+            elif not (update_prices or self.history_offline):
+                # the stock prices cover the transactions, so only the prices of
+                # funds and cash are added again
+                self.price_history = self._get_price_history(
+                    history_store=self.history_store,
+                    stock_history=self.price_history,
+                )
+
+        if update_prices:
+            split_events = self._get_split_events()
+            self.price_history = self._get_price_history(
+                history_offline=self.history_offline,
+                history_store=self.history_store,
+            )
+            if (
+                self.stock_splits
+                and not reloaded
+                and not split_events.equals(self._get_split_events())
+            ):
+                logger.info("stock splits changed, reading transactions again")
+                self._load_transactions()
+                reloaded = True
+
+        self._build_history(adjust=reloaded)
+
+        return changed
+
+    def _get_split_events(self) -> pd.DataFrame:
+        """Get the stock splits of the price history."""
+        split_events = self.price_history.loc[
+            self.price_history["stock_splits"].fillna(1) != 1,
+            ["ticker", "date", "stock_splits"],
+        ].astype({"ticker": str})
+
+        return split_events.sort_values(by=["ticker", "date"], ignore_index=True)
+
+    def extend_prices(self, new_price_rows: pd.DataFrame) -> None:
+        """
+        Extend the portfolio with the prices of new dates.
+
+        There are no transactions on the new dates, so each ticker rolls
+        forward from its last row and the portfolio adds the changes of the
+        tickers to its last row. Only the rows of the new dates are calculated
+        rather than building the transactions history again, unless there is a
+        new stock split that adjusts the earlier transactions.
+
+        Parameters
+        ----------
+        new_price_rows : DataFrame
+            the prices of the new dates, where dates on or before the last date
+            of the portfolio are ignored and tickers without a price keep their
+            last price
+               - ticker
+               - date
+               - last_price
+               - stock_splits (optional)
+
+        """
+        new_prices = new_price_rows.copy()
+        if "stock_splits" not in new_prices.columns:
+            new_prices["stock_splits"] = 1
+        new_prices = new_prices[["ticker", "date", "last_price", "stock_splits"]]
+        new_prices["ticker"] = new_prices["ticker"].astype(str)
+        new_prices["date"] = convert_date_to_timezone(
+            pd.to_datetime(new_prices["date"]), timezone=None
+        )
+        new_prices["stock_splits"] = new_prices["stock_splits"].replace(0, 1)
+        last_date = self._max_date
+        new_prices = new_prices[new_prices["date"] > last_date]
+        if new_prices.empty:
+            logger.info(f"there are no prices after {last_date:%Y-%m-%d} to add")
+            return
+        new_dates = np.sort(new_prices["date"].unique())
+        logger.info(f"extending '{self.name}' portfolio by {len(new_dates)} dates")
+
+        # price history of the new dates, where funds and cash keep their price
+        price_history = self.price_history.reset_index(drop=True)
+        last_prices = price_history.loc[
+            price_history.groupby("ticker", observed=True)["date"].idxmax()
+        ]
+        last_prices = last_prices.astype({"ticker": str}).set_index("ticker")
+        price_rows = pd.merge(
+            pd.MultiIndex.from_product(
+                [last_prices.index, new_dates], names=["ticker", "date"]
+            ).to_frame(index=False),
+            new_prices,
+            how="left",
+            on=["ticker", "date"],
+        )
+        prices = price_rows.pivot(index="date", columns="ticker", values="last_price")
+        prices = pd.concat([last_prices[["last_price"]].T, prices]).ffill().iloc[1:]
+        prices = prices.unstack()
+        price_rows["last_price"] = prices.reindex(
+            pd.MultiIndex.from_frame(price_rows[["ticker", "date"]])
+        ).to_numpy()
+        price_rows["cumulative_stock_splits"] = price_rows["stock_splits"]
+        price_rows = price_rows.reindex(columns=self.price_history.columns).astype(
+            self.price_history.dtypes.to_dict()
+        )
+        self.price_history = pd.concat(
+            [price_rows, self.price_history], ignore_index=True
+        )
+
+        if self.stock_splits and (price_rows["stock_splits"].fillna(1) != 1).any():
+            logger.info("new stock splits, building the transactions history again")
+            self.price_history = self.price_history.sort_values(
+                by=["ticker", "date"], ascending=False, ignore_index=True
+            )
+            self.price_history["cumulative_stock_splits"] = self.price_history.groupby(
+                "ticker", observed=True
+            )["stock_splits"].cumprod()
+            # the transactions are all before the new dates, so the units of
+            # the tickers with a split are adjusted by the new splits
+            new_splits = price_rows.groupby("ticker", observed=True)[
+                "stock_splits"
+            ].prod()
+            split_factor = (
+                self.transactions["ticker"]
+                .astype(str)
+                .map(new_splits)
+                .fillna(1)
+                .to_numpy()
+            )
+            is_split = self.transactions["type"].to_numpy() != "DIVIDEND"
+            self.transactions["units"] = np.where(
+                is_split,
+                self.transactions["units"] * split_factor,
+                self.transactions["units"],
+            )
+            self.transactions["cumulative_stock_splits"] = (
+                self.transactions["cumulative_stock_splits"].fillna(1) * split_factor
+            )
+            self._build_history(adjust=False)
+            self._extend_market_date()
+            return
+
+        # the history is sorted by ticker and date descending, so the first row
+        # of each ticker is its last row
+        tx_hist_df = self.transactions_history
+        first_positions = np.flatnonzero(~tx_hist_df["ticker"].duplicated().to_numpy())
+        last_rows = tx_hist_df.iloc[first_positions]
+        is_rolled = (last_rows["ticker"] != "portfolio") & (
+            last_rows["date"] == last_date
+        )
+        if self.sparse_history:
+            is_rolled &= (last_rows["cumulative_units"].fillna(0) != 0) | last_rows[
+                "ticker"
+            ].str.startswith("benchmark")
+        rolled = last_rows[is_rolled]
+
+        new_rows = rolled.loc[rolled.index.repeat(len(new_dates))].reset_index(
+            drop=True
+        )
+        new_rows["date"] = np.tile(new_dates, len(rolled))
+        levels = [view for view in PORTFOLIO_VIEWS if view not in FLOW_COLUMNS]
+        last_levels = new_rows[levels].fillna(0)
+        price_tickers = (
+            new_rows["ticker"].astype(str).str.replace("benchmark-", "", regex=False)
+        )
+        new_rows["last_price"] = prices.reindex(
+            pd.MultiIndex.from_arrays([price_tickers, new_rows["date"]])
+        ).to_numpy()
+        for col in ["stock_splits", "cumulative_stock_splits"]:
+            new_rows[col] = new_rows[col].where(
+                new_rows[col].isna() | (new_rows[col] == 0), 1
+            )
+        for col in FLOW_COLUMNS:
+            new_rows[col] = new_rows[col].where(new_rows[col].isna(), 0)
+        for col in [
+            "cumulative_units",
+            "cumulative_cost",
+            "cumulative_dividend",
+            "average_price",
+        ]:
+            new_rows[col] = new_rows[col].fillna(0)
+        new_rows = self._calc_value_metrics(new_rows)
+
+        # the portfolio adds the changes of the tickers from their last row
+        is_member = ~new_rows["ticker"].str.contains("benchmark")
+        changes = (
+            (new_rows[levels].fillna(0) - last_levels)[is_member]
+            .groupby(new_rows["date"])
+            .sum()
+            .reindex(new_dates, fill_value=0)
+        )
+        portfolio_rows = last_rows[last_rows["ticker"] == "portfolio"]
+        portfolio_rows = portfolio_rows.loc[
+            portfolio_rows.index.repeat(len(new_dates))
+        ].reset_index(drop=True)
+        portfolio_rows["date"] = new_dates
+        portfolio_rows[levels] = (
+            portfolio_rows[levels].fillna(0).to_numpy() + changes[levels].to_numpy()
+        )
+        portfolio_rows[["cost", "dividend"]] = 0
+
+        new_rows = (
+            pd.concat([new_rows, portfolio_rows], ignore_index=True)
+            .astype(tx_hist_df.dtypes.to_dict())
+            .sort_values(by=["ticker", "date"], ascending=False, ignore_index=True)
+        )
+
+        # the new rows of each ticker are inserted before its last row
+        insert_at = (
+            pd.Series(first_positions, index=last_rows["ticker"].astype(str))
+            .reindex(new_rows["ticker"].astype(str))
+            .to_numpy()
+        )
+        order = np.insert(
+            np.arange(len(tx_hist_df)),
+            insert_at,
+            np.arange(len(tx_hist_df), len(tx_hist_df) + len(new_rows)),
+        )
+        extended = pd.concat([tx_hist_df, new_rows], ignore_index=True)
+        self._patch_history(
+            tx_hist_df=extended.take(order).reset_index(drop=True), new_rows=new_rows
+        )
+        self._extend_market_date()
+
+    def apply_transactions(self, tx_df: pd.DataFrame) -> None:
+        """
+        Apply new transactions to the portfolio.
+
+        The transactions history is calculated again only for the tickers of
+        the new transactions and cash, from the earliest new transaction date.
+        Each ticker continues from its last row before that date, the
+        benchmarks are calculated again if there are new cash transactions and
+        the portfolio rows are summed again from that date. New tickers or
+        earlier years need prices that were not downloaded, so then the
+        portfolio is built again.
+
+        Parameters
+        ----------
+        tx_df : DataFrame
+            the new transactions with the fields of the transactions file
+
+        """
+        cols = [*TX_COLUMNS, *self.other_fields]
+        new_tx = _filter_transactions(
+            tx_df, filter_type=self.filter_type, filter_broker=self.filter_broker
+        )[cols].copy()
+        if new_tx.empty:
+            logger.info("there are no new transactions to apply")
+            return
+        new_tx["date"] = convert_date_to_timezone(
+            pd.to_datetime(new_tx["date"]), timezone=None
+        )
+        new_tx["ticker"] = new_tx["ticker"].astype(str)
+        new_tx["price"] = (new_tx["cost"] / new_tx["units"]) * -1
+        new_tx.loc[new_tx["ticker"] == "Cash", "price"] = 1
+        new_tx.loc[new_tx["type"] == "DIVIDEND", "price"] = 1
+        self.check_tx(tx_df=new_tx.copy())
+        start = new_tx["date"].min()
+        logger.info(
+            f"applying {len(new_tx)} transactions to '{self.name}' portfolio "
+            f"from {start:%Y-%m-%d}"
+        )
+
+        rebuild = (
+            not set(new_tx["ticker"]) <= set(self.tickers)
+            or start.year < self._min_year
+        )
+        if rebuild:
+            logger.info("new tickers or earlier years, building the portfolio again")
+            transactions = self.transactions
+            self.transactions = self._merge_transactions(new_tx)
+            self._min_year = self.transactions["date"].min().year
+            self.tickers = list(self.transactions["ticker"].unique())
+            self.price_history = self._get_price_history(
+                history_offline=self.history_offline,
+                history_store=self.history_store,
+            )
+            # only the new transactions are adjusted for stock splits
+            self.transactions = transactions
+            self.transactions = self._merge_transactions(
+                self._add_stock_splits(new_tx) if self.stock_splits else new_tx
+            )
+            self._build_history(adjust=False)
+            return
+
+        if self.stock_splits:
+            new_tx = self._add_stock_splits(new_tx)
+        self.transactions = self._merge_transactions(new_tx)
+        if self.compact_dtypes:
+            self.transactions = self._compact_frame(self.transactions)
+        funds = self.funds + self.delisted
+        if not self.history_offline and new_tx["ticker"].isin(funds).any():
+            # funds use the transaction prices as their price history
+            self.price_history = self._get_price_history(
+                history_store=self.history_store,
+                stock_history=self.price_history,
+            )
+
+        tickers = list(new_tx["ticker"].unique())
+        if "Cash" in self.tickers and "Cash" not in tickers:
+            tickers.append("Cash")
+        benchmarks = []
+        if self.benchmarks and "Cash" in new_tx["ticker"].to_numpy():
+            benchmarks = self.benchmarks
+        # the history is sorted by ticker and date descending, so the first row
+        # of each ticker before the earliest new transaction is its last row
+        tx_hist_df = self.transactions_history
+        is_before = tx_hist_df["date"] < start
+        last_ticker_rows = tx_hist_df[
+            is_before & ~tx_hist_df["ticker"].where(is_before).duplicated()
+        ]
+        last_rows = last_ticker_rows[
+            last_ticker_rows["ticker"].isin(
+                tickers + [f"benchmark-{b}" for b in benchmarks]
+            )
+        ]
+
+        # the affected tickers from the earliest new transaction
+        recent_tx = self.transactions[self.transactions["date"] >= start]
+        tx_rows = recent_tx[(recent_tx["cost"] != 0) | (recent_tx["units"] != 0)]
+        tx_rows = self._add_cash_tx(
+            tx_df=tx_rows, other_fields=self.other_fields, cash="Cash" in self.tickers
+        )
+        tx_rows = tx_rows[tx_rows["ticker"].isin(tickers)].copy()
+        price_start = min([start, *last_rows["date"]])
+        price_history = self.price_history[self.price_history["date"] >= price_start]
+        new_rows = self._add_price_history(
+            tx_df=tx_rows,
+            price_history=price_history,
             other_fields=self.other_fields,
-            username=self.username,
-            password=self.password,
         )
+        new_rows = self._add_dividend(
+            tx_df=tx_rows, tx_hist_df=new_rows, other_fields=self.other_fields
+        )
+        new_rows = self._continue_tx_metrics(
+            new_rows[new_rows["date"] >= start], last_rows
+        )
+        if self.sparse_history:
+            # tickers have rows while they are held or have a transaction
+            activity = pd.MultiIndex.from_frame(tx_rows[["ticker", "date"]])
+            is_active = pd.MultiIndex.from_frame(new_rows[["ticker", "date"]]).isin(
+                activity
+            )
+            new_rows = new_rows[
+                (new_rows["cumulative_units"].fillna(0) != 0) | is_active
+            ]
 
-        self._min_year = self.transactions["date"].min().year
-        self.tickers = list(self.transactions["ticker"].unique())
+        if benchmarks:
+            benchmark_rows = self._add_benchmarks(
+                tx_df=recent_tx,
+                tickers=benchmarks,
+                price_history=price_history,
+                other_fields=self.other_fields,
+            )
+            benchmark_rows = self._continue_tx_metrics(
+                benchmark_rows[benchmark_rows["date"] >= start], last_rows
+            )
+            new_rows = pd.concat([new_rows, benchmark_rows])
+
+        # the portfolio is summed again from the earliest new transaction
+        replaced = [*new_rows["ticker"].unique(), "portfolio"]
+        is_replaced = tx_hist_df["ticker"].isin(replaced) & (
+            tx_hist_df["date"] >= start
+        )
+        tx_hist_df = pd.concat(
+            [tx_hist_df[~is_replaced], new_rows[tx_hist_df.columns]],
+            ignore_index=True,
+        )
+        is_recent = (tx_hist_df["date"] >= start) & (
+            tx_hist_df["ticker"] != "portfolio"
+        )
+        if self.sparse_history:
+            portfolio_dates = self.transactions_history.loc[
+                (self.transactions_history["ticker"] == "portfolio")
+                & (self.transactions_history["date"] >= start),
+                "date",
+            ]
+            portfolio_rows = self._add_portfolio(
+                tx_hist_df=pd.concat(
+                    [
+                        last_ticker_rows[last_ticker_rows["ticker"] != "portfolio"],
+                        tx_hist_df[is_recent],
+                    ]
+                ),
+                dates=portfolio_dates,
+            )
+        else:
+            portfolio_rows = self._add_portfolio(tx_hist_df=tx_hist_df[is_recent])
+        portfolio_rows = portfolio_rows[
+            (portfolio_rows["ticker"] == "portfolio")
+            & (portfolio_rows["date"] >= start)
+        ]
+
+        tx_hist_df = pd.concat([tx_hist_df, portfolio_rows], ignore_index=True)
+        tx_hist_df = tx_hist_df.sort_values(
+            by=["ticker", "date"], ignore_index=True, ascending=False
+        )
+        if self.compact_dtypes:
+            tx_hist_df = self._compact_frame(tx_hist_df)
+        self._patch_history(
+            tx_hist_df=tx_hist_df,
+            new_rows=tx_hist_df[tx_hist_df["date"] >= start],
+        )
+
+    def _merge_transactions(self, new_tx: pd.DataFrame) -> pd.DataFrame:
+        """
+        Merge new transactions with the transactions of the portfolio.
+
+        The transactions of the tickers of the new transactions are grouped
+        again, so transactions on the same day are combined as when the
+        transactions file is read.
+
+        Parameters
+        ----------
+        new_tx : DataFrame
+            the new transactions
+
+        Returns
+        -------
+        transactions : DataFrame
+            the transactions with the new transactions
+
+        """
+        keys = ["date", "ticker", "type", *self.other_fields]
+        is_merged = self.transactions["ticker"].isin(new_tx["ticker"].unique())
+        merged = pd.concat(
+            [self.transactions[is_merged].astype({"ticker": str}), new_tx],
+            ignore_index=True,
+        )
+        merged = (
+            merged.groupby(by=keys, dropna=False, observed=True)
+            .agg(
+                {
+                    col: "sum" if col in ["units", "cost"] else "first"
+                    for col in merged.columns
+                    if col not in keys
+                }
+            )
+            .reset_index()
+        )
+
+        # the price is of the units before they were adjusted for stock splits
+        units = merged["units"]
+        if "cumulative_stock_splits" in merged.columns:
+            units = units / merged["cumulative_stock_splits"].fillna(1)
+        merged["price"] = (merged["cost"] / units) * -1
+        merged.loc[merged["ticker"] == "Cash", "price"] = 1
+        merged.loc[merged["type"] == "DIVIDEND", "price"] = 1
+
+        transactions = pd.concat(
+            [self.transactions[~is_merged], merged[self.transactions.columns]],
+            ignore_index=True,
+        ).sort_values(by="date", ascending=False)
+
+        return transactions
+
+    def _patch_history(self, tx_hist_df: pd.DataFrame, new_rows: pd.DataFrame) -> None:
+        """
+        Set a transactions history that only changed from the first new date.
+
+        The performance as of earlier dates stays cached and the views are
+        updated from the first new date rather than built again.
+
+        Parameters
+        ----------
+        tx_hist_df : DataFrame
+            the transactions history
+        new_rows : DataFrame
+            rows of the transactions history on and after the first new date
+
+        """
+        start = new_rows["date"].min()
+        performance_cache = self._performance_cache
+        self.transactions_history = tx_hist_df
+        for (date, lookback, _), performance in performance_cache.items():
+            if date < start:
+                self._performance_cache[(date, lookback, self._history_version)] = (
+                    performance
+                )
+
+        self._max_date = max(self._max_date, new_rows["date"].max())
+        new_views = self.get_views(
+            views=["return", "cumulative_cost"], tx_hist_df=new_rows
+        )
+        for view, view_attr in [
+            ("return", "return_view"),
+            ("cumulative_cost", "cost_view"),
+        ]:
+            view_df = getattr(self, view_attr)
+            view_df = view_df[view_df.index < start]
+            new_view_df = new_views[view].reindex(columns=view_df.columns)
+            if self.sparse_history and not view_df.empty:
+                # tickers without a new row keep the value of their last row
+                new_view_df = (
+                    pd.concat([view_df.iloc[[-1]], new_view_df]).ffill().iloc[1:]
+                )
+                new_view_df["portfolio"] = new_view_df.loc[
+                    :, ~new_view_df.columns.str.contains("benchmark|portfolio")
+                ].sum(axis=1)
+            setattr(self, view_attr, pd.concat([view_df, new_view_df]))
+
+    def _extend_market_date(self) -> None:
+        """Set the market date fingerprint to the last date of the prices."""
+        if not self.history_offline:
+            self._fingerprints = {
+                **self._fingerprints,
+                "market_date": str(self._max_date.date()),
+            }
+
+    def save_snapshot(self, path: Union[str, Path]) -> Path:
+        """
+        Save a snapshot of the built portfolio.
+
+        The transactions, price history and transactions history are saved as
+        parquet files with a manifest of the fingerprints of the inputs the
+        portfolio was built from.
+
+        Parameters
+        ----------
+        path : str
+            the directory of the snapshot, relative paths are prefixed with
+            CONFIG_PATH
+
+        Returns
+        -------
+        path : Path
+            the directory of the snapshot
+
+        """
+        path = self._snapshot_path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for frame in SNAPSHOT_FRAMES:
+            getattr(self, frame).to_parquet(path / f"{frame}.parquet")
+
+        manifest = {
+            "portfolio": self.name,
+            "fingerprints": self._fingerprints,
+            "max_date": self._max_date.strftime("%Y-%m-%d"),
+            "saved": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with open(path / SNAPSHOT_MANIFEST, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        logger.info(f"saved snapshot of '{self.name}' portfolio to {path}")
+
+        return path
+
+    @classmethod
+    def load_snapshot(
+        cls, path: Union[str, Path], config_path: str, portfolio: str
+    ) -> "Portfolio":
+        """
+        Load a portfolio from a snapshot.
+
+        The snapshot is used when its manifest matches the fingerprints of the
+        inputs of the portfolio. Otherwise the portfolio is built and the
+        snapshot is saved again.
+
+        Parameters
+        ----------
+        path : str
+            the directory of the snapshot, relative paths are prefixed with
+            CONFIG_PATH
+        config_path : str
+            the location of the config file
+        portfolio : str
+            the name of the portfolio to analyze
+
+        Returns
+        -------
+        portfolio : Portfolio
+            the portfolio of the snapshot
+
+        """
+        path = cls._snapshot_path(path)
+        snapshot = cls.__new__(cls)
+        snapshot._set_config(config_path=config_path, portfolio=portfolio)
+
+        manifest = None
+        if (path / SNAPSHOT_MANIFEST).exists():
+            with open(path / SNAPSHOT_MANIFEST, "r") as f:
+                manifest = json.load(f)
+        if manifest is not None and not snapshot._get_changed_inputs(
+            manifest["fingerprints"]
+        ):
+            logger.info(f"loading '{snapshot.name}' portfolio from snapshot {path}")
+            for frame in SNAPSHOT_FRAMES:
+                setattr(snapshot, frame, pd.read_parquet(path / f"{frame}.parquet"))
+            snapshot._min_year = snapshot.transactions["date"].min().year
+            snapshot.tickers = list(snapshot.transactions["ticker"].unique())
+            snapshot._set_history_views()
+            return snapshot
+
+        logger.info(f"snapshot {path} does not match the inputs, building portfolio")
+        built = cls(config_path=config_path, portfolio=portfolio)
+        built.save_snapshot(path)
+
+        return built
+
+    @staticmethod
+    def _snapshot_path(path: Union[str, Path]) -> Path:
+        """Get the directory of a snapshot."""
+        if not os.path.isabs(path):
+            path = os.path.join(config_helper.CONFIG_PATH, path)
+        return Path(path)
+
+    def _build(self, stock_history: Optional[pd.DataFrame] = None) -> None:
+        """
+        Build the price and transactions history of the portfolio.
+
+        Parameters
+        ----------
+        stock_history : DataFrame (optional)
+            stock history that was already downloaded
+
+        """
         self.price_history = self._get_price_history(
-            history_offline=config_dict.get("history_offline", None)
+            history_offline=self.history_offline,
+            history_store=self.history_store,
+            stock_history=stock_history,
         )
-        if config_dict.get("stock_splits", False):
-            self.transactions = self._add_stock_splits(self.transactions)
-        self.check_tx()
+        self._build_history()
+
+    def _build_history(self, adjust: bool = True) -> None:
+        """
+        Build the transactions history from the transactions and price history.
+
+        Parameters
+        ----------
+        adjust : bool (default is True)
+            whether the transactions were loaded since they were adjusted for
+            stock splits and checked
+
+        """
+        if adjust:
+            if self.stock_splits:
+                self.transactions = self._add_stock_splits(self.transactions)
+            self.check_tx()
         self.transactions_history = self.get_transactions_history(
             tx_df=self.transactions,
             other_fields=self.other_fields,
             benchmarks=self.benchmarks,
+            sparse=self.sparse_history,
         )
+        if self.compact_dtypes:
+            self._compact()
+        self._set_history_views()
+
+    def _set_history_views(self) -> None:
+        """Set the max date and views of the transactions history."""
         self._max_date = self.transactions_history["date"].max()
-        self.return_view = self.get_view(view="return")
-        self.cost_view = self.get_view(view="cumulative_cost")
+        views = self.get_views(views=["return", "cumulative_cost"])
+        self.return_view = views["return"]
+        self.cost_view = views["cumulative_cost"]
+
+    def _compact(self) -> None:
+        """
+        Convert the transactions and histories to compact dtypes.
+
+        The config option `compact_dtypes` is either True to convert string
+        columns to categories and dates to datetime64 without a time zone, or
+        "float32" to also convert the price columns to float32.
+
+        """
+        self.transactions = self._compact_frame(self.transactions)
+        self.price_history = self._compact_frame(self.price_history)
+        self.transactions_history = self._compact_frame(self.transactions_history)
+
+    def _compact_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Convert a frame to the compact dtypes of the config."""
+        float32_cols = []
+        if self.compact_dtypes == "float32":
+            float32_cols = ["last_price", "price", "average_price"]
+
+        return compact_dtypes(df, float32_cols)
+
+    def memory_usage(self) -> pd.DataFrame:
+        """
+        Get the memory usage of the portfolio.
+
+        Returns
+        -------
+        memory_usage : DataFrame
+            the bytes of each column of the transactions and histories, indexed
+            by frame and column
+
+        """
+        frames = {
+            "transactions": self.transactions,
+            "price_history": getattr(self, "price_history", None),
+            "transactions_history": getattr(self, "_transactions_history", None),
+        }
+        memory_usage = pd.concat(
+            {
+                name: frame.memory_usage(deep=True)
+                for name, frame in frames.items()
+                if frame is not None
+            },
+            names=["frame", "column"],
+        )
+        memory_usage = memory_usage.rename("bytes").to_frame()
+
+        return memory_usage
+
+    @property
+    def transactions_history(self) -> pd.DataFrame:
+        """
+        Transactions history of the portfolio.
+
+        Setting the transactions history starts a new history version, which
+        clears the cached views, performances and returns.
+
+        """
+        return self._transactions_history
+
+    @transactions_history.setter
+    def transactions_history(self, transactions_history: pd.DataFrame) -> None:
+        self._transactions_history = transactions_history
+        self._history_version = getattr(self, "_history_version", 0) + 1
+        self._view_cache = OrderedDict()
+        self._performance_cache = OrderedDict()
+        self._lookback_index = None
+        self._twrr_returns = None
 
     def get_performance(
         self,
@@ -136,7 +1125,8 @@ class Portfolio:
         lookback : int (default is None)
             the number of days to look back (uses a calendar day and not stock)
         prettify : bool (default is True)
-            whether to prettify the output
+            whether to format the pct columns as percentage strings, the numeric
+            performance is cached and only formatted on the way out
 
         Returns
         -------
@@ -167,13 +1157,62 @@ class Portfolio:
                 f"provide a date less than max date."
             )
 
+        if lookback is not None:
+            lookback = convert_lookback(lookback)
+
+        # performance of self.transactions_history is cached as numbers
+        use_cache = tx_hist_df is None
+        key = (date, lookback, self._history_version)
+        if use_cache and key in self._performance_cache:
+            self._performance_cache.move_to_end(key)
+            performance = self._performance_cache[key]
+        else:
+            performance = self._calc_performance(
+                date=date, tx_hist_df=tx_hist_df, lookback=lookback
+            )
+            if use_cache:
+                self._performance_cache[key] = performance
+                if len(self._performance_cache) > VIEW_CACHE_SIZE:
+                    self._performance_cache.popitem(last=False)
+
+        # changing format of percentage columns
+        if prettify:
+            return prettify_dataframe(performance)
+
+        return performance.copy()
+
+    def _calc_performance(
+        self,
+        date: pd.Timestamp,
+        tx_hist_df: Optional[pd.DataFrame] = None,
+        lookback: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Calculate the numeric performance of the portfolio on a date.
+
+        Parameters
+        ----------
+        date : Timestamp
+            the stock date the portfolio performance should be as of
+        tx_hist_df : DataFrame (default is all transactions)
+            dataframe to get return percent from
+        lookback : int (default is None)
+            the converted number of days to look back
+
+        Returns
+        -------
+        performance : DataFrame
+            the performance of individual assets as well as portfolio
+
+        """
         if tx_hist_df is None:
             tx_hist_df = self.transactions_history
         tx_hist_df = tx_hist_df[tx_hist_df["date"] <= date]
+        if self.sparse_history:
+            tx_hist_df = self._expand_history(tx_hist_df=tx_hist_df, dates=[date])
 
         # if lookback provided only calculate performance within lookback
         if lookback is not None:
-            lookback = convert_lookback(lookback)
             tx_hist_df = self._filter_lookback(
                 lookback=lookback, adjust_vars=True, tx_hist_df=tx_hist_df
             )
@@ -222,14 +1261,6 @@ class Portfolio:
             / (-performance["cumulative_cost"] + performance["realized"]),
         )
 
-        # changing format of percentage columns
-        if prettify:
-            pct_cols = performance.filter(like="pct").columns
-            for pct_col in pct_cols:
-                performance[pct_col] = performance[pct_col].apply(
-                    lambda x: "{:.2%}".format(x) if x is not None else "NaN"
-                )
-
         performance = performance[
             [
                 "date",
@@ -254,8 +1285,329 @@ class Portfolio:
 
         return performance
 
-    def load_transaction_file(
+    def get_performance_series(
+        self,
+        dates: Optional[List[datetime.date]] = None,
+        freq: Optional[str] = "ME",
+        tx_hist_df: Optional[pd.DataFrame] = None,
+    ) -> pd.DataFrame:
+        """
+        Get performance of portfolio and stocks traded on a number of dates.
+
+        This is the same as calling `get_performance` for each date, but the
+        dates are calculated together:
+           - the cumulative columns are taken from the transactions history
+           - the cash flows are created once and shared by the dates
+           - the cash flows are checked for all dates and tickers at once
+           - the dwrr of all dates and tickers is solved at once
+
+        Parameters
+        ----------
+        dates : list (optional)
+            the dates the performance should be as of
+        freq : str (default is "ME")
+            the frequency of dates from the min to max date when dates are not
+            provided e.g. "ME" for month end
+        tx_hist_df : DataFrame (default is all transactions)
+            dataframe to get return percent from
+
+        Returns
+        -------
+        performance : DataFrame
+            the performance of individual assets as well as portfolio indexed
+            by date and ticker, with the same columns as `get_performance`
+
+        """
+        if tx_hist_df is None:
+            tx_hist_df = self.transactions_history
+        if dates is None and freq is None:
+            raise ValueError("either dates or freq should be provided")
+
+        # dates are moved to the closest prior stock date in the history
+        history_dates = np.sort(tx_hist_df["date"].unique())
+        if dates is None:
+            dates = pd.date_range(history_dates[0], history_dates[-1], freq=freq)
+        dates = pd.DatetimeIndex([pd.to_datetime(d) for d in dates]).to_numpy()
+        if (dates > self._max_date).any():
+            raise ValueError(
+                f"date {dates.max()} is greater than max date {self._max_date} please "
+                f"provide a date less than max date."
+            )
+        date_idx = np.searchsorted(history_dates, dates, side="right") - 1
+        dates = np.unique(history_dates[date_idx[date_idx >= 0]])
+
+        tx_hist_df = tx_hist_df[tx_hist_df["date"] <= dates.max()]
+        if self.sparse_history:
+            tx_hist_df = self._expand_history(tx_hist_df=tx_hist_df, dates=dates)
+        lookback_date = tx_hist_df["date"].min()
+
+        # dwrr of all dates and tickers with valid cash flows
+        series, cf_dates, return_txs, return_div_txs, lengths = (
+            self._get_cash_flows_series(dates=dates, tx_hist_df=tx_hist_df)
+        )
+        return_pcts = self._solve_dwrr(
+            series=series,
+            dates=cf_dates,
+            return_txs=return_txs,
+            return_div_txs=return_div_txs,
+            lengths=lengths,
+        )
+        return_pcts.index.names = ["date", "ticker"]
+
+        performance = tx_hist_df[tx_hist_df["date"].isin(dates)].copy()
+        performance["lookback_date"] = lookback_date
+        performance = performance.set_index(["date", "ticker"]).sort_index()
+        performance = performance.drop(["units", "cost"], axis=1)
+
+        # add in portfolio metrics
+        market_value = performance["market_value"]
+        tickers = performance.index.get_level_values("ticker")
+        portfolio_rows = tickers == "portfolio"
+        portfolio_dates = performance.index.get_level_values("date")[portfolio_rows]
+        cash = market_value[tickers.str.contains("Cash")].groupby(level="date").sum()
+        equity = (
+            market_value[~tickers.str.contains("Cash|benchmark|portfolio")]
+            .groupby(level="date")
+            .sum()
+        )
+        performance["cash"] = np.nan
+        performance["equity"] = np.nan
+        performance.loc[portfolio_rows, "cash"] = cash.reindex(
+            portfolio_dates, fill_value=0
+        ).to_numpy()
+        performance.loc[portfolio_rows, "equity"] = equity.reindex(
+            portfolio_dates, fill_value=0
+        ).to_numpy()
+
+        performance = performance.join(return_pcts, how="left")
+
+        # add in simple return percentage
+        performance["simple_pct"] = np.where(
+            (-performance["cumulative_cost"] + performance["realized"]) == 0,
+            np.nan,
+            performance["return"]
+            / (-performance["cumulative_cost"] + performance["realized"]),
+        )
+
+        performance = performance[
+            [
+                "lookback_date",
+                "average_price",
+                "last_price",
+                "cumulative_units",
+                "cumulative_cost",
+                "market_value",
+                "return",
+                "dwrr_pct",
+                "dwrr_ann_pct",
+                "div_dwrr_pct",
+                "div_dwrr_ann_pct",
+                "realized",
+                "unrealized",
+                "cumulative_dividend",
+                "simple_pct",
+                "cash",
+                "equity",
+            ]
+        ]
+
+        return performance
+
+    def get_twrr_series(self, lookback: Optional[int] = None) -> pd.DataFrame:
+        """
+        Get the daily time weighted return of the portfolio and benchmarks.
+
+        The daily returns are chain linked into a cumulative return, which is
+        not changed by the cash flows. The daily returns are cached per history
+        version.
+
+        Notes
+        -----
+           Time Weighted Return (TWRR)
+              This is non-annualized and cash flows are at the start of the day
+              Formula is:
+              r_t = change in return / (market value - change in return)
+              TWRR = (1 + r1) * (1 + r2) * ... * (1 + rn) - 1
+
+        Parameters
+        ----------
+        lookback : int (default is None)
+            the number of days to look back (uses a calendar day and not stock)
+
+        Returns
+        -------
+        twrr_series : DataFrame
+            the cumulative time weighted return on each date
+               - portfolio
+               - benchmarks
+
+        """
+        twrr_returns = self._get_twrr_returns()
+        benchmarks = [col for col in twrr_returns.columns if "benchmark" in col]
+        twrr_returns = twrr_returns[["portfolio", *benchmarks]]
+
+        if lookback is not None:
+            lookback = convert_lookback(lookback)
+            start_date = self._get_lookback_dates(
+                lookbacks=[lookback], end_date=self._max_date
+            )[0]
+            twrr_returns = twrr_returns[twrr_returns.index >= start_date].copy()
+            twrr_returns.iloc[0] = 0
+
+        twrr_series = (1 + twrr_returns).cumprod() - 1
+
+        return twrr_series
+
+    def _get_twrr_returns(self) -> pd.DataFrame:
+        """
+        Get the daily time weighted returns of the transactions history.
+
+        The change in return is the gain of the day, as the cash flows change
+        the market value and cumulative cost by the same amount. The market
+        value less the gain is the start value plus the cash flows.
+
+        Returns
+        -------
+        twrr_returns : DataFrame
+            the daily return of each ticker and the portfolio on each date
+
+        """
+        if self._twrr_returns is not None:
+            return self._twrr_returns
+
+        views = self.get_views(views=["market_value", "return"])
+        market_value = views["market_value"].fillna(0)
+        returns = views["return"].fillna(0)
+        gain = returns.diff().fillna(returns)
+        start_value = market_value - gain
+        self._twrr_returns = (gain / start_value.where(start_value > 0)).fillna(0)
+
+        return self._twrr_returns
+
+    def _get_summary(
         self,
+        date: Optional[datetime.date] = None,
+        lookbacks: Optional[List[int]] = None,
+    ) -> pd.DataFrame:
+        """
+        Get the portfolio and benchmark performance for a number of lookbacks.
+
+        This is the portfolio row of `get_performance` for each lookback, but
+        only the portfolio and benchmark are calculated:
+           - the history is filtered to the date once for all lookbacks
+           - the changes of the portfolio are looked up in the lookback index
+           - the cash and equity don't change with the lookback
+           - the dwrr of all lookbacks is solved at once
+
+        Parameters
+        ----------
+        date : date (default is max date)
+            the date the performance should be as of
+        lookbacks : list (optional)
+            the number of days to look back (uses a calendar day and not stock)
+
+        Returns
+        -------
+        summary : DataFrame
+            the performance of the portfolio indexed by lookback
+               - date
+               - lookback_date
+               - market_value
+               - equity
+               - cash
+               - cumulative_cost
+               - return
+               - realized
+               - unrealized
+               - cumulative_dividend
+               - benchmark
+               - dwrr_pct
+               - div_dwrr_pct
+               - benchmark_dwrr_pct
+
+        """
+        if lookbacks is None:
+            lookbacks = []
+        if date is None:
+            date = self._max_date
+        date = pd.to_datetime(check_stock_dates(date, fix=True)["fix_tx_df"]["date"])[0]
+        if date > self._max_date:
+            raise ValueError(
+                f"date {date} is greater than max date {self._max_date} please "
+                f"provide a date less than max date."
+            )
+
+        tx_hist_df = self.transactions_history
+        tx_hist_df = tx_hist_df[tx_hist_df["date"] <= date]
+        current = tx_hist_df[tx_hist_df["date"] == date]
+        market_value = current.set_index("ticker")["market_value"]
+        cash = market_value[market_value.index.str.contains("Cash")].sum()
+        equity = market_value[
+            ~market_value.index.str.contains("Cash|benchmark|portfolio")
+        ].sum()
+
+        # the first benchmark in the performance is used in the summary
+        benchmarks = market_value.index[market_value.index.str.contains("benchmark")]
+        benchmark = benchmarks[0] if len(benchmarks) else None
+        summary_tickers = ["portfolio"]
+        if benchmark is not None:
+            summary_tickers.append(benchmark)
+        summary_df = tx_hist_df[tx_hist_df["ticker"].isin(summary_tickers)]
+
+        # the lookbacks share the history and the calendar, and the changes of
+        # the portfolio are from the lookback index
+        lookback_dates = self._get_lookback_dates(lookbacks=lookbacks, end_date=date)
+        changes = self._get_window_changes(start_dates=lookback_dates, end_date=date)
+        portfolio_current = current[current["ticker"] == "portfolio"].iloc[0]
+        rows = []
+        cash_flows = []
+        for window, (lookback, lookback_date) in enumerate(
+            zip(lookbacks, lookback_dates, strict=True)
+        ):
+            lookback_df = self._adjust_lookback_vars(
+                summary_df[summary_df["date"] >= lookback_date].copy()
+            )
+            portfolio_row = changes.loc[(window, "portfolio")]
+            rows.append(
+                {
+                    "lookback": lookback,
+                    "date": date,
+                    "lookback_date": lookback_df["date"].min(),
+                    "market_value": portfolio_current["market_value"],
+                    "equity": equity,
+                    "cash": cash,
+                    "cumulative_cost": portfolio_current["cumulative_cost"],
+                    "return": portfolio_row["return"],
+                    "realized": portfolio_row["realized"],
+                    "unrealized": portfolio_row["unrealized"],
+                    "cumulative_dividend": portfolio_row["cumulative_dividend"],
+                    "benchmark": None if benchmark is None else benchmark.split("-")[1],
+                }
+            )
+            lookback_cash_flows = self._get_cash_flows(
+                date=date, tx_hist_df=lookback_df
+            )
+            cash_flows.append(lookback_cash_flows.assign(lookback=lookback))
+        summary = pd.DataFrame(rows).set_index("lookback")
+        cash_flows = pd.concat(cash_flows, ignore_index=True)
+
+        # dwrr of all lookbacks with valid cash flows
+        return_pcts = self._calc_dwrr(cash_flows=cash_flows, by=["lookback", "ticker"])
+        return_pcts = return_pcts.reindex(
+            pd.MultiIndex.from_product([lookbacks, summary_tickers])
+        )
+        summary["dwrr_pct"] = return_pcts.xs("portfolio", level=1)["dwrr_pct"]
+        summary["div_dwrr_pct"] = return_pcts.xs("portfolio", level=1)["div_dwrr_pct"]
+        summary["benchmark_dwrr_pct"] = (
+            np.nan
+            if benchmark is None
+            else return_pcts.xs(benchmark, level=1)["dwrr_pct"]
+        )
+
+        return summary
+
+    @staticmethod
+    def load_transaction_file(
         tx_file: str,
     ) -> str:
         """
@@ -287,11 +1639,14 @@ class Portfolio:
         other_fields: Optional[List[str]] = None,
         username: Optional[str] = None,
         password: Optional[str] = None,
+        ledger: Optional[pd.DataFrame] = None,
     ) -> pd.DataFrame:
         """
         Get the transactions made.
 
-        The current implementation supports csv, webdav, and xlsx files.
+        The current implementation supports csv, webdav, xlsx, parquet, and
+        feather files. Only the fields used are read and the type and broker
+        filters are applied as the file is read.
 
         Parameters
         ----------
@@ -306,6 +1661,8 @@ class Portfolio:
             username for downloading transactions
         password : str (optional)
             password for downloading transactions
+        ledger : DataFrame (optional)
+            transactions already read from the file to filter instead of the file
 
         Returns
         -------
@@ -324,37 +1681,23 @@ class Portfolio:
         if password is None:
             password = ""
 
-        try:
-            if username and password:
-                logger.info("using username and password")
-                response = requests.get(self.file, auth=(username, password))
-                if response.status_code == 200:
-                    data = StringIO(response.text)
-                    transactions = pd.read_csv(data, parse_dates=["date"])
-                else:
-                    raise ValueError(f"Failed to retrieve file: {response.status_code}")
-            elif self.file.endswith(".csv"):
-                transactions = pd.read_csv(self.file, parse_dates=["date"])
-            elif self.file.endswith(".xlsx"):
-                transactions = pd.read_excel(self.file, engine="openpyxl")
-            else:
-                raise ValueError(f"Unsupported file format for {self.file}")
-        except FileNotFoundError as err:
-            raise FileNotFoundError(f"File not found at {self.file}") from err
-        except Exception as err:
-            raise ValueError(f"Error loading file: {err}") from err
-
-        logger.info(f"there are {len(transactions)} transactions in file")
-
-        cols = ["date", "ticker", "type", "units", "cost", *other_fields]
-        missing_cols = set(cols) - set(transactions.columns)
-        if missing_cols:
-            raise ValueError(f"Missing columns in file: {missing_cols}")
+        cols = [*TX_COLUMNS, *other_fields]
+        if ledger is None:
+            transactions = _read_transactions(
+                file_path=self.file,
+                cols=cols,
+                filter_type=filter_type,
+                filter_broker=filter_broker,
+                username=username,
+                password=password,
+            )
+        else:
+            transactions = _filter_transactions(
+                ledger, filter_type=filter_type, filter_broker=filter_broker
+            )
 
+        logger.info(f"there are {len(transactions)} filtered transactions in file")
         transactions = transactions[cols]
-        transactions = transactions[~transactions["type"].isin(filter_type)]
-        if filter_broker:
-            transactions = transactions[transactions["broker"].isin(filter_broker)]
 
         # raise error if length of transactions is 0
         if len(transactions) == 0:
@@ -366,13 +1709,14 @@ class Portfolio:
         # handle multiple transactions on same day by grouping
         transactions = (
             transactions.groupby(
-                by=["date", "ticker", "type", *other_fields], dropna=False
+                by=["date", "ticker", "type", *other_fields],
+                dropna=False,
+                observed=True,
             )
             .sum()
             .reset_index()
         )
 
-        transactions["date"] = pd.to_datetime(transactions["date"], format="%m/%d/%Y")
         transactions["date"] = convert_date_to_timezone(
             transactions["date"], timezone=None
         )
@@ -387,8 +1731,7 @@ class Portfolio:
         transactions = transactions[[*cols, "price"]]
 
         logger.info(
-            f"after filtering and grouping there are {len(transactions)} transactions "
-            "in file"
+            f"after grouping there are {len(transactions)} transactions in file"
         )
 
         return transactions
@@ -399,6 +1742,7 @@ class Portfolio:
         price_history: Optional[pd.DataFrame] = None,
         other_fields: Optional[List[str]] = None,
         benchmarks: Optional[List[str]] = None,
+        sparse: bool = False,
     ) -> pd.DataFrame:
         """
         Get the history of stock transcations by merging transaction and price history.
@@ -413,6 +1757,9 @@ class Portfolio:
             additional fields to include
         benchmarks : list (optional)
             list of tickers to add as benchmarks
+        sparse : bool (default is False)
+            whether a ticker only has rows while it is held or has a transaction,
+            the portfolio and benchmarks still have a row on each date
 
         Returns
         -------
@@ -431,7 +1778,10 @@ class Portfolio:
         transactions = tx_df[(tx_df["cost"] != 0) | (tx_df["units"] != 0)]
         transactions = self._add_cash_tx(tx_df=transactions, other_fields=other_fields)
         transactions_history = self._add_price_history(
-            tx_df=transactions, price_history=price_history, other_fields=other_fields
+            tx_df=transactions,
+            price_history=price_history,
+            other_fields=other_fields,
+            sparse=sparse,
         )
         transactions_history = self._add_dividend(
             tx_df=transactions,
@@ -439,12 +1789,19 @@ class Portfolio:
             other_fields=other_fields,
         )
         transactions_history = self._calc_tx_metrics(tx_hist_df=transactions_history)
-        transactions_history = self._add_portfolio(tx_hist_df=transactions_history)
+        portfolio_dates = None
+        if sparse:
+            portfolio_dates = price_history.loc[
+                price_history["ticker"].isin(transactions["ticker"].unique()), "date"
+            ].unique()
+        transactions_history = self._add_portfolio(
+            tx_hist_df=transactions_history, dates=portfolio_dates
+        )
 
-        for benchmark in benchmarks:
-            benchmark_history = self._add_benchmark(
+        if benchmarks:
+            benchmark_history = self._add_benchmarks(
                 tx_df=tx_df,
-                ticker=benchmark,
+                tickers=benchmarks,
                 price_history=price_history,
                 other_fields=other_fields,
             )
@@ -485,25 +1842,83 @@ class Portfolio:
         view_df : DataFrame
 
         """
+        return self.get_views(views=[view], tx_hist_df=tx_hist_df, lookback=lookback)[
+            view
+        ]
+
+    def get_views(
+        self,
+        views: List[str],
+        tx_hist_df: Optional[pd.DataFrame] = None,
+        lookback: Optional[int] = None,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Get a number of views of the portfolio.
+
+        The views that are not cached are built from a single pivot table. Views
+        of self.transactions_history are cached by view, lookback and history
+        version, keeping the most recently used VIEW_CACHE_SIZE views.
+
+        Parameters
+        ----------
+        views : list
+            columns to sum over on the portfolio dataframe
+               - e.g. ["market_value", "return", "cumulative_cost", "realized"]
+        tx_hist_df : DataFrame (default is self.transactions_history)
+            dataframe to get return percent from, which is not cached
+        lookback : int (default is None)
+            the number of days to look back (uses a calendar day and not stock)
+
+        Returns
+        -------
+        view_dfs : dict
+            the view DataFrame of each view
+
+        """
+        use_cache = tx_hist_df is None
         if tx_hist_df is None:
             tx_hist_df = self.transactions_history
         if lookback is not None:
             lookback = convert_lookback(lookback)
-            tx_hist_df = self._filter_lookback(
-                lookback=lookback, adjust_vars=True, tx_hist_df=tx_hist_df
-            )
-        if not isinstance(tx_hist_df, pd.DataFrame):
-            raise ValueError("tx_hist_df should be a DataFrame")
-        cols = ["ticker", "date", view]
-        view_df = tx_hist_df[cols]
-        view_df = view_df.pivot_table(
-            index="date", columns="ticker", values=view, aggfunc="sum"
-        )
-        view_df["portfolio"] = view_df.loc[
-            :, ~view_df.columns.str.contains("benchmark|portfolio")
-        ].sum(axis=1)
 
-        return view_df
+        view_dfs = {}
+        if use_cache:
+            for view in views:
+                key = (view, lookback, self._history_version)
+                if key in self._view_cache:
+                    self._view_cache.move_to_end(key)
+                    view_dfs[view] = self._view_cache[key]
+        missing_views = [view for view in dict.fromkeys(views) if view not in view_dfs]
+
+        if missing_views:
+            if lookback is not None:
+                tx_hist_df = self._filter_lookback(
+                    lookback=lookback, adjust_vars=True, tx_hist_df=tx_hist_df
+                )
+            if not isinstance(tx_hist_df, pd.DataFrame):
+                raise ValueError("tx_hist_df should be a DataFrame")
+            pivot_df = tx_hist_df.pivot_table(
+                index="date",
+                columns="ticker",
+                values=missing_views,
+                aggfunc="sum",
+                observed=True,
+            )
+            for view in missing_views:
+                view_df = pivot_df[view].copy()
+                if self.sparse_history and view not in FLOW_COLUMNS:
+                    # tickers keep the value of their last row between rows
+                    view_df = view_df.ffill()
+                view_df["portfolio"] = view_df.loc[
+                    :, ~view_df.columns.str.contains("benchmark|portfolio")
+                ].sum(axis=1)
+                view_dfs[view] = view_df
+                if use_cache:
+                    self._view_cache[(view, lookback, self._history_version)] = view_df
+                    if len(self._view_cache) > VIEW_CACHE_SIZE:
+                        self._view_cache.popitem(last=False)
+
+        return {view: view_dfs[view].copy() for view in views}
 
     def check_tx(
         self,
@@ -708,7 +2123,12 @@ class Portfolio:
 
         return portfolio_checks_failed
 
-    def _get_price_history(self, history_offline: Optional[str] = None) -> pd.DataFrame:
+    def _get_price_history(
+        self,
+        history_offline: Optional[str] = None,
+        history_store: Optional[Union[str, bool]] = None,
+        stock_history: Optional[pd.DataFrame] = None,
+    ) -> pd.DataFrame:
         """
         Get the history of prices.
 
@@ -717,6 +2137,12 @@ class Portfolio:
         history_offline : str (optional)
             location of the csv price history. This is useful when not connected
             to internet and the price history is already available.
+        history_store : str or bool (optional)
+            directory of the local price store, which only downloads the prices
+            that are not already stored. If True the default directory is used.
+        stock_history : DataFrame (optional)
+            stock history that was already downloaded for a set of tickers that
+            includes the portfolio tickers e.g. shared by the Manager
 
         Returns
         -------
@@ -743,18 +2169,27 @@ class Portfolio:
             return price_history
 
         # if price history isn't offline, download from yahoo finance
-        logger.info("Downloading price history from yahoo finance")
-        tickers = [
-            tick
-            for tick in self.tickers
-            if tick not in self.funds + self.delisted + ["Cash"]
-        ] + self.benchmarks
+        tickers = self._get_stock_tickers()
 
         if self.benchmarks:
             logger.info(f"Adding {self.benchmarks} as a benchmark")
 
-        wrapper = Yahoo()
-        price_history = wrapper.stock_history(tickers=tickers, min_year=self._min_year)
+        if stock_history is not None:
+            logger.info("Using price history that was already downloaded")
+            price_history = self._filter_stock_history(
+                stock_history=stock_history, tickers=tickers
+            )
+        else:
+            logger.info("Downloading price history from yahoo finance")
+            if history_store:
+                wrapper = PriceStore(
+                    path=None if history_store is True else history_store
+                )
+            else:
+                wrapper = Yahoo()
+            price_history = wrapper.stock_history(
+                tickers=tickers, min_year=self._min_year
+            )
 
         # adding fund price history
         transactions = self.transactions
@@ -793,8 +2228,14 @@ class Portfolio:
                 on=["date", "ticker"],
             )
 
-            fund_hist_df = fund_hist_df.groupby(["date", "ticker"]).min().reset_index()
-            fund_hist_df[["price"]] = fund_hist_df.groupby("ticker")[["price"]].ffill()
+            fund_hist_df = (
+                fund_hist_df.groupby(["date", "ticker"], observed=True)
+                .min()
+                .reset_index()
+            )
+            fund_hist_df[["price"]] = fund_hist_df.groupby("ticker", observed=True)[
+                ["price"]
+            ].ffill()
             fund_hist_df = fund_hist_df.rename(columns={"price": "last_price"})
             price_history = pd.concat([price_history, fund_hist_df])
 
@@ -811,9 +2252,9 @@ class Portfolio:
 
         # add in stock splits
         price_history["stock_splits"] = price_history["stock_splits"].replace(0, 1)
-        price_history["cumulative_stock_splits"] = price_history.groupby("ticker")[
-            "stock_splits"
-        ].cumprod()
+        price_history["cumulative_stock_splits"] = price_history.groupby(
+            "ticker", observed=True
+        )["stock_splits"].cumprod()
 
         # check if there are any missing values for a ticker in price history
         pivot = price_history.pivot(index="date", columns="ticker", values="last_price")
@@ -831,11 +2272,64 @@ class Portfolio:
 
         return price_history
 
+    def _get_stock_tickers(self) -> List[str]:
+        """
+        Get the tickers that need price history from yahoo finance.
+
+        Returns
+        -------
+        tickers : list
+            the tickers of the portfolio that are not funds, delisted, or cash
+            and the benchmarks
+
+        """
+        tickers = [
+            tick
+            for tick in self.tickers
+            if tick not in self.funds + self.delisted + ["Cash"]
+        ] + self.benchmarks
+
+        return tickers
+
+    def _filter_stock_history(
+        self, stock_history: pd.DataFrame, tickers: List[str]
+    ) -> pd.DataFrame:
+        """
+        Filter stock history to what would be downloaded for the tickers.
+
+        Parameters
+        ----------
+        stock_history : DataFrame
+            stock history that includes the tickers
+        tickers : list
+            the tickers to filter to
+
+        Returns
+        -------
+        stock_data : DataFrame
+            the stock history of the tickers from the min year of the portfolio
+            with the dates that have a price for at least one of the tickers
+
+        """
+        missing_tickers = set(tickers) - set(stock_history["ticker"].unique())
+        if missing_tickers:
+            raise ValueError(f"Stock history is missing tickers {missing_tickers}")
+
+        stock_data = stock_history[
+            stock_history["ticker"].isin(tickers)
+            & (stock_history["date"] >= datetime.datetime(self._min_year, 1, 1))
+        ]
+        price_dates = stock_data.loc[stock_data["last_price"].notna(), "date"]
+        stock_data = stock_data[stock_data["date"].isin(price_dates)]
+
+        return stock_data
+
     def _add_price_history(
         self,
         tx_df: pd.DataFrame,
         price_history: pd.DataFrame,
         other_fields: Optional[List[str]] = None,
+        sparse: bool = False,
     ) -> pd.DataFrame:
         """
         Add price history to transactions DataFrame.
@@ -848,6 +2342,8 @@ class Portfolio:
             Price history DataFrame
         other_fields : list (optional)
             additional fields to include
+        sparse : bool (default is False)
+            whether to only add the price history while the ticker is held
 
         Returns
         -------
@@ -858,13 +2354,16 @@ class Portfolio:
         if other_fields is None:
             other_fields = []
 
+        # dates with a transaction or dividend keep the price history
+        activity = pd.MultiIndex.from_frame(tx_df[["ticker", "date"]])
+
         # remove dividend transactions
         tx_df = tx_df[tx_df["type"] != "DIVIDEND"].copy()
 
         tickers = list(tx_df["ticker"].unique())
 
         tx_df = (
-            tx_df.groupby(by=["date", "ticker", *other_fields])
+            tx_df.groupby(by=["date", "ticker", *other_fields], observed=True)
             .sum(numeric_only=True)
             .reset_index()
         )
@@ -876,6 +2375,10 @@ class Portfolio:
         )
 
         price_history = price_history[price_history["ticker"].isin(tickers)]
+        if sparse:
+            price_history = self._filter_held_history(
+                price_history=price_history, tx_df=tx_df, activity=activity
+            )
 
         tx_hist_df = pd.merge(
             price_history,
@@ -890,7 +2393,9 @@ class Portfolio:
             tx_hist_df["price"],
             tx_hist_df["last_price"],
         )
-        tx_hist_df["last_price"] = tx_hist_df.groupby("ticker")["last_price"].ffill()
+        tx_hist_df["last_price"] = tx_hist_df.groupby("ticker", observed=True)[
+            "last_price"
+        ].ffill()
         tx_hist_df = tx_hist_df.fillna(0)
 
         # sort values descending
@@ -903,8 +2408,66 @@ class Portfolio:
 
         return tx_hist_df
 
+    def _filter_held_history(
+        self,
+        price_history: pd.DataFrame,
+        tx_df: pd.DataFrame,
+        activity: pd.MultiIndex,
+    ) -> pd.DataFrame:
+        """
+        Filter the price history to the dates the tickers are held.
+
+        The units held on a date are the units of the transactions on or before
+        the date, so the transaction that closes a position is the last row of
+        the span it closes.
+
+        Parameters
+        ----------
+        price_history : DataFrame
+            Price history DataFrame
+        tx_df : DataFrame
+            Transactions that change the units held
+        activity : MultiIndex
+            ticker and date pairs that are kept even if the ticker is not held
+
+        Returns
+        -------
+        price_history : DataFrame
+            Price history of the tickers while they are held
+
+        """
+        held_units = (
+            tx_df.groupby(["ticker", "date"], observed=True)["units"]
+            .sum()
+            .groupby(level="ticker", observed=True)
+            .cumsum()
+            .rename("held_units")
+            .reset_index()
+            .sort_values("date")
+        )
+        held_units["ticker"] = held_units["ticker"].astype(
+            price_history["ticker"].dtype
+        )
+        held = pd.merge_asof(
+            price_history[["ticker", "date"]]
+            .assign(position=np.arange(len(price_history)))
+            .sort_values("date"),
+            held_units,
+            on="date",
+            by="ticker",
+        )
+        held = held.sort_values("position")["held_units"].to_numpy()
+        is_active = pd.MultiIndex.from_frame(price_history[["ticker", "date"]]).isin(
+            activity
+        )
+
+        return price_history[(~np.isnan(held) & (held != 0)) | is_active]
+
     def _add_cash_tx(
-        self, tx_df: pd.DataFrame, other_fields: Optional[List[str]] = None
+        self,
+        tx_df: pd.DataFrame,
+        other_fields: Optional[List[str]] = None,
+        cash: Optional[bool] = None,
     ) -> pd.DataFrame:
         """
         Add cash transactions to transactions DataFrame.
@@ -915,6 +2478,9 @@ class Portfolio:
             Transactions to calculate metrics on
         other_fields : list (optional)
             additional fields to include
+        cash : bool (optional)
+            whether the portfolio has cash, default is if `Cash` is a ticker of
+            the transactions
 
         Returns
         -------
@@ -925,10 +2491,11 @@ class Portfolio:
         if other_fields is None:
             other_fields = []
 
-        tickers = list(tx_df["ticker"].unique())
+        if cash is None:
+            cash = "Cash" in list(tx_df["ticker"].unique())
 
         # create cash transactions from stock purchases
-        if "Cash" in tickers:
+        if cash:
             non_cash_tx = tx_df[tx_df["ticker"] != "Cash"].copy()
             non_cash_tx["ticker"] = "Cash"
             non_cash_tx["type"] = "Cash"
@@ -1031,7 +2598,7 @@ class Portfolio:
         dividends = tx_df[tx_df["type"] == "DIVIDEND"]
 
         dividends = (
-            dividends.groupby(by=["date", "ticker", *other_fields])
+            dividends.groupby(by=["date", "ticker", *other_fields], observed=True)
             .sum(numeric_only=True)
             .reset_index()
         )
@@ -1087,13 +2654,13 @@ class Portfolio:
         tx_hist_df = tx_hist_df.sort_values(by=["ticker", "date"], ascending=True)
 
         # cumulative amounts
-        tx_hist_df["cumulative_units"] = tx_hist_df.groupby("ticker")[
+        tx_hist_df["cumulative_units"] = tx_hist_df.groupby("ticker", observed=True)[
             "units"
         ].transform(pd.Series.cumsum)
-        tx_hist_df["cumulative_cost_without_dividend"] = tx_hist_df.groupby("ticker")[
-            "cost"
-        ].transform(pd.Series.cumsum)
-        tx_hist_df["cumulative_dividend"] = tx_hist_df.groupby("ticker")[
+        tx_hist_df["cumulative_cost_without_dividend"] = tx_hist_df.groupby(
+            "ticker", observed=True
+        )["cost"].transform(pd.Series.cumsum)
+        tx_hist_df["cumulative_dividend"] = tx_hist_df.groupby("ticker", observed=True)[
             "dividend"
         ].transform(pd.Series.cumsum)
         # adding dividends profit to cumulative cost
@@ -1103,12 +2670,71 @@ class Portfolio:
         )
 
         # average price
-        tx_hist_df = tx_hist_df.groupby("ticker", group_keys=False).apply(
-            self._calc_average_price_speed
-        )
+        tx_hist_df = self._calc_average_prices(tx_hist_df)
 
         tx_hist_df.loc[tx_hist_df["ticker"] == "Cash", "average_price"] = 1
 
+        return self._calc_value_metrics(tx_hist_df)
+
+    def _continue_tx_metrics(
+        self, tx_hist_df: pd.DataFrame, last_rows: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Calculate metrics on transactions history that continues from last rows.
+
+        Each last row is added as a transaction of its cumulative amounts at its
+        average price, so the cumulative amounts and average price continue
+        from the last known state of the ticker.
+
+        Parameters
+        ----------
+        tx_hist_df : DataFrame
+            Transactions history after the last rows to calculate metrics on
+        last_rows : DataFrame
+            the last row of each ticker before the transactions history
+
+        Returns
+        -------
+        transaction_metrics : DataFrame
+            DataFrame containing updated metrics
+
+        """
+        state_rows = last_rows[["ticker", "date", "last_price"]].copy()
+        state_rows["units"] = last_rows["cumulative_units"].fillna(0)
+        state_rows["cost"] = last_rows["cumulative_cost_without_dividend"].fillna(0)
+        state_rows["dividend"] = last_rows["cumulative_dividend"].fillna(0)
+        state_rows["price"] = last_rows["average_price"].fillna(0)
+        state_rows["is_state"] = True
+
+        tx_hist_df = pd.concat(
+            [state_rows, tx_hist_df.assign(is_state=False)], ignore_index=True
+        )
+        tx_hist_df = self._calc_tx_metrics(tx_hist_df)
+        transaction_metrics = tx_hist_df[~tx_hist_df["is_state"]].drop(
+            columns="is_state"
+        )
+
+        return transaction_metrics
+
+    def _calc_value_metrics(self, tx_hist_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calculate the value metrics from the cumulative metrics and last price.
+
+        Parameters
+        ----------
+        tx_hist_df : DataFrame
+            Transactions history with the cumulative amounts and average price
+
+        Returns
+        -------
+        transaction_metrics : DataFrame
+            DataFrame containing updated metrics
+            - market_value
+            - return
+            - unrealized
+            - realized
+
+        """
         # market value
         tx_hist_df["market_value"] = (
             tx_hist_df["cumulative_units"] * tx_hist_df["last_price"]
@@ -1154,15 +2780,19 @@ class Portfolio:
 
         return transaction_metrics
 
-    def _add_benchmark(
+    def _add_benchmarks(
         self,
         tx_df: pd.DataFrame,
-        ticker: str,
+        tickers: List[str],
         price_history: Optional[pd.DataFrame] = None,
         other_fields: Optional[List[str]] = None,
     ) -> pd.DataFrame:
         """
-        Add a benchmark with transaction history dataframe.
+        Add benchmarks with transaction history dataframe.
+
+        The cash transactions are grouped once and repeated for each benchmark,
+        so all of the benchmarks are merged with their price history and have
+        their metrics calculated together.
 
         Notes
         -----
@@ -1173,8 +2803,8 @@ class Portfolio:
         ----------
         tx_df : DataFrame
             Transactions to calculate metrics on
-        ticker : str
-            The ticker to create the benchmark for
+        tickers : list
+            The tickers to create the benchmarks for
         price_history : DataFrame (default is self.price_history)
             Price history DataFrame
         other_fields : list (default is None)
@@ -1183,7 +2813,7 @@ class Portfolio:
         Returns
         -------
         benchmark_tx_hist : DataFrame
-            DataFrame containing transaction history for dataframe
+            DataFrame containing transaction history of the benchmarks
 
         """
         if other_fields is None:
@@ -1193,33 +2823,37 @@ class Portfolio:
 
         tx_df = tx_df.copy()
         transactions = tx_df[(tx_df["cost"] != 0) | (tx_df["units"] != 0)]
-        benchmark_tx = transactions[transactions["ticker"] == "Cash"].copy()
-        if benchmark_tx.empty:
+        cash_tx = transactions[transactions["ticker"] == "Cash"].copy()
+        if cash_tx.empty:
             logger.warning(
                 "There were no transactions in benchmark. Please include cash "
                 "transactions"
             )
 
         # add benchmark from cash transactions
-        benchmark_tx["ticker"] = ticker
-        benchmark_tx["cost"] = -benchmark_tx["cost"]
-
-        benchmark_tx = (
-            benchmark_tx.groupby(by=["date", "ticker", *other_fields])
-            .sum(numeric_only=True)
+        cash_tx["cost"] = -cash_tx["cost"]
+        cash_tx = (
+            cash_tx.groupby(by=["date", *other_fields], observed=True)[
+                ["units", "cost"]
+            ]
+            .sum()
             .reset_index()
         )
-
-        benchmark_tx["price"] = np.where(
-            benchmark_tx["units"] == 0,
+        cash_tx["price"] = np.where(
+            cash_tx["units"] == 0,
             0,
-            benchmark_tx["cost"] / benchmark_tx["units"] * -1,
+            cash_tx["cost"] / cash_tx["units"] * -1,
         )
 
         # assuming that there are 0 dividends from benchmark
-        benchmark_tx["dividend"] = 0
+        cash_tx["dividend"] = 0
 
-        price_history = price_history[price_history["ticker"] == ticker]
+        # the cash transactions are the same for each benchmark
+        benchmark_tx = pd.concat(
+            [cash_tx.assign(ticker=ticker) for ticker in tickers], ignore_index=True
+        )
+        price_history = price_history[price_history["ticker"].isin(tickers)].copy()
+        price_history["ticker"] = price_history["ticker"].astype(str)
 
         benchmark_tx_hist = (
             pd.merge(
@@ -1259,21 +2893,28 @@ class Portfolio:
         # fill in other_fields null values
         for field in other_fields:
             benchmark_tx_hist[field] = benchmark_tx_hist[field].replace(0, np.nan)
-            benchmark_tx_hist[field] = benchmark_tx_hist.groupby(
-                ["ticker"], group_keys=False
-            )[field].apply(lambda x: x.ffill().bfill())
+            benchmark_tx_hist[field] = benchmark_tx_hist.groupby("ticker")[
+                field
+            ].ffill()
+            benchmark_tx_hist[field] = benchmark_tx_hist.groupby("ticker")[
+                field
+            ].bfill()
 
         # sort values descending
         benchmark_tx_hist = benchmark_tx_hist.sort_values(
             by=["ticker", "date"], ascending=False
         )
-        benchmark_tx_hist["ticker"] = "benchmark-" + ticker
+        benchmark_tx_hist["ticker"] = "benchmark-" + benchmark_tx_hist["ticker"]
 
         benchmark_tx_hist = self._calc_tx_metrics(benchmark_tx_hist)
 
         return benchmark_tx_hist
 
-    def _add_portfolio(self, tx_hist_df: pd.DataFrame) -> pd.DataFrame:
+    def _add_portfolio(
+        self,
+        tx_hist_df: pd.DataFrame,
+        dates: Optional[List[datetime.date]] = None,
+    ) -> pd.DataFrame:
         """
         Add the portfolio with transaction history dataframe.
 
@@ -1281,6 +2922,9 @@ class Portfolio:
         ----------
         tx_hist_df : DataFrame
             Transactions history
+        dates : list (optional)
+            dates of a sparse transactions history the portfolio should have a
+            row on, where tickers without a row keep the values of their last row
 
         Returns
         -------
@@ -1288,30 +2932,39 @@ class Portfolio:
             DataFrame containing portfolio transaction history
 
         """
-        portfolio_tx_hist = pd.DataFrame()
         if tx_hist_df is None:
             tx_hist_df = self.transactions_history
-        views = [
-            "cost",
-            "cumulative_cost",
-            "cumulative_cost_without_dividend",
-            "market_value",
-            "return",
-            "unrealized",
-            "realized",
-            "dividend",
-            "cumulative_dividend",
-        ]
-        for view in views:
-            cols = ["ticker", "date", view]
-            view_df = tx_hist_df[cols]
-            view_df = view_df.pivot_table(
-                index="date", columns="ticker", values=view, aggfunc="sum"
-            )
-            view_df["portfolio"] = view_df.loc[
-                :, ~view_df.columns.str.contains("benchmark")
-            ].sum(axis=1)
-            portfolio_tx_hist[view] = view_df["portfolio"]
+        views = PORTFOLIO_VIEWS
+        # sum all views by date at once, benchmarks are masked out rather than
+        # dropped so dates with only benchmarks are still included
+        is_portfolio = ~tx_hist_df["ticker"].str.contains("benchmark")
+        if dates is None:
+            portfolio_tx_hist = (
+                tx_hist_df[views]
+                .where(is_portfolio, 0)
+                .groupby(tx_hist_df["date"])
+                .sum()
+            )
+        else:
+            # the changes of the tickers are summed by date and accumulated, so
+            # a ticker without a row on a date keeps the values of its last row
+            ticker_df = tx_hist_df.loc[is_portfolio, ["ticker", "date", *views]]
+            ticker_df = ticker_df.sort_values(by=["ticker", "date"])
+            levels = [view for view in views if view not in FLOW_COLUMNS]
+            changes = ticker_df[views].fillna(0)
+            changes[levels] -= (
+                changes[levels]
+                .groupby(ticker_df["ticker"], observed=True)
+                .shift(fill_value=0)
+            )
+            portfolio_tx_hist = changes.groupby(ticker_df["date"]).sum()
+            portfolio_dates = pd.DatetimeIndex(dates).union(
+                pd.DatetimeIndex(tx_hist_df["date"].unique())
+            )
+            portfolio_tx_hist = portfolio_tx_hist.reindex(
+                portfolio_dates, fill_value=0
+            ).rename_axis("date")
+            portfolio_tx_hist[levels] = portfolio_tx_hist[levels].cumsum()
         portfolio_tx_hist["ticker"] = "portfolio"
         portfolio_tx_hist = portfolio_tx_hist.reset_index()
         portfolio_tx_hist = pd.concat([tx_hist_df, portfolio_tx_hist], axis=0)
@@ -1350,45 +3003,97 @@ class Portfolio:
                     ) / df.loc[df.index[i], "cumulative_units"]
         return df
 
-    def _calc_average_price_speed(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _calc_average_prices(self, tx_hist_df: pd.DataFrame) -> pd.DataFrame:
         """
-        Calculate the average cost basis.
+        Calculate the average cost basis of all tickers at once.
+
+        The average price follows the recurrence used in `_calc_average_price`
+        on the rows with units, which can be written as
+        avg[i] = a[i] * avg[i-1] + b[i]:
+           - first transaction of ticker: a = 0, b = price
+           - position closed (cumulative units of 0): a = 0, b = 0
+           - sale (units <= 0): a = 1, b = 0
+           - purchase: a = prev_cum_units / cum_units, b = price * units / cum_units
+
+        Rows where a = 0 start a new segment and within a segment the
+        recurrence is solved with a cumulative product and sum:
+        avg[i] = P[i] * sum(b[j] / P[j]) where P is the cumulative product of a.
+        Partial sales after purchases shrink P, so a row where P falls below
+        1e-100 starts a new segment from the average price before it.
 
         Parameters
         ----------
-        df : DataFrame
-            dataframe to apply calculation to
+        tx_hist_df : DataFrame
+            dataframe sorted by ticker and date to apply calculation to
 
         Returns
         -------
-        df : DataFrame
+        tx_hist_df : DataFrame
             dataframe that includes the "average price"
 
         """
-        df["average_price"] = np.nan
-        tx = df[df["units"] != 0]
-        if len(tx) != 0:
-            tx.loc[tx.index[0], "average_price"] = tx.loc[tx.index[0], "price"]
-        if len(tx) != 1:
-            for i in range(1, len(tx)):
-                if tx.loc[tx.index[i], "cumulative_units"] == 0:
-                    tx.loc[tx.index[i], "average_price"] = 0
-                elif tx.loc[tx.index[i], "units"] <= 0:
-                    tx.loc[tx.index[i], "average_price"] = tx.loc[
-                        tx.index[i - 1], "average_price"
-                    ]
-                else:
-                    tx.loc[tx.index[i], "average_price"] = (
-                        tx.loc[tx.index[i], "price"] * tx.loc[tx.index[i], "units"]
-                        + tx.loc[tx.index[i - 1], "cumulative_units"]
-                        * tx.loc[tx.index[i - 1], "average_price"]
-                    ) / tx.loc[tx.index[i], "cumulative_units"]
-
-        # merge average prices back into df
-        df.update(tx["average_price"])
-        df["average_price"] = df["average_price"].ffill()
-        df.loc[df["cumulative_units"] == 0, "average_price"] = 0
-        return df
+        tickers = tx_hist_df["ticker"].to_numpy()
+        units = tx_hist_df["units"].to_numpy(dtype="float64")
+        price = tx_hist_df["price"].to_numpy(dtype="float64")
+        cumulative_units = tx_hist_df["cumulative_units"].to_numpy(dtype="float64")
+
+        # only rows with units change the average price
+        tx_idx = np.flatnonzero(units != 0)
+        tx_tickers = tickers[tx_idx]
+        tx_units = units[tx_idx]
+        tx_price = price[tx_idx]
+        tx_cum_units = cumulative_units[tx_idx]
+
+        first_tx = np.ones(len(tx_idx), dtype=bool)
+        first_tx[1:] = tx_tickers[1:] != tx_tickers[:-1]
+        prev_cum_units = np.empty(len(tx_idx))
+        if len(tx_idx) != 0:
+            prev_cum_units[0] = np.nan
+            prev_cum_units[1:] = tx_cum_units[:-1]
+
+        # coefficients of the recurrence
+        buy = ~(tx_units <= 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            a = np.where(buy, prev_cum_units / tx_cum_units, 1.0)
+            b = np.where(buy, tx_price * tx_units / tx_cum_units, 0.0)
+        closed = tx_cum_units == 0
+        a[closed] = 0
+        b[closed] = 0
+        a[first_tx] = 0
+        b[first_tx] = tx_price[first_tx]
+
+        # solve the recurrence within each segment
+        reset = a == 0
+        while True:
+            segment = np.cumsum(reset)
+            a_prod = pd.Series(np.where(reset, 1.0, a)).groupby(segment).cumprod()
+            a_prod = a_prod.to_numpy()
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                b_sum = pd.Series(b / a_prod).groupby(segment).cumsum().to_numpy()
+                tx_average_price = a_prod * b_sum
+
+            # rows before the first small product of a segment are solved, so
+            # that row starts a new segment from the average price before it
+            small = ~reset & (np.abs(a_prod) < 1e-100)
+            if not small.any():
+                break
+            restart = small & (pd.Series(small).groupby(segment).cumsum() == 1)
+            restart_idx = np.flatnonzero(restart)
+            b[restart_idx] += a[restart_idx] * tx_average_price[restart_idx - 1]
+            a[restart_idx] = 0
+            reset = a == 0
+
+        average_price = np.full(len(tx_hist_df), np.nan)
+        average_price[tx_idx] = tx_average_price
+
+        # carry average prices forward to rows without units
+        tx_hist_df["average_price"] = average_price
+        tx_hist_df["average_price"] = tx_hist_df.groupby("ticker", observed=True)[
+            "average_price"
+        ].ffill()
+        tx_hist_df.loc[tx_hist_df["cumulative_units"] == 0, "average_price"] = 0
+
+        return tx_hist_df
 
     def _get_return_pct(
         self,
@@ -1668,6 +3373,11 @@ class Portfolio:
         """
         Get the dollar weighted return of transactions.
 
+        The cash flows of all tickers are created in a single pass over the
+        transactions history (see `_get_cash_flows`) and then the returns of all
+        tickers are solved at once (see `_calc_dwrr`). The returns match the
+        ticker calculation in `_get_return_pct`.
+
         Parameters
         ----------
         date : date (optional)
@@ -1687,35 +3397,544 @@ class Portfolio:
             date = self._max_date
         if tx_hist_df is None:
             tx_hist_df = self.transactions_history
+        date = pd.to_datetime(date)
+
+        tickers = list(tx_hist_df["ticker"].unique())
+
+        tx_hist_df = tx_hist_df[tx_hist_df["date"] <= date]
         if lookback is not None:
             lookback = convert_lookback(lookback)
+            tx_hist_df = self._filter_lookback(
+                lookback=lookback, adjust_vars=False, tx_hist_df=tx_hist_df
+            )
 
-        tickers = list(tx_hist_df["ticker"].unique())
+        cash_flows = self._get_cash_flows(date=date, tx_hist_df=tx_hist_df)
+
+        # only tickers with valid cash flows are solved
+        return_pcts = self._calc_dwrr(cash_flows=cash_flows)
+        return_pcts = return_pcts.reindex(pd.Index(tickers, name="ticker"))
+
+        return return_pcts
+
+    def _get_cash_flows(
+        self,
+        date: datetime.date,
+        tx_hist_df: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """
+        Get the cash flows of all tickers used for the dollar weighted return.
+
+        The cash flows are the same as the return transactions in
+        `_get_return_pct` and are created for all tickers at once:
+           - entry: the first date of the ticker
+           - transactions: the dates with cost or dividend
+           - current: the date of the returns
+
+        Parameters
+        ----------
+        date : date
+            date on which to perform the returns as of
+        tx_hist_df : DataFrame
+            transactions history filtered to the dates to use
+
+        Returns
+        -------
+        cash_flows : DataFrame
+            the cash flows of the tickers sorted by ticker and date descending
+               - ticker
+               - date
+               - return_txs
+               - return_div_txs
+
+        """
+        series, dates, return_txs, return_div_txs, lengths = (
+            self._get_cash_flows_series(dates=[date], tx_hist_df=tx_hist_df)
+        )
+        is_flow = np.arange(dates.shape[1]) < lengths[:, None]
+        cash_flows = pd.DataFrame(
+            {
+                "ticker": np.repeat(series["ticker"].to_numpy(), lengths),
+                "date": dates[is_flow].astype("datetime64[ns]"),
+                "return_txs": return_txs[is_flow],
+                "return_div_txs": return_div_txs[is_flow],
+            }
+        )
+
+        return cash_flows
+
+    def _get_cash_flows_series(
+        self,
+        dates: List[datetime.date],
+        tx_hist_df: pd.DataFrame,
+    ) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the cash flows of all tickers for a number of as of dates.
+
+        The entry and transactions cash flows of a ticker are the same for all
+        of the as of dates that are after them, so they are created and sorted
+        once. Each series of an as of date and ticker takes the flows of the
+        ticker up to its date, and only the current cash flow is different for
+        each as of date.
+
+        Parameters
+        ----------
+        dates : list
+            dates on which to perform the returns as of
+        tx_hist_df : DataFrame
+            transactions history filtered to the dates to use
+
+        Returns
+        -------
+        series : DataFrame
+            the series sorted by as of date and ticker
+               - as_of_date
+               - ticker
+        dates : ndarray
+            the dates of the cash flows of each series, date descending and
+            padded with zeros
+        return_txs : ndarray
+            the cash flows of equity and dividends of each series
+        return_div_txs : ndarray
+            the cash flows of only dividends of each series
+        lengths : ndarray
+            the number of cash flows of each series
+
+        """
+        as_of_dates = np.unique(pd.to_datetime(dates).to_numpy())
+        cols = [
+            "ticker",
+            "date",
+            "units",
+            "cost",
+            "dividend",
+            "cumulative_units",
+            "cumulative_cost",
+            "cumulative_cost_without_dividend",
+            "cumulative_dividend",
+            "market_value",
+        ]
+        ticker_df = tx_hist_df[cols].assign(position=np.arange(len(tx_hist_df)))
+
+        # start the ticker at the first market value, the transactions history
+        # index is descending by date for each ticker
+        market_value = ticker_df["market_value"]
+        idx = pd.Series(ticker_df.index, index=ticker_df.index)
+        has_value = market_value.notna() & (market_value != 0)
+        ticker_begin = (
+            idx.where(has_value)
+            .groupby(ticker_df["ticker"], observed=True)
+            .transform("last")
+        )
+        no_value = (
+            market_value.groupby(ticker_df["ticker"], observed=True)
+            .transform("sum")
+            .fillna(0)
+            == 0
+        )
+        ticker_begin = ticker_begin.mask(no_value, 0)
+        ticker_df = ticker_df[ticker_df.index <= ticker_begin]
+
+        # get the entry price, transactions, current price
+        min_date = ticker_df.groupby("ticker", observed=True)["date"].transform("min")
+        entry_price = ticker_df[ticker_df["date"] == min_date].copy()
+        ticker_transactions = ticker_df[
+            (ticker_df["date"] > min_date)
+            & (ticker_df["date"] <= as_of_dates[-1])
+            & ((ticker_df["cost"] != 0) | (ticker_df["dividend"] != 0))
+        ].copy()
+        current_price = ticker_df[ticker_df["date"].isin(as_of_dates)].copy()
+        current_price["as_of_date"] = current_price["date"]
+
+        # equity + dividend
+        entry_price["return_txs"] = np.where(
+            entry_price["units"] == entry_price["cumulative_units"],
+            entry_price["cumulative_cost"],
+            -entry_price["market_value"],
+        )
+        ticker_transactions["return_txs"] = ticker_transactions["cost"]
+        current_price["return_txs"] = (
+            current_price["market_value"] + current_price["cumulative_dividend"]
+        )
+
+        # only dividend
+        entry_price["return_div_txs"] = np.where(
+            entry_price["cost"] == 0,
+            entry_price["cumulative_cost_without_dividend"]
+            - entry_price["cumulative_dividend"],
+            entry_price["cumulative_cost"],
+        )
+        ticker_transactions["return_div_txs"] = ticker_transactions["cost"]
+        current_price["return_div_txs"] = (
+            -current_price["cumulative_cost_without_dividend"]
+            + current_price["cumulative_dividend"]
+        )
+
+        # the entry and transactions are sorted by ticker and date descending
+        # keeping the order of `_get_return_pct`
+        ticker_order = ticker_df["ticker"].unique()
+        flows = pd.concat(
+            [entry_price.assign(part=0), ticker_transactions.assign(part=1)]
+        )
+        flows["ticker_order"] = pd.Categorical(
+            flows["ticker"], categories=ticker_order
+        ).codes
+        flows = flows.sort_values(
+            by=["ticker_order", "date", "part", "position"],
+            ascending=[True, False, True, True],
+            kind="stable",
+        )
+        current_price["ticker_order"] = pd.Categorical(
+            current_price["ticker"], categories=ticker_order
+        ).codes
+        current_price = current_price.sort_values(
+            by=["as_of_date", "ticker_order"], kind="stable"
+        )
+        flows[["return_txs", "return_div_txs"]] = flows[
+            ["return_txs", "return_div_txs"]
+        ].fillna(0)
+        current_price[["return_txs", "return_div_txs"]] = current_price[
+            ["return_txs", "return_div_txs"]
+        ].fillna(0)
+
+        # the flows of each ticker are searched by a key that is ascending by
+        # ticker and date descending
+        flow_days = flows["date"].to_numpy("datetime64[D]").astype("int64")
+        as_of_days = current_price["date"].to_numpy("datetime64[D]").astype("int64")
+        all_days = np.r_[flow_days, as_of_days]
+        last_day = all_days.max(initial=0)
+        span = last_day - all_days.min(initial=0) + 2
+        flow_order = flows["ticker_order"].to_numpy("int64")
+        as_of_order = current_price["ticker_order"].to_numpy("int64")
+        flow_keys = flow_order * span + last_day - flow_days
+        as_of_keys = as_of_order * span + last_day - as_of_days
+
+        # a series is the flows of the ticker from the as of date, with the
+        # current flow after the flows on the as of date
+        first = np.searchsorted(flow_keys, as_of_keys, side="left")
+        split = np.searchsorted(flow_keys, as_of_keys, side="right") - first
+        end = np.searchsorted(flow_keys, (as_of_order + 1) * span, side="left")
+        lengths = end - first + 1
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        cols = np.arange(lengths.sum()) - np.repeat(
+            np.cumsum(lengths) - lengths, lengths
+        )
+        is_current = cols == split[rows]
+        source = first[rows] + cols - (cols > split[rows])
+        shape = (len(lengths), lengths.max(initial=0))
+        padded = {}
+        for col, dtype in [
+            ("date", "datetime64[D]"),
+            ("return_txs", "float64"),
+            ("return_div_txs", "float64"),
+        ]:
+            flow_values = np.r_[flows[col].to_numpy(dtype), np.zeros(1, dtype=dtype)]
+            current_values = current_price[col].to_numpy(dtype)
+            padded[col] = np.zeros(shape, dtype=dtype)
+            padded[col][rows, cols] = np.where(
+                is_current, current_values[rows], flow_values[source]
+            )
+        series = current_price[["as_of_date", "ticker"]].reset_index(drop=True)
+
+        return (
+            series,
+            padded["date"],
+            padded["return_txs"],
+            padded["return_div_txs"],
+            lengths,
+        )
+
+    def _calc_dwrr(
+        self, cash_flows: pd.DataFrame, by: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Calculate the dollar weighted return of tickers from their cash flows.
+
+        The cash flows of each series are padded to the same length and solved
+        with `_solve_dwrr`.
+
+        Parameters
+        ----------
+        cash_flows : DataFrame
+            the cash flows of the tickers sorted by ticker and date descending
+        by : list (optional)
+            the columns of a cash flow series, default is ["ticker"]
+
+        Returns
+        -------
+        return_pcts : DataFrame
+            returns of the tickers indexed by the `by` columns
+
+        """
+        if by is None:
+            by = ["ticker"]
+        cf_dates = cash_flows["date"].to_numpy()
+        cf_return_txs = cash_flows["return_txs"].to_numpy()
+        cf_return_div_txs = cash_flows["return_div_txs"].to_numpy()
+
+        # pad the cash flows of each series to the same length
+        cf_keys = cash_flows[by].to_numpy()
+        ticker_starts = np.flatnonzero((cf_keys[1:] != cf_keys[:-1]).any(axis=1)) + 1
+        ticker_starts = np.r_[0, ticker_starts] if len(cf_keys) else ticker_starts
+        lengths = np.diff(np.r_[ticker_starts, len(cf_keys)])
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        cols = np.arange(len(cf_keys)) - np.repeat(ticker_starts, lengths)
+        shape = (len(lengths), lengths.max(initial=0))
+        dates = np.zeros(shape, dtype="datetime64[D]")
+        return_txs = np.zeros(shape)
+        return_div_txs = np.zeros(shape)
+        dates[rows, cols] = cf_dates
+        return_txs[rows, cols] = cf_return_txs
+        return_div_txs[rows, cols] = cf_return_div_txs
+
+        return self._solve_dwrr(
+            series=cash_flows[by].iloc[ticker_starts],
+            dates=dates,
+            return_txs=return_txs,
+            return_div_txs=return_div_txs,
+            lengths=lengths,
+        )
+
+    def _solve_dwrr(
+        self,
+        series: pd.DataFrame,
+        dates: np.ndarray,
+        return_txs: np.ndarray,
+        return_div_txs: np.ndarray,
+        lengths: np.ndarray,
+    ) -> pd.DataFrame:
+        """
+        Solve the dollar weighted return of padded cash flow series.
+
+        The series are checked with `_check_cash_flows_batch` and the xirr of
+        the valid series is solved at once with `xirr_batch`. The returns use
+        the same fallbacks as `_get_return_pct`:
+           - dwrr that can't be calculated falls back to the simple return
+           - annual returns greater than 1e20 are NaN
+
+        Parameters
+        ----------
+        series : DataFrame
+            the keys of each series, which include the ticker
+        dates : ndarray
+            the dates of the cash flows of each series, date descending
+        return_txs : ndarray
+            the cash flows of equity and dividends of each series
+        return_div_txs : ndarray
+            the cash flows of only dividends of each series
+        lengths : ndarray
+            the number of cash flows of each series
+
+        Returns
+        -------
+        return_pcts : DataFrame
+            returns of the valid series indexed by the series keys
+
+        """
+        valid = self._check_cash_flows_batch(
+            tickers=series["ticker"].to_numpy(),
+            return_txs=return_txs,
+            return_div_txs=return_div_txs,
+            lengths=lengths,
+        )
+        series = series[valid]
+        dates = dates[valid]
+        return_txs = return_txs[valid]
+        return_div_txs = return_div_txs[valid]
+        lengths = lengths[valid]
+        tickers = series["ticker"].to_numpy()
+
+        # for annualizing returns need the days, cash flows are date descending
+        ends = lengths - 1
+        rows = np.arange(len(lengths))
+        days = (dates[rows, 0] - dates[rows, ends]).astype("timedelta64[D]")
+        years = days.astype("float64") / 365
+
+        # the annual percentage can be high when the days are low
+        max_percentage = 1e20
+
+        # calculating the dwrr return
+        dwrr_ann_pct = xirr_batch(dates, return_txs, lengths)
+        dwrr_pct = (1 + dwrr_ann_pct) ** years - 1
+        no_dwrr = np.isnan(dwrr_ann_pct)
+        for ticker in tickers[no_dwrr]:
+            logger.warning(
+                f"DWRR return for {ticker} is None likely due to percentage "
+                f"too high (or low) fall back with simple return"
+            )
+        first_txs = return_txs[rows, 0]
+        last_txs = return_txs[rows, ends]
+        dwrr_pct = np.where(no_dwrr, (-first_txs - last_txs) / last_txs, dwrr_pct)
+        high_dwrr = dwrr_ann_pct > max_percentage
+        for ticker in tickers[high_dwrr]:
+            logger.warning(
+                f"DWRR return for {ticker} is greater than {max_percentage}%"
+            )
+        dwrr_ann_pct = np.where(high_dwrr, np.nan, dwrr_ann_pct)
+
+        # calculating the dwrr return for dividends
+        div_dwrr_ann_pct = xirr_batch(dates, return_div_txs, lengths)
+        div_dwrr_pct = (1 + div_dwrr_ann_pct) ** years - 1
+        high_div_dwrr = div_dwrr_ann_pct > max_percentage
+        for ticker in tickers[high_div_dwrr]:
+            logger.warning(
+                f"DWRR div return for {ticker} is greater than {max_percentage}%"
+            )
+        div_dwrr_ann_pct = np.where(high_div_dwrr, np.nan, div_dwrr_ann_pct)
+
+        return_pcts = pd.DataFrame(
+            {
+                "dwrr_pct": dwrr_pct,
+                "dwrr_ann_pct": dwrr_ann_pct,
+                "div_dwrr_pct": div_dwrr_pct,
+                "div_dwrr_ann_pct": div_dwrr_ann_pct,
+            },
+            index=pd.MultiIndex.from_frame(series),
+        )
+        if series.shape[1] == 1:
+            return_pcts.index = return_pcts.index.get_level_values(0)
+
+        return return_pcts
+
+    def _check_cash_flows_batch(
+        self,
+        tickers: np.ndarray,
+        return_txs: np.ndarray,
+        return_div_txs: np.ndarray,
+        lengths: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Check that the cash flows of padded series can be used for the return.
+
+        The min and max of the cash flows of each series are checked at once:
+           - the series is more than a single cash flow of 0
+           - there are positive and negative cash flows
+           - the dividend cash flows are all 0 or positive and negative
+
+        Parameters
+        ----------
+        tickers : ndarray
+            ticker of each series
+        return_txs : ndarray
+            cash flows of equity and dividends of each series
+        return_div_txs : ndarray
+            cash flows of only dividends of each series
+        lengths : ndarray
+            the number of cash flows of each series
+
+        Returns
+        -------
+        valid : ndarray
+            True for the series where the return can be calculated
 
-        return_data_list = []  # a list to collect data dictionaries
+        """
+        is_flow = np.arange(return_txs.shape[1]) < lengths[:, None]
+        min_txs = np.where(is_flow, return_txs, np.inf).min(axis=1, initial=np.inf)
+        max_txs = np.where(is_flow, return_txs, -np.inf).max(axis=1, initial=-np.inf)
+        min_div_txs = np.where(is_flow, return_div_txs, np.inf).min(
+            axis=1, initial=np.inf
+        )
+        max_div_txs = np.where(is_flow, return_div_txs, -np.inf).max(
+            axis=1, initial=-np.inf
+        )
+        no_txs = (lengths == 1) & (max_txs == 0)
+        has_txs = (min_txs < 0) & (max_txs > 0)
+        has_div_txs = ((min_div_txs < 0) & (max_div_txs > 0)) | (
+            (min_div_txs == 0) & (max_div_txs == 0)
+        )
+
+        for ticker in pd.unique(tickers[no_txs]):
+            logger.debug(
+                f"The ticker {ticker} is in portfolio but has no transactions"
+                " to calculate the return"
+            )
+        for ticker in pd.unique(tickers[~has_txs & ~no_txs]):
+            logger.warning(
+                f"The transactions for {ticker} did not have positive and negatives"
+            )
+        for ticker in pd.unique(tickers[has_txs & ~has_div_txs]):
+            logger.warning(
+                f"The transactions for {ticker} did not have positive and "
+                f"negative transactions for dividends"
+            )
+
+        return has_txs & has_div_txs
+
+    def _expand_history(
+        self,
+        tx_hist_df: pd.DataFrame,
+        dates: List[datetime.date],
+        price_history: Optional[pd.DataFrame] = None,
+    ) -> pd.DataFrame:
+        """
+        Expand a sparse transactions history to have a row of each ticker on dates.
+
+        A ticker that has a row before a date but not on the date is carried
+        forward from its last row, which only happens after a position is
+        closed. The flows of the carried rows are 0 and the prices are from
+        the price history.
+
+        Parameters
+        ----------
+        tx_hist_df : DataFrame
+            sparse transactions history
+        dates : list
+            dates that should have a row of each ticker
+        price_history : DataFrame (default is self.price_history)
+            Price history DataFrame
+
+        Returns
+        -------
+        tx_hist_df : DataFrame
+            transactions history with the carried rows, sorted by ticker and
+            date descending
 
-        # get return of each ticker
-        for ticker in tickers:
-            return_dict = self._get_return_pct(
-                ticker=ticker,
-                date=date,
-                tx_hist_df=tx_hist_df,
-                lookback=lookback,
-            )
+        """
+        if price_history is None:
+            price_history = self.price_history
 
-            filtered_return_dict = {
-                "ticker": ticker,
-                "dwrr_pct": return_dict["dwrr_return_pct"],
-                "dwrr_ann_pct": return_dict["dwrr_ann_return_pct"],
-                "div_dwrr_pct": return_dict["div_dwrr_return_pct"],
-                "div_dwrr_ann_pct": return_dict["div_dwrr_ann_return_pct"],
+        dates = pd.DatetimeIndex(dates).unique().sort_values()
+        tickers = tx_hist_df["ticker"].unique()
+        ticker_dates = pd.DataFrame(
+            {
+                "ticker": pd.Series(
+                    np.repeat(np.asarray(tickers), len(dates)),
+                    dtype=tx_hist_df["ticker"].dtype,
+                ),
+                "date": np.tile(dates, len(tickers)),
             }
-            return_data_list.append(filtered_return_dict)
+        ).sort_values("date")
+        carried = pd.merge_asof(
+            ticker_dates,
+            tx_hist_df.rename(columns={"date": "row_date"}).sort_values("row_date"),
+            left_on="date",
+            right_on="row_date",
+            by="ticker",
+        )
+        carried = carried[carried["row_date"] < carried["date"]]
+        carried = carried.drop(columns="row_date").reset_index(drop=True)
+
+        # carried rows have no flows and use the price on the date
+        carried[FLOW_COLUMNS] = 0
+        price_cols = [
+            col
+            for col in ["last_price", "stock_splits", "cumulative_stock_splits"]
+            if col in carried.columns and col in price_history.columns
+        ]
+        prices = pd.merge(
+            carried[["ticker", "date"]],
+            price_history[["ticker", "date", *price_cols]],
+            on=["ticker", "date"],
+            how="left",
+        )
+        for col in price_cols:
+            carried[col] = prices[col].fillna(carried[col])
 
-        return_pcts = pd.DataFrame(return_data_list)
-        return_pcts = return_pcts.set_index(["ticker"])
+        tx_hist_df = pd.concat([tx_hist_df, carried[tx_hist_df.columns]])
+        tx_hist_df = tx_hist_df.sort_values(
+            by=["ticker", "date"], ignore_index=True, ascending=False
+        )
 
-        return return_pcts
+        return tx_hist_df
 
     def _filter_lookback(
         self,
@@ -1748,35 +3967,246 @@ class Portfolio:
 
         # Using calendar lookback, but getting closest trading day
         end_date = lookback_df["date"].max()
-        cal_start_date = end_date - datetime.timedelta(days=lookback)
-        buffer_date = cal_start_date - datetime.timedelta(days=7)
-        stock_dates = (
-            mcal.get_calendar("NYSE")
-            .schedule(start_date=buffer_date, end_date=end_date)
-            .index
-        )
-        start_date = max([date for date in stock_dates if date <= cal_start_date])
+        lookback_dates = self._get_lookback_dates(
+            lookbacks=[lookback], end_date=end_date
+        )
+        start_date = lookback_dates[0]
+        if self.sparse_history:
+            lookback_df = self._expand_history(
+                tx_hist_df=lookback_df, dates=[start_date]
+            )
         lookback_df = lookback_df[lookback_df["date"] >= start_date]
 
         if adjust_vars:
-            # List of variables to modify
-            variables = ["return", "unrealized", "realized", "cumulative_dividend"]
-
-            # Grouping the DataFrame by 'ticker' and applying the operation to
-            # each group that will subtract the prior value from the current value.
-            for variable in variables:
-                lookback_df[variable] = (
-                    lookback_df.groupby("ticker")[variable]
-                    .transform(
-                        lambda x: np.nan
-                        if x.dropna().empty
-                        else x - x.loc[x.last_valid_index()]
-                    )
-                    .fillna(0)
-                )
+            lookback_df = self._adjust_lookback_vars(lookback_df)
+
+        return lookback_df
+
+    def _adjust_lookback_vars(self, lookback_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adjust the variables of the lookback to start at 0.
+
+        Parameters
+        ----------
+        lookback_df : DataFrame
+            dataframe that includes the lookback period
+
+        Returns
+        -------
+        lookback_df : DataFrame
+            dataframe with the return, realized, unrealized, and dividend adjusted
+
+        """
+        # List of variables to modify
+        variables = ["return", "unrealized", "realized", "cumulative_dividend"]
+
+        # Subtracting the value of the first date of each ticker, which is the
+        # last valid value as the dates are descending. Tickers without a
+        # valid value are 0.
+        start_values = lookback_df.groupby("ticker", observed=True)[
+            variables
+        ].transform("last")
+        lookback_df[variables] = (lookback_df[variables] - start_values).fillna(0)
 
         return lookback_df
 
+    def get_lookback_changes(
+        self,
+        lookbacks: List[int],
+        date: Optional[datetime.date] = None,
+    ) -> pd.DataFrame:
+        """
+        Get the change of the lookback variables of the tickers for lookbacks.
+
+        The changes are the same as the variables of `get_performance` with a
+        lookback, but are looked up in the lookback index of the portfolio
+        rather than filtering and adjusting the transactions history.
+
+        Parameters
+        ----------
+        lookbacks : list
+            the number of days to look back (uses a calendar day and not stock)
+        date : date (default is max date)
+            the date the changes should be as of
+
+        Returns
+        -------
+        changes : DataFrame
+            the change of return, unrealized, realized and cumulative_dividend
+            indexed by lookback and ticker, for tickers with a row on the date
+
+        """
+        if date is None:
+            date = self._max_date
+        date = pd.to_datetime(check_stock_dates(date, fix=True)["fix_tx_df"]["date"])[0]
+        lookbacks = [convert_lookback(lookback) for lookback in lookbacks]
+        start_dates = self._get_lookback_dates(lookbacks=lookbacks, end_date=date)
+        changes = self._get_window_changes(start_dates=start_dates, end_date=date)
+        changes.index = pd.MultiIndex.from_arrays(
+            [
+                np.asarray(lookbacks)[changes.index.get_level_values("window")],
+                changes.index.get_level_values("ticker"),
+            ],
+            names=["lookback", "ticker"],
+        )
+
+        return changes
+
+    def _get_lookback_index(self) -> Dict[str, Any]:
+        """
+        Get the lookback index of the transactions history.
+
+        The rows are sorted by ticker and date, so a row is found with a binary
+        search of the key `ticker code * number of dates + trading day ordinal`.
+        Each row also has the position of the next row of the ticker with a
+        valid value of each variable, which is the value a lookback starting on
+        that row is adjusted by.
+
+        Returns
+        -------
+        lookback_index : dict
+            the arrays of the index
+               - dates: the trading days of the history
+               - tickers: the tickers of the history
+               - keys: the key of each row
+               - values: the variables of each row
+               - next_valid: the next valid row of each variable
+               - variables: the names of the variables
+
+        """
+        if self._lookback_index is not None:
+            return self._lookback_index
+
+        variables = ["return", "unrealized", "realized", "cumulative_dividend"]
+        tx_hist_df = self.transactions_history.sort_values(
+            by=["ticker", "date"], kind="stable"
+        )
+        dates = np.sort(tx_hist_df["date"].unique())
+        codes, tickers = pd.factorize(tx_hist_df["ticker"])
+        keys = codes.astype("int64") * len(dates) + np.searchsorted(
+            dates, tx_hist_df["date"].to_numpy()
+        )
+        values = tx_hist_df[variables].to_numpy(dtype="float64")
+
+        positions = np.arange(len(tx_hist_df))
+        next_valid = np.full(values.shape, -1)
+        for i in range(len(variables)):
+            valid_positions = positions[~np.isnan(values[:, i])]
+            idx = np.searchsorted(valid_positions, positions)
+            found = idx < len(valid_positions)
+            next_pos = valid_positions[np.minimum(idx, len(valid_positions) - 1)]
+            same_ticker = found & (codes[next_pos] == codes)
+            next_valid[same_ticker, i] = next_pos[same_ticker]
+
+        self._lookback_index = {
+            "dates": dates,
+            "tickers": tickers,
+            "keys": keys,
+            "values": values,
+            "next_valid": next_valid,
+            "variables": variables,
+        }
+
+        return self._lookback_index
+
+    def _get_window_changes(
+        self, start_dates: List[datetime.date], end_date: datetime.date
+    ) -> pd.DataFrame:
+        """
+        Get the change of the lookback variables of the tickers over windows.
+
+        Each window and ticker takes two binary searches and a lookup of the
+        next valid row, which gives the same values as `_adjust_lookback_vars`
+        on the history filtered to the window.
+
+        Parameters
+        ----------
+        start_dates : list
+            the start date of each window
+        end_date : date
+            the end date of the windows
+
+        Returns
+        -------
+        changes : DataFrame
+            the change of the variables indexed by window number and ticker,
+            for tickers with a row on the end date
+
+        """
+        index = self._get_lookback_index()
+        dates = index["dates"]
+        keys = index["keys"]
+        n_dates = len(dates)
+        n_tickers = len(index["tickers"])
+
+        start_ordinals = np.searchsorted(
+            dates, pd.DatetimeIndex(start_dates).to_numpy(), side="left"
+        )
+        end_ordinal = np.searchsorted(dates, np.datetime64(end_date), side="left")
+        codes = np.arange(n_tickers, dtype="int64")
+
+        # the row of each ticker on the end date
+        end_keys = codes * n_dates + end_ordinal
+        end_rows = np.minimum(np.searchsorted(keys, end_keys), len(keys) - 1)
+        has_end = (keys[end_rows] == end_keys) & (end_ordinal < n_dates)
+        if end_ordinal < n_dates:
+            has_end &= dates[end_ordinal] == np.datetime64(end_date)
+
+        # the first valid row of each window and ticker
+        start_keys = codes[None, :] * n_dates + start_ordinals[:, None]
+        start_rows = np.minimum(np.searchsorted(keys, start_keys), len(keys) - 1)
+        base_rows = index["next_valid"][start_rows]
+        end_rows = np.broadcast_to(end_rows[None, :], start_rows.shape)
+        valid = (base_rows >= 0) & (base_rows <= end_rows[..., None])
+
+        values = index["values"]
+        changes = (
+            values[end_rows]
+            - values[np.maximum(base_rows, 0), np.arange(values.shape[1])]
+        )
+        changes = np.where(valid, changes, np.nan)
+        changes = np.nan_to_num(changes, nan=0.0)
+
+        window, ticker = np.nonzero(np.broadcast_to(has_end, start_rows.shape))
+        changes = pd.DataFrame(
+            changes[window, ticker],
+            index=pd.MultiIndex.from_arrays(
+                [window, index["tickers"][ticker]], names=["window", "ticker"]
+            ),
+            columns=index["variables"],
+        )
+
+        return changes
+
+    def _get_lookback_dates(
+        self, lookbacks: List[int], end_date: datetime.date
+    ) -> List[pd.Timestamp]:
+        """
+        Get the start dates of lookbacks.
+
+        The start date is the closest trading day on or before the calendar
+        lookback, which is looked up in the trading calendar of the process.
+
+        Parameters
+        ----------
+        lookbacks : list
+            the number of days to look back (uses a calendar day and not stock)
+        end_date : date
+            the date to look back from
+
+        Returns
+        -------
+        lookback_dates : list
+            the start date of each lookback
+
+        """
+        cal_start_dates = [
+            end_date - datetime.timedelta(days=lookback) for lookback in lookbacks
+        ]
+        lookback_dates = list(get_trading_calendar().previous_date(cal_start_dates))
+
+        return lookback_dates
+
 
 class Manager:
     """
@@ -1788,6 +4218,9 @@ class Manager:
         path to the portfolio file
     portfolios : list (default is None)
         list of portfolios in the Portfolio class to analyze.
+    workers : int (default is None)
+        number of processes to build the portfolios with. A portfolio that
+        fails to build in a process is logged and left out of the portfolios.
 
     """
 
@@ -1795,6 +4228,7 @@ class Manager:
         self,
         config_path: str,
         portfolios: Optional[List[str]] = None,
+        workers: Optional[int] = None,
     ) -> None:
         """Initialize the Manager class."""
         # create list of portfolios in configuration
@@ -1804,9 +4238,213 @@ class Manager:
             ).keys()
             portfolios = [item for item in sections if item != "static"]
 
+        ledgers = self._get_ledgers(config_path=config_path, portfolios=portfolios)
         self.portfolios = [
-            Portfolio(config_path=config_path, portfolio=item) for item in portfolios
+            Portfolio(
+                config_path=config_path, portfolio=item, build=False, ledger=ledger
+            )
+            for item, ledger in zip(portfolios, ledgers, strict=True)
+        ]
+        stock_histories = self._get_stock_histories()
+        portfolio_histories = []
+        for portfolio in self.portfolios:
+            stock_history = None
+            if not portfolio.history_offline:
+                stock_history = portfolio._filter_stock_history(
+                    stock_history=stock_histories[self._history_key(portfolio)],
+                    tickers=portfolio._get_stock_tickers(),
+                )
+            portfolio_histories.append(stock_history)
+
+        self.errors: Dict[str, Exception] = {}
+        if workers is None or workers <= 1:
+            for portfolio, stock_history in zip(
+                self.portfolios, portfolio_histories, strict=True
+            ):
+                portfolio._build(stock_history=stock_history)
+        else:
+            self.portfolios = self._build_portfolios(
+                portfolio_histories=portfolio_histories, workers=workers
+            )
+
+    def _get_ledgers(
+        self, config_path: str, portfolios: List[str]
+    ) -> List[Optional[pd.DataFrame]]:
+        """
+        Get the transactions of the files that portfolios share in a single read.
+
+        The read of a shared file includes the fields of all its portfolios and
+        only filters out the types and brokers that none of them use. Each
+        portfolio then filters the shared transactions to its own.
+
+        Parameters
+        ----------
+        config_path : str
+            path to the portfolio file
+        portfolios : list
+            list of portfolios in the Portfolio class to analyze.
+
+        Returns
+        -------
+        ledgers : list
+            the shared transactions of each portfolio, which is None if the
+            portfolio is the only one to use its file
+
+        """
+        config_dicts = [
+            config_helper.get_config_options(config_path, "investments", item)
+            for item in portfolios
+        ]
+        keys = [
+            (
+                Portfolio.load_transaction_file(config_dict["tx_file"]),
+                config_dict.get("username", None),
+                config_dict.get("password", None),
+            )
+            for config_dict in config_dicts
         ]
+        shared: Dict[Any, List[Dict[str, Any]]] = {}
+        for key, config_dict in zip(keys, config_dicts, strict=True):
+            shared.setdefault(key, []).append(config_dict)
+
+        ledgers = {}
+        for (file_path, username, password), file_configs in shared.items():
+            if len(file_configs) < 2:
+                continue
+            cols = list(
+                dict.fromkeys(
+                    col
+                    for config_dict in file_configs
+                    for col in [*TX_COLUMNS, *config_dict["other_fields"]]
+                )
+            )
+            filter_type = [
+                tx_type
+                for tx_type in file_configs[0]["filter_type"]
+                if all(
+                    tx_type in config_dict["filter_type"]
+                    for config_dict in file_configs
+                )
+            ]
+            filter_broker = []
+            if any(config_dict["filter_broker"] for config_dict in file_configs):
+                cols.append("broker")
+            if all(config_dict["filter_broker"] for config_dict in file_configs):
+                filter_broker = list(
+                    dict.fromkeys(
+                        broker
+                        for config_dict in file_configs
+                        for broker in config_dict["filter_broker"]
+                    )
+                )
+            logger.info(
+                f"Reading transactions of {len(file_configs)} portfolios from "
+                f"{file_path} once"
+            )
+            ledgers[(file_path, username, password)] = _read_transactions(
+                file_path=file_path,
+                cols=list(dict.fromkeys(cols)),
+                filter_type=filter_type,
+                filter_broker=filter_broker,
+                username=username,
+                password=password,
+            )
+
+        return [ledgers.get(key) for key in keys]
+
+    def _build_portfolios(
+        self, portfolio_histories: List[Optional[pd.DataFrame]], workers: int
+    ) -> List[Portfolio]:
+        """
+        Build the portfolios in a process pool.
+
+        The portfolios are returned in the same order as they were configured
+        and a portfolio that fails to build is added to `errors`.
+
+        Parameters
+        ----------
+        portfolio_histories : list
+            the stock history of each portfolio
+        workers : int
+            number of processes to build the portfolios with
+
+        Returns
+        -------
+        portfolios : list
+            the portfolios that were built
+
+        """
+        logger.info(
+            f"Building {len(self.portfolios)} portfolios with {workers} workers"
+        )
+        portfolios = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_build_portfolio, portfolio, stock_history)
+                for portfolio, stock_history in zip(
+                    self.portfolios, portfolio_histories, strict=True
+                )
+            ]
+            for portfolio, future in zip(self.portfolios, futures, strict=True):
+                err = future.exception()
+                if err is not None:
+                    logger.error(f"Could not build portfolio '{portfolio.name}': {err}")
+                    self.errors[portfolio.name] = err
+                    continue
+                portfolios.append(future.result())
+
+        return portfolios
+
+    def _get_stock_histories(self) -> Dict[Any, pd.DataFrame]:
+        """
+        Get the stock history of the portfolios in a single download.
+
+        Portfolios that download price history share a download of the union
+        of their tickers from the earliest year, and the portfolios that use
+        the same price store share the store.
+
+        Returns
+        -------
+        stock_histories : dict
+            the stock history of each history store setting
+
+        """
+        downloads: Dict[Any, List[Portfolio]] = {}
+        for portfolio in self.portfolios:
+            if portfolio.history_offline:
+                continue
+            downloads.setdefault(self._history_key(portfolio), []).append(portfolio)
+
+        stock_histories = {}
+        for history_store, portfolios in downloads.items():
+            tickers = list(
+                dict.fromkeys(
+                    tick
+                    for portfolio in portfolios
+                    for tick in portfolio._get_stock_tickers()
+                )
+            )
+            min_year = min(portfolio._min_year for portfolio in portfolios)
+            logger.info(
+                f"Downloading price history for {len(portfolios)} portfolio(s) "
+                f"with {len(tickers)} tickers from {min_year}"
+            )
+            if history_store:
+                wrapper = PriceStore(
+                    path=None if history_store is True else history_store
+                )
+            else:
+                wrapper = Yahoo()
+            stock_histories[history_store] = wrapper.stock_history(
+                tickers=tickers, min_year=min_year
+            )
+
+        return stock_histories
+
+    def _history_key(self, portfolio: Portfolio) -> Any:
+        """Get the history store setting that the portfolio downloads with."""
+        history_store = portfolio.history_store
+        return history_store if history_store else None
 
     def get_summary(
         self,
@@ -1845,70 +4483,42 @@ class Manager:
             f"with lookbacks {lookbacks}"
         )
 
-        for i, lookback in enumerate(lookbacks):
-            converted_lookback = convert_lookback(lookback)
-            pfs = []
-            # getting summary of each portfolio
-            for portfolio in self.portfolios:
-                performance = portfolio.get_performance(
-                    date=date, lookback=converted_lookback
-                )
-                pf = performance[performance.index == "portfolio"].rename(
-                    index={"portfolio": portfolio.name}
-                )
-                pf = pf.rename(
-                    columns={"dwrr_pct": str(converted_lookback) + "_dwrr_pct"}
-                )
-                pf = pf.rename(
-                    columns={"div_dwrr_pct": str(converted_lookback) + "_div_dwrr_pct"}
-                )
-                # adding benchmark to the summary
-                benchmark = performance[
-                    performance.index.str.contains("benchmark")
-                ].head(1)
-                benchmark_dict = {}
-                if not benchmark.empty:
-                    benchmark_dict["benchmark"] = benchmark.index.values[0].split("-")[
-                        1
-                    ]
-                    benchmark_dict[str(converted_lookback) + "_benchmark_dwrr_pct"] = (
-                        benchmark["dwrr_pct"].values[0]
-                    )
+        converted_lookbacks = [convert_lookback(lookback) for lookback in lookbacks]
+        summaries = {
+            portfolio.name: portfolio._get_summary(
+                date=date, lookbacks=converted_lookbacks
+            )
+            for portfolio in self.portfolios
+        }
 
-                pf = pf.assign(**benchmark_dict)
-                pfs.append(pf)
-
-            # dataframe prepare (drop, reorder, format)
-            summary = pd.concat(pfs)
-            if i == 0:
-                columns_to_keep = [
-                    "date",
-                    "lookback_date",
-                    "market_value",
-                    "equity",
-                    "cash",
-                    "cumulative_cost",
-                    "return",
-                    "realized",
-                    "unrealized",
-                    "cumulative_dividend",
-                    "benchmark",
+        # first lookback has all columns and others only have returns
+        columns_to_keep = [
+            "date",
+            "lookback_date",
+            "market_value",
+            "equity",
+            "cash",
+            "cumulative_cost",
+            "return",
+            "realized",
+            "unrealized",
+            "cumulative_dividend",
+            "benchmark",
+        ]
+        summary_all = pd.DataFrame(
+            [
+                summary.loc[converted_lookbacks[0], columns_to_keep]
+                for summary in summaries.values()
+            ],
+            index=pd.Index(summaries.keys(), name="ticker"),
+        )
+        pct_cols = ["dwrr_pct", "div_dwrr_pct", "benchmark_dwrr_pct"]
+        for converted_lookback in converted_lookbacks:
+            for pct_col in pct_cols:
+                summary_all[str(converted_lookback) + "_" + pct_col] = [
+                    "{:.2%}".format(summary.loc[converted_lookback, pct_col])
+                    for summary in summaries.values()
                 ]
-                columns_to_keep += summary.filter(like="_dwrr_pct").columns.tolist()
-                summary = summary.drop(
-                    summary.columns.difference(columns_to_keep), axis=1
-                )
-                summary = summary.loc[:, columns_to_keep]
-                summary_all = summary.copy()
-            else:
-                columns_to_keep = summary.filter(like="_dwrr_pct").columns.tolist()
-                summary = summary.drop(
-                    summary.columns.difference(columns_to_keep), axis=1
-                )
-                summary = summary.loc[:, columns_to_keep]
-                summary_all = pd.merge(
-                    summary_all, summary, how="left", left_index=True, right_index=True
-                )
 
         return summary_all
 
@@ -1928,18 +4538,42 @@ class Manager:
         -------
         view_df : DataFrame
 
+        """
+        return self.get_views(views=[view])[view]
+
+    def get_views(self, views: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Get a number of views of portfolios.
+
+        Parameters
+        ----------
+        views : list
+            columns to sum over on the portfolio dataframe
+               - e.g. ["market_value", "return", "cumulative_cost", "realized"]
+
+        Returns
+        -------
+        view_dfs : dict
+            the view DataFrame of each view with a column for each portfolio
+
         """
         portfolio_repr = ", ".join([portfolio.name for portfolio in self.portfolios])
         logger.info(f"View of following portfolios: [{portfolio_repr}]")
-        dfs = []
-        for portfolio in self.portfolios:
-            df = portfolio.get_view(view=view)
-            df = df[["portfolio"]]
-            df = df.rename(columns={"portfolio": portfolio.name})
-            dfs.append(df)
-        view_df = pd.concat(dfs, axis=1)
+        portfolio_views = [
+            portfolio.get_views(views=views) for portfolio in self.portfolios
+        ]
+        view_dfs = {}
+        for view in views:
+            dfs = []
+            for portfolio, portfolio_view in zip(
+                self.portfolios, portfolio_views, strict=True
+            ):
+                df = portfolio_view[view][["portfolio"]]
+                df = df.rename(columns={"portfolio": portfolio.name})
+                dfs.append(df)
+            view_dfs[view] = pd.concat(dfs, axis=1)
 
-        return view_df
+        return view_dfs
 
     def get_return_chart(
         self, lookback: Optional[int] = None, benchmarks: Optional[List[str]] = None
@@ -1965,8 +4599,9 @@ class Manager:
         portfolio_repr = ", ".join([portfolio.name for portfolio in self.portfolios])
         logger.info(f"Return chart of following portfolios: [{portfolio_repr}]")
 
-        return_view = self.get_view(view="return")
-        cost_view = self.get_view(view="cumulative_cost") * -1
+        views = self.get_views(views=["return", "cumulative_cost"])
+        return_view = views["return"]
+        cost_view = views["cumulative_cost"] * -1
         if lookback is not None:
             lookback = convert_lookback(lookback)
             lookback_date = return_view.index.max() - datetime.timedelta(days=lookback)
@@ -2023,3 +4658,269 @@ class Manager:
         return_chart.update_yaxes(tickformat=".1%")
 
         return return_chart
+
+
+def _build_portfolio(
+    portfolio: Portfolio, stock_history: Optional[pd.DataFrame] = None
+) -> Portfolio:
+    """
+    Build a portfolio in a process of the Manager.
+
+    Parameters
+    ----------
+    portfolio : Portfolio
+        portfolio with the transactions loaded
+    stock_history : DataFrame (optional)
+        stock history that was already downloaded
+
+    Returns
+    -------
+    portfolio : Portfolio
+        the built portfolio
+
+    """
+    portfolio._build(stock_history=stock_history)
+
+    return portfolio
+
+
+def _read_transactions(
+    file_path: str,
+    cols: List[str],
+    filter_type: Optional[List[str]] = None,
+    filter_broker: Optional[List[str]] = None,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Read the transactions of a transactions file.
+
+    Only the fields used are read with declared dtypes, and csv files are read
+    in chunks of TX_CHUNK_SIZE rows that are filtered as they are read. Dates
+    are parsed with TX_DATE_FORMAT and inferred if they use another format.
+    Parquet and feather files are typed and filtered by the reader.
+
+    Parameters
+    ----------
+    file_path : str
+        the path to the transactions file
+    cols : list
+        the fields to read
+    filter_type : list (optional)
+        list of strings to exclude out of `type` field.
+    filter_broker : list (optional)
+        list of strings to include out of `broker` field.
+    username : str (optional)
+        username for downloading transactions
+    password : str (optional)
+        password for downloading transactions
+
+    Returns
+    -------
+    transactions : DataFrame
+        the filtered transactions of the file
+
+    """
+    if filter_broker:
+        cols = [*cols, "broker"]
+    usecols = set(cols)
+    dtype = {col: col_dtype for col, col_dtype in TX_DTYPES.items() if col in usecols}
+
+    try:
+        if username and password:
+            logger.info("using username and password")
+            response = requests.get(file_path, auth=(username, password))
+            if response.status_code == 200:
+                chunks = pd.read_csv(
+                    StringIO(response.text),
+                    usecols=lambda col: col in usecols,
+                    dtype=dtype,
+                    chunksize=TX_CHUNK_SIZE,
+                )
+            else:
+                raise ValueError(f"Failed to retrieve file: {response.status_code}")
+        elif file_path.endswith(".csv"):
+            chunks = pd.read_csv(
+                file_path,
+                usecols=lambda col: col in usecols,
+                dtype=dtype,
+                chunksize=TX_CHUNK_SIZE,
+            )
+        elif file_path.endswith(".xlsx"):
+            chunks = [
+                pd.read_excel(
+                    file_path,
+                    engine="openpyxl",
+                    usecols=lambda col: col in usecols,
+                    dtype=dtype,
+                )
+            ]
+        elif file_path.endswith(COLUMNAR_FORMATS):
+            chunks = [
+                _read_columnar_transactions(
+                    file_path=file_path,
+                    usecols=usecols,
+                    filter_type=filter_type,
+                    filter_broker=filter_broker,
+                )
+            ]
+        else:
+            raise ValueError(f"Unsupported file format for {file_path}")
+
+        transactions = []
+        missing_cols = set()
+        for chunk in chunks:
+            missing_cols = usecols - set(chunk.columns)
+            if missing_cols:
+                break
+            transactions.append(
+                _filter_transactions(
+                    chunk, filter_type=filter_type, filter_broker=filter_broker
+                )
+            )
+    except FileNotFoundError as err:
+        raise FileNotFoundError(f"File not found at {file_path}") from err
+    except Exception as err:
+        raise ValueError(f"Error loading file: {err}") from err
+
+    if missing_cols:
+        raise ValueError(f"Missing columns in file: {missing_cols}")
+
+    if not transactions:
+        raise ValueError(f"There are no transactions in file {file_path}")
+    transactions = pd.concat(transactions, ignore_index=True)
+    try:
+        transactions["date"] = pd.to_datetime(
+            transactions["date"], format=TX_DATE_FORMAT
+        )
+    except ValueError:
+        transactions["date"] = pd.to_datetime(transactions["date"])
+
+    return transactions
+
+
+def _read_columnar_transactions(
+    file_path: str,
+    usecols: Set[str],
+    filter_type: Optional[List[str]] = None,
+    filter_broker: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Read the transactions of a parquet or feather file.
+
+    The fields that are not used are not read, and the type and broker filters
+    are pushed down to the reader so the rows filtered out are skipped.
+
+    Parameters
+    ----------
+    file_path : str
+        the path to the parquet or feather file
+    usecols : set
+        the fields to read, the fields not in the file are left out
+    filter_type : list (optional)
+        list of strings to exclude out of `type` field.
+    filter_broker : list (optional)
+        list of strings to include out of `broker` field.
+
+    Returns
+    -------
+    transactions : DataFrame
+        the filtered transactions of the file
+
+    """
+    file_format = "parquet" if file_path.endswith(".parquet") else "feather"
+    dataset = ds.dataset(file_path, format=file_format)
+    names = dataset.schema.names
+
+    expression = None
+    if filter_type and "type" in names:
+        expression = ~ds.field("type").isin(filter_type)
+    if filter_broker and "broker" in names:
+        broker_expression = ds.field("broker").isin(filter_broker)
+        expression = (
+            broker_expression if expression is None else expression & broker_expression
+        )
+
+    transactions = dataset.to_table(
+        columns=[col for col in names if col in usecols], filter=expression
+    ).to_pandas()
+
+    return transactions
+
+
+def convert_ledger(tx_file: str, output_file: Optional[str] = None) -> str:
+    """
+    Convert a csv or xlsx transactions file to a parquet or feather file.
+
+    The transactions are read with the declared dtypes and parsed dates, so the
+    converted file is typed and can be read without parsing.
+
+    Parameters
+    ----------
+    tx_file : str
+        the csv or xlsx transactions file to convert
+    output_file : str (optional)
+        the parquet or feather file to write, which defaults to the
+        transactions file with a parquet suffix
+
+    Returns
+    -------
+    output_file : str
+        the path of the converted file
+
+    """
+    file_path = Portfolio.load_transaction_file(tx_file)
+    if output_file is None:
+        output_file = f"{os.path.splitext(file_path)[0]}.parquet"
+    if not output_file.endswith(COLUMNAR_FORMATS):
+        raise ValueError(f"Output file must be one of {COLUMNAR_FORMATS}")
+
+    if file_path.endswith(".csv"):
+        cols = list(pd.read_csv(file_path, nrows=0).columns)
+    elif file_path.endswith(".xlsx"):
+        cols = list(pd.read_excel(file_path, engine="openpyxl", nrows=0).columns)
+    else:
+        raise ValueError(f"Unsupported file format for {file_path}")
+    transactions = _read_transactions(file_path=file_path, cols=cols)
+
+    if output_file.endswith(".parquet"):
+        transactions.to_parquet(output_file, index=False)
+    else:
+        transactions.to_feather(output_file)
+    logger.info(
+        f"converted {len(transactions)} transactions from {file_path} to "
+        f"{output_file}"
+    )
+
+    return output_file
+
+
+def _filter_transactions(
+    transactions: pd.DataFrame,
+    filter_type: Optional[List[str]] = None,
+    filter_broker: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Filter transactions to the types and brokers of a portfolio.
+
+    Parameters
+    ----------
+    transactions : DataFrame
+        the transactions to filter
+    filter_type : list (optional)
+        list of strings to exclude out of `type` field.
+    filter_broker : list (optional)
+        list of strings to include out of `broker` field.
+
+    Returns
+    -------
+    transactions : DataFrame
+        the filtered transactions
+
+    """
+    if filter_type:
+        transactions = transactions[~transactions["type"].isin(filter_type)]
+    if filter_broker:
+        transactions = transactions[transactions["broker"].isin(filter_broker)]
+
+    return transactions
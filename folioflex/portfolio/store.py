@@ -0,0 +1,416 @@
+"""
+Local store of price history.
+
+Past closes rarely change, so instead of downloading the full history of each
+ticker every time a portfolio is created, the price history is kept on disk and
+only the missing dates are downloaded.
+
+The store is a directory with a parquet file per ticker and a manifest that
+records the dates covered for each ticker:
+   - start : the first date requested for the ticker
+   - end : the last date with a price for the ticker
+   - checked : the most recent stock date when the ticker was last downloaded
+   - updated : when the ticker was last downloaded
+   - close : the market close of the end date, in the same time as updated
+
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from folioflex.portfolio.helper import get_trading_calendar, most_recent_stock_date
+from folioflex.portfolio.wrappers import Yahoo
+from folioflex.utils import config_helper, custom_logger
+
+logger = custom_logger.setup_logging(__name__)
+
+
+class PriceStore:
+    """
+    A PriceStore class used to keep price history on disk.
+
+    The store downloads from yahoo finance only what is missing:
+       - tickers that are not in the store
+       - new trading days since the ticker was last downloaded
+       - earlier dates when the requested start moves back
+
+    Adjusted prices change for all prior dates when there is a stock split (or
+    a dividend), so when new trading days are downloaded the last overlapping
+    stored price is compared to the downloaded price. If the price differs or a
+    new stock split is found the ticker is downloaded again in full.
+
+    Parameters
+    ----------
+    path : str (optional)
+        the directory of the store, relative paths are prefixed with CONFIG_PATH
+
+    """
+
+    manifest_file = "manifest.json"
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        """Initialize the PriceStore class."""
+        if path is None:
+            path = "price_history"
+        if not os.path.isabs(path):
+            path = os.path.join(config_helper.CONFIG_PATH, path)
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    def stock_history(self, tickers: List[str], min_year: int) -> pd.DataFrame:
+        """
+        Get stock history data for a set of tickers using the store.
+
+        Parameters
+        ----------
+        tickers : list
+            symbols to get data for
+        min_year : int
+            the minimum year to get data for
+
+        Returns
+        -------
+        stock_data : DataFrame
+            the stock history
+               - ticker
+               - date
+               - last price
+               - stock splits
+
+        """
+        tickers = list(dict.fromkeys(tickers))
+        start = pd.Timestamp(datetime(min_year, 1, 1))
+        last_date = pd.Timestamp(most_recent_stock_date())
+
+        history = {ticker: self._read(ticker) for ticker in tickers}
+
+        # tickers that need new trading days
+        update_ticks = []
+        for ticker in tickers:
+            if history[ticker] is None or not self._is_outdated(ticker, last_date):
+                continue
+            if history[ticker].empty:
+                history[ticker] = None
+            else:
+                update_ticks.append(ticker)
+        if update_ticks:
+            history.update(self._update(update_ticks, history, last_date))
+
+        # tickers that are not stored or were invalidated
+        full_ticks = [ticker for ticker in tickers if history[ticker] is None]
+        if full_ticks:
+            logger.info(f"Downloading full price history for {full_ticks}")
+            new_data = Yahoo().stock_history(tickers=full_ticks, start=start)
+            for ticker in full_ticks:
+                history[ticker] = self._write(
+                    ticker,
+                    new_data[new_data["ticker"] == ticker],
+                    start=start,
+                    checked=last_date,
+                )
+
+        # tickers that need earlier dates
+        backfill_ticks = [
+            ticker
+            for ticker in tickers
+            if pd.Timestamp(self.manifest[ticker]["start"]) > start
+        ]
+        if backfill_ticks:
+            history.update(self._backfill(backfill_ticks, history, start))
+
+        self._save_manifest()
+
+        stock_data = pd.concat([history[ticker] for ticker in tickers])
+        stock_data = stock_data[stock_data["date"] >= start]
+
+        # align the tickers on the same dates as a batched download would
+        dates = np.sort(stock_data["date"].unique())
+        full_index = pd.MultiIndex.from_product(
+            [tickers, dates], names=["ticker", "date"]
+        )
+        stock_data = (
+            stock_data.set_index(["ticker", "date"]).reindex(full_index).reset_index()
+        )
+
+        return stock_data
+
+    def clear(self, tickers: Optional[List[str]] = None) -> None:
+        """
+        Remove tickers from the store.
+
+        Parameters
+        ----------
+        tickers : list (optional)
+            the tickers to remove, if None all tickers are removed
+
+        """
+        if tickers is None:
+            tickers = list(self.manifest.keys())
+        for ticker in tickers:
+            file = self._ticker_file(ticker)
+            if file.exists():
+                file.unlink()
+            self.manifest.pop(ticker, None)
+        self._save_manifest()
+
+    def _update(
+        self, tickers: List[str], history: Dict[str, Any], last_date: pd.Timestamp
+    ) -> Dict[str, Optional[pd.DataFrame]]:
+        """
+        Download the new trading days for tickers.
+
+        A ticker that the download has no prices for keeps its stored history,
+        such as a ticker that is no longer traded.
+
+        Parameters
+        ----------
+        tickers : list
+            symbols to update
+        history : dict
+            the stored history of tickers
+        last_date : Timestamp
+            the most recent stock date
+
+        Returns
+        -------
+        updated : dict
+            the updated history of tickers, None when the ticker was invalidated
+
+        """
+        # the last stored date may be intraday so the check date is the one prior
+        check_dates = {ticker: self._check_date(history[ticker]) for ticker in tickers}
+        new_data = []
+        for update_start in sorted(set(check_dates.values())):
+            update_ticks = [
+                ticker for ticker in tickers if check_dates[ticker] == update_start
+            ]
+            logger.info(
+                f"Downloading price history from {update_start} for {update_ticks}"
+            )
+            new_data.append(
+                Yahoo().stock_history(tickers=update_ticks, start=update_start)
+            )
+        new_data = pd.concat(new_data, ignore_index=True)
+
+        updated = {}
+        for ticker in tickers:
+            stored = history[ticker]
+            check_date = check_dates[ticker]
+            new_rows = new_data[
+                (new_data["ticker"] == ticker) & (new_data["date"] >= check_date)
+            ]
+            new_rows = new_rows[new_rows["last_price"].notna()]
+            if new_rows.empty:
+                logger.info(f"No new prices for {ticker}, keeping the stored prices")
+                ticker_data = stored
+            elif not self._is_consistent(stored, new_rows, check_date):
+                logger.info(f"Adjusted history changed for {ticker}, invalidating")
+                updated[ticker] = None
+                continue
+            else:
+                ticker_data = pd.concat(
+                    [stored[stored["date"] < check_date], new_rows], ignore_index=True
+                )
+            updated[ticker] = self._write(
+                ticker,
+                ticker_data,
+                start=pd.Timestamp(self.manifest[ticker]["start"]),
+                checked=last_date,
+            )
+
+        return updated
+
+    def _backfill(
+        self, tickers: List[str], history: Dict[str, Any], start: pd.Timestamp
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Download the earlier dates for tickers.
+
+        Parameters
+        ----------
+        tickers : list
+            symbols to backfill
+        history : dict
+            the stored history of tickers
+        start : Timestamp
+            the new start date of the tickers
+
+        Returns
+        -------
+        backfilled : dict
+            the backfilled history of tickers
+
+        """
+        stored_starts = {
+            ticker: pd.Timestamp(self.manifest[ticker]["start"]) for ticker in tickers
+        }
+        end = max(stored_starts.values())
+        logger.info(f"Downloading price history from {start} to {end} for {tickers}")
+        new_data = Yahoo().stock_history(tickers=tickers, start=start, end=end)
+
+        backfilled = {}
+        for ticker in tickers:
+            stored = history[ticker]
+            new_rows = new_data[
+                (new_data["ticker"] == ticker)
+                & (new_data["date"] < stored_starts[ticker])
+            ]
+            ticker_data = pd.concat([new_rows, stored], ignore_index=True)
+            backfilled[ticker] = self._write(ticker, ticker_data, start=start)
+
+        return backfilled
+
+    def _is_outdated(self, ticker: str, last_date: pd.Timestamp) -> bool:
+        """
+        Check if the ticker is missing trading days.
+
+        A ticker is not missing the trading days that were downloaded without
+        prices, so a ticker without recent prices is only downloaded again
+        when there is a new stock date. The prices of the end date are only
+        downloaded again if they were downloaded before the market close.
+
+        Parameters
+        ----------
+        ticker : str
+            symbol to check
+        last_date : Timestamp
+            the most recent stock date
+
+        Returns
+        -------
+        bool
+            True if the ticker needs to be updated
+
+        """
+        end = pd.Timestamp(self.manifest[ticker]["end"])
+        checked = pd.Timestamp(self.manifest[ticker].get("checked", end))
+        updated = pd.Timestamp(self.manifest[ticker]["updated"])
+        close = self.manifest[ticker].get("close")
+        if close is None:
+            # prices downloaded on the day of the last date may be intraday
+            close = end + timedelta(days=1)
+        return max(end, checked) < last_date or updated < pd.Timestamp(close)
+
+    def _check_date(self, stored: pd.DataFrame) -> pd.Timestamp:
+        """Get the date used to check the stored prices against the new prices."""
+        dates = stored["date"]
+        return dates.iloc[-2] if len(dates) > 1 else dates.iloc[0]
+
+    def _is_consistent(
+        self, stored: pd.DataFrame, new_rows: pd.DataFrame, check_date: pd.Timestamp
+    ) -> bool:
+        """
+        Check that the stored adjusted prices are still valid.
+
+        Parameters
+        ----------
+        stored : DataFrame
+            the stored history of ticker
+        new_rows : DataFrame
+            the downloaded history of ticker from the check date
+        check_date : Timestamp
+            the date that is in both the stored and downloaded history
+
+        Returns
+        -------
+        bool
+            True if the stored adjusted prices are still valid
+
+        """
+        # a new stock split changes all of the prior adjusted prices
+        new_splits = new_rows.loc[new_rows["date"] > check_date, "stock_splits"]
+        if (~new_splits.fillna(0).isin([0, 1])).any():
+            return False
+
+        stored_price = stored.loc[stored["date"] == check_date, "last_price"]
+        new_price = new_rows.loc[new_rows["date"] == check_date, "last_price"]
+        if stored_price.empty or new_price.empty:
+            return stored_price.empty
+        return bool(
+            np.isclose(stored_price.iloc[0], new_price.iloc[0], rtol=1e-6, atol=0)
+        )
+
+    def _ticker_file(self, ticker: str) -> Path:
+        """Get the file location of the ticker."""
+        return self.path / f"{ticker.replace('/', '_')}.parquet"
+
+    def _read(self, ticker: str) -> Optional[pd.DataFrame]:
+        """Read the stored history of ticker, None if not stored."""
+        file = self._ticker_file(ticker)
+        if ticker not in self.manifest or not file.exists():
+            return None
+        return pd.read_parquet(file)
+
+    def _write(
+        self,
+        ticker: str,
+        ticker_data: pd.DataFrame,
+        start: pd.Timestamp,
+        checked: Optional[pd.Timestamp] = None,
+    ) -> pd.DataFrame:
+        """
+        Write the history of ticker to the store.
+
+        Parameters
+        ----------
+        ticker : str
+            symbol to write
+        ticker_data : DataFrame
+            the history of ticker
+        start : Timestamp
+            the first date requested for the ticker
+        checked : Timestamp (optional)
+            the most recent stock date of the download, default is the checked
+            date of the stored ticker
+
+        Returns
+        -------
+        ticker_data : DataFrame
+            the history of ticker that was written
+
+        """
+        ticker_data = ticker_data[["ticker", "date", "last_price", "stock_splits"]]
+        ticker_data = ticker_data[ticker_data["last_price"].notna()]
+        ticker_data = ticker_data.sort_values(by="date", ignore_index=True)
+        ticker_data.to_parquet(self._ticker_file(ticker), index=False)
+
+        if ticker_data.empty:
+            end = start - timedelta(days=1)
+        else:
+            end = ticker_data["date"].iloc[-1]
+        if checked is None:
+            checked = pd.Timestamp(self.manifest.get(ticker, {}).get("checked", end))
+        close = get_trading_calendar().market_close(end)
+        if close is None:
+            close = end + timedelta(days=1)
+        else:
+            close = close.tz_convert(config_helper.LOCAL_TIMEZONE).tz_localize(None)
+        self.manifest[ticker] = {
+            "start": start.strftime("%Y-%m-%d"),
+            "end": end.strftime("%Y-%m-%d"),
+            "checked": checked.strftime("%Y-%m-%d"),
+            "updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "close": close.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+        return ticker_data
+
+    def _load_manifest(self) -> Dict[str, Dict[str, str]]:
+        """Load the manifest of the store."""
+        manifest_path = self.path / self.manifest_file
+        if not manifest_path.exists():
+            return {}
+        with open(manifest_path, "r") as f:
+            return json.load(f)
+
+    def _save_manifest(self) -> None:
+        """Save the manifest of the store."""
+        with open(self.path / self.manifest_file, "w") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
@@ -456,7 +456,13 @@ class Yahoo:
     def __init__(self) -> None:
         pass
 
-    def stock_history(self, tickers: List[str], min_year: int) -> pd.DataFrame:
+    def stock_history(
+        self,
+        tickers: List[str],
+        min_year: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> pd.DataFrame:
         """
         Get stock history data for a set of tickers.
 
@@ -464,8 +470,12 @@ class Yahoo:
         ----------
         tickers : list
             symbols to get data for
-        min_year : int
+        min_year : int (optional)
             the minimum year to get data for
+        start : datetime (optional)
+            the start date to get data for, which overrides the min_year
+        end : datetime (optional)
+            the end date to get data for (exclusive)
 
         Returns
         -------
@@ -476,12 +486,27 @@ class Yahoo:
                - last price
 
         """
+        if start is None:
+            if min_year is None:
+                raise ValueError("either min_year or start needs to be provided")
+            start = datetime(min_year, 1, 1)
+        if end is None:
+            end = datetime(2100, 1, 1)
+        cols = ["ticker", "date", "adj_close", "stock_splits"]
+
         stock_data = yf.download(
             tickers,
-            start=datetime(min_year, 1, 1),
-            end=datetime(2100, 1, 1),
+            start=start,
+            end=end,
             actions=True,  # get dividends and stock splits
         )
+        if stock_data.empty:
+            logger.warning(f"No stock history found for {tickers} from {start}")
+            stock_data = pd.DataFrame(columns=cols)
+            stock_data = stock_data.rename(columns={"adj_close": "last_price"})
+            stock_data["date"] = pd.to_datetime(stock_data["date"])
+            return stock_data
+
         stock_data = self._clean_index(clean_df=stock_data, lvl=0, tickers=tickers)
         stock_data.index = stock_data.index.rename("date")
         stock_data.columns = stock_data.columns.rename("measure", level=0)
@@ -491,7 +516,6 @@ class Yahoo:
         stock_data.index = stock_data.index.swaplevel("date", "ticker")
         stock_data = stock_data.sort_index(axis=0, level="ticker")
         stock_data = stock_data.reset_index()
-        cols = ["ticker", "date", "adj_close", "stock_splits"]
         stock_data = stock_data[cols]
         stock_data = stock_data.rename(columns={"adj_close": "last_price"})
         stock_data["date"] = helper.convert_date_to_timezone(
@@ -5,7 +5,7 @@ import ast
 from argparse import ArgumentDefaultsHelpFormatter
 
 from folioflex.dashboard import app
-from folioflex.portfolio.portfolio import Manager, Portfolio
+from folioflex.portfolio.portfolio import Manager, Portfolio, convert_ledger
 from folioflex.utils import mailer
 
 
@@ -229,6 +229,28 @@ def _create_argparser():
         help=("The scraper to use for the chatbot - 'bee' or 'selenium'"),
     )
 
+    # subparser: convert
+    _convert_parser = _subparsers.add_parser(
+        "convert", help="convert a transactions file to parquet or feather"
+    )
+    _convert_parser.add_argument(
+        "-t",
+        "--tx_file",
+        type=str,
+        help="The csv or xlsx transactions file to convert",
+    )
+
+    _convert_parser.add_argument(
+        "-o",
+        "--output_file",
+        type=str,
+        default=None,
+        help=(
+            "The parquet or feather file to write. "
+            "None is the transactions file with a parquet suffix"
+        ),
+    )
+
     # subparser: dashboard
     _dash_parser = _subparsers.add_parser("dash", help="dashboard command")
 
@@ -271,6 +293,10 @@ def cli():
         )
         print(f"status sent: {email_status}")
 
+    elif args.command == "convert":
+        output_file = convert_ledger(tx_file=args.tx_file, output_file=args.output_file)
+        print(f"converted transactions to {output_file}")
+
     elif args.command == "dash":
         app.app.run_server(debug=True)
 
@@ -93,20 +93,25 @@ def portfolio_query(config_file, broker="all", lookback=None):
     cq_portfolio_dict = {}
     cq_portfolio_dict["transactions"] = transactions.to_json()
     cq_portfolio_dict["performance"] = (
-        personal_portfolio.get_performance(lookback=lookback).reset_index().to_json()
+        personal_portfolio.get_performance(lookback=lookback, prettify=False)
+        .reset_index()
+        .to_json()
     )
-    view_return = personal_portfolio.get_view(view="return", lookback=lookback)
+    views = personal_portfolio.get_views(
+        views=["return", "cumulative_cost", "market_value"], lookback=lookback
+    )
+    view_return = views["return"]
     filtered_columns = [
         col for col in view_return.columns if "benchmark" in col or col == "portfolio"
     ]
     view_return = view_return[filtered_columns]
     cq_portfolio_dict["view_return"] = view_return.to_json()
 
-    view_cost = personal_portfolio.get_view(view="cumulative_cost", lookback=lookback)
+    view_cost = views["cumulative_cost"]
     view_cost = view_cost[filtered_columns]
     cq_portfolio_dict["view_cost"] = view_cost.to_json()
 
-    view_market = personal_portfolio.get_view(view="market_value", lookback=lookback)
+    view_market = views["market_value"]
     view_market = view_market[filtered_columns]
     cq_portfolio_dict["view_market_value"] = view_market.to_json()
 
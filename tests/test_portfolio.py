@@ -1,13 +1,19 @@
 """Tests the portfolio tracker."""
 
+import json
+import multiprocessing
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 from datetime import timedelta
+from functools import partial
 
 import numpy as np
 import pandas as pd
 import pandas_market_calendars as mcal
+import pytest
 from pyxirr import xirr
 
-from folioflex.portfolio import portfolio
+from folioflex.portfolio import helper, portfolio
 from folioflex.utils import config_helper
 
 date = "05-02-2022"  # date to test for performance
@@ -74,6 +80,37 @@ def test_calc_average_price():
     ), "Expected average price to match the weighted cost basis"
 
 
+def test_calc_average_prices():
+    """Checks vectorized average price matches the per ticker calculation."""
+    tx_hist_df = pf.transactions_history
+    tx_hist_df = tx_hist_df[tx_hist_df["ticker"] != "portfolio"]
+    # a long segment of round trips after a purchase
+    round_trips = pd.DataFrame(
+        {
+            "ticker": "ROUND",
+            "date": pd.date_range("2020-01-01", periods=401),
+            "units": [1.0, *[100.0, -100.0] * 200],
+            "price": [10.0, *np.linspace(10, 20, 400)],
+        }
+    )
+    tx_hist_df = pd.concat(
+        [
+            tx_hist_df[["ticker", "date", "units", "price"]].astype({"ticker": str}),
+            round_trips,
+        ]
+    ).sort_values(by=["ticker", "date"], ignore_index=True)
+    tx_hist_df["cumulative_units"] = tx_hist_df.groupby("ticker")["units"].cumsum()
+
+    test_df = tx_hist_df.groupby("ticker", group_keys=False)[
+        ["units", "price", "cumulative_units"]
+    ].apply(pf._calc_average_price)
+    average_prices = pf._calc_average_prices(tx_hist_df.copy())
+
+    assert np.allclose(
+        average_prices["average_price"], test_df["average_price"], equal_nan=True
+    ), "Expected vectorized average price to match the per ticker calculation"
+
+
 def test_calc_return_pct():
     """Checks calculations of performance - return percent."""
     performance = pf.get_performance(date=date, prettify=False)
@@ -94,6 +131,89 @@ def test_calc_return_pct():
     ), "Expected return percentage to match dollar weight"
 
 
+def test_calc_return_pcts():
+    """Checks batched return percents match the ticker return percents."""
+    for lookback in [None, 10, 365]:
+        return_pcts = pf._get_return_pcts(date=pd.to_datetime(date), lookback=lookback)
+        for ticker in return_pcts.index:
+            return_dict = pf._get_return_pct(
+                ticker=ticker, date=pd.to_datetime(date), lookback=lookback
+            )
+            assert np.allclose(
+                return_pcts.loc[ticker, ["dwrr_pct", "div_dwrr_pct"]].astype(float),
+                [
+                    return_dict["dwrr_return_pct"],
+                    return_dict["div_dwrr_return_pct"],
+                ],
+                equal_nan=True,
+            ), f"Expected batched return percent to match for {ticker}"
+
+
+def test_xirr_batch():
+    """Checks batched xirr matches the xirr of each series."""
+    cash_flows = pf._get_cash_flows(
+        date=pd.to_datetime(date),
+        tx_hist_df=pf.transactions_history[
+            pf.transactions_history["date"] <= pd.to_datetime(date)
+        ],
+    )
+    series = [group for _, group in cash_flows.groupby("ticker")]
+    lengths = np.array([len(group) for group in series])
+    dates = np.zeros((len(series), lengths.max()), dtype="datetime64[D]")
+    amounts = np.zeros((len(series), lengths.max()))
+    for i, group in enumerate(series):
+        dates[i, : lengths[i]] = group["date"]
+        amounts[i, : lengths[i]] = group["return_txs"]
+
+    rates = helper.xirr_batch(dates, amounts, lengths)
+    for i, group in enumerate(series):
+        test_rate = xirr(group["date"], group["return_txs"], silent=True)
+        test_rate = np.nan if test_rate is None else test_rate
+        assert np.isclose(
+            rates[i], test_rate, equal_nan=True
+        ), f"Expected batched xirr to match for {group['ticker'].iloc[0]}"
+
+
+def test_xirr_batch_random():
+    """Checks batched xirr matches pyxirr on random cash flow series."""
+    rng = np.random.default_rng(0)
+    n_series, max_length = 1000, 12
+    lengths = rng.integers(2, max_length + 1, n_series)
+    dates = np.zeros((n_series, max_length), dtype="datetime64[D]")
+    amounts = np.zeros((n_series, max_length))
+    all_days = np.arange(np.datetime64("2010-01-01"), np.datetime64("2024-01-01"))
+    for i, length in enumerate(lengths):
+        # purchases, some sales and a market value, with dates descending
+        cash_flows = -rng.uniform(10, 1000, length)
+        sales = rng.random(length) < 0.2
+        cash_flows[sales] *= -rng.uniform(0.2, 1.0, sales.sum())
+        cash_flows[0] = -abs(cash_flows[0])
+        cash_flows[-1] = -cash_flows[:-1].sum() * rng.uniform(0.1, 3.0)
+        dates[i, :length] = np.sort(rng.choice(all_days, length, replace=False))[::-1]
+        amounts[i, :length] = cash_flows[::-1]
+
+    # series with several sign changes
+    for i, cash_flows in enumerate(
+        [
+            [10.65, -380.79, 750.62, -384.7],
+            [1709.13, -6207.06, -2284.19, -341.07, -736.15, 485.69, -99.98],
+            [328, -404, 135],
+        ]
+    ):
+        lengths[i] = len(cash_flows)
+        amounts[i] = 0
+        amounts[i, : len(cash_flows)] = cash_flows
+    dates[0, :4] = ["2022-02-12", "2019-03-04", "2014-06-29", "2012-01-01"]
+
+    rates = helper.xirr_batch(dates, amounts, lengths)
+    for i, length in enumerate(lengths):
+        test_rate = xirr(dates[i, :length], amounts[i, :length], silent=True)
+        test_rate = np.nan if test_rate is None else test_rate
+        assert np.isclose(
+            rates[i], test_rate, equal_nan=True
+        ), f"Expected batched xirr to match pyxirr for {amounts[i, :length]}"
+
+
 def test_calc_div_return_pct():
     """Checks calculations of performance - return percent."""
     performance = pf.get_performance(date=date, prettify=False)
@@ -119,6 +239,43 @@ def test_calc_market_value():
     ), "Expected market_value to be last_price * cumulative_units"
 
 
+def test_add_portfolio():
+    """Checks the portfolio rollup is the sum of the tickers on each date."""
+    tx_hist_df = pf.transactions_history
+    portfolio_tx_hist = tx_hist_df[tx_hist_df["ticker"] == "portfolio"].set_index(
+        "date"
+    )
+    ticker_tx_hist = tx_hist_df[
+        (tx_hist_df["ticker"] != "portfolio")
+        & (~tx_hist_df["ticker"].str.contains("benchmark"))
+    ]
+
+    for view in ["cost", "market_value", "return", "cumulative_dividend"]:
+        test_view = (
+            ticker_tx_hist.groupby("date")[view]
+            .sum()
+            .reindex(portfolio_tx_hist.index, fill_value=0)
+        )
+        assert np.allclose(
+            portfolio_tx_hist[view], test_view
+        ), f"Expected portfolio {view} to be the sum of the tickers"
+
+
+def test_add_benchmarks():
+    """Checks batched benchmarks match the benchmarks added one at a time."""
+    benchmark_tx_hist = pf._add_benchmarks(
+        tx_df=pf.transactions, tickers=["IVV", "SPY"]
+    )
+    for ticker in ["IVV", "SPY"]:
+        test_tx_hist = pf._add_benchmarks(tx_df=pf.transactions, tickers=[ticker])
+        ticker_tx_hist = benchmark_tx_hist[
+            benchmark_tx_hist["ticker"] == f"benchmark-{ticker}"
+        ]
+        assert ticker_tx_hist.reset_index(drop=True).equals(
+            test_tx_hist.reset_index(drop=True)
+        ), f"Expected batched benchmark to match for {ticker}"
+
+
 def test_calc_cumulative_cost():
     """Checks calculations of performance - cumulative cost."""
     performance = pf.get_performance(date=date)
@@ -201,6 +358,327 @@ def test_calc_realized_return():
     ), "Expected realized to be return - unrealized"
 
 
+def test_performance_series():
+    """Checks performance series matches the performance of each date."""
+    dates = ["2021-03-01", date, pf._max_date]
+    performance_series = pf.get_performance_series(dates=dates)
+
+    for series_date in performance_series.index.get_level_values("date").unique():
+        performance = pf.get_performance(date=series_date, prettify=False)
+        performance = performance.drop(columns="date")
+        test_df = performance_series.loc[series_date][performance.columns]
+        assert np.allclose(
+            test_df.drop(columns="lookback_date").astype(float),
+            performance.loc[test_df.index].drop(columns="lookback_date").astype(float),
+            equal_nan=True,
+        ), f"Expected performance series to match performance on {series_date}"
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FutureWarning)
+        monthly_series = pf.get_performance_series()
+    month_ends = pd.date_range(
+        pf.transactions_history["date"].min(), pf._max_date, freq="ME"
+    )
+    monthly_dates = monthly_series.index.get_level_values("date").unique()
+    assert (
+        len(monthly_dates) == len(month_ends) and (monthly_dates <= month_ends).all()
+    ), "Expected the default dates to be the month ends"
+
+
+def test_summary():
+    """Checks summary matches the portfolio performance of each lookback."""
+    lookbacks = [30, 365]
+    summary = pf._get_summary(date=date, lookbacks=lookbacks)
+
+    for lookback in lookbacks:
+        performance = pf.get_performance(date=date, lookback=lookback, prettify=False)
+        cols = ["market_value", "return", "realized", "unrealized", "dwrr_pct"]
+        assert np.allclose(
+            summary.loc[lookback, cols].astype(float),
+            performance.loc["portfolio", cols].astype(float),
+            equal_nan=True,
+        ), f"Expected summary to match portfolio performance for {lookback}"
+        assert np.isclose(
+            summary.loc[lookback, "benchmark_dwrr_pct"],
+            performance.loc["benchmark-IVV", "dwrr_pct"],
+        ), f"Expected summary benchmark to match performance for {lookback}"
+
+
+def test_trading_calendar(tmp_path):
+    """Checks trading calendar matches the NYSE schedule."""
+    trading_calendar = helper.TradingCalendar(path=tmp_path / "calendar.parquet")
+    stock_dates = (
+        mcal.get_calendar("NYSE")
+        .schedule(start_date="2021-12-01", end_date="2022-06-01")
+        .index
+    )
+    dates = pd.Series(pd.date_range("2022-01-01", date, freq="D"))
+
+    previous_dates = trading_calendar.previous_date(dates)
+    test_dates = [stock_dates[stock_dates <= day].max() for day in dates]
+    assert list(previous_dates) == test_dates, "Expected previous trading days"
+
+    next_dates = trading_calendar.next_date(dates, inclusive=False)
+    test_dates = [stock_dates[stock_dates > day].min() for day in dates]
+    assert list(next_dates) == test_dates, "Expected next trading days"
+
+    saved_calendar = helper.TradingCalendar(path=tmp_path / "calendar.parquet")
+    assert saved_calendar.schedule.equals(
+        trading_calendar.schedule
+    ), "Expected the schedule to be saved"
+
+
+def test_shared_trading_calendar(tmp_path, monkeypatch):
+    """Checks the helpers use the saved schedule of the shared calendar."""
+    helper.get_trading_calendar.cache_clear()
+    calendar_file = tmp_path / "calendar.parquet"
+    today = pd.Timestamp.today().normalize()
+    mondays = pd.date_range(f"{today.year - 1}-01-01", f"{today.year + 1}-12-31")
+    mondays = mondays[mondays.dayofweek == 0]
+    pd.DataFrame(
+        {
+            "market_open": (mondays + timedelta(hours=14, minutes=30)).tz_localize(
+                "UTC"
+            ),
+            "market_close": (mondays + timedelta(hours=21)).tz_localize("UTC"),
+        },
+        index=mondays,
+    ).to_parquet(calendar_file)
+
+    calendar_config = tmp_path / "calendar_config.yml"
+    calendar_config.write_text(
+        open(config_path)
+        .read()
+        .replace(
+            "    stock_splits: static.stock_splits",
+            "    stock_splits: static.stock_splits\n"
+            f"    calendar_path: {calendar_file}",
+            1,
+        )
+    )
+    portfolio.Portfolio(config_path=calendar_config, portfolio="test", build=False)
+    assert (
+        helper.get_trading_calendar().path == calendar_file
+    ), "Expected the config to set the file of the shared calendar"
+    assert helper.most_recent_stock_date() == (
+        mondays[mondays <= today].max().date()
+    ), "Expected the most recent stock date from the saved schedule"
+    helper.get_trading_calendar.cache_clear()
+
+
+def test_check_stock_dates():
+    """Checks invalid transaction dates are fixed to the previous market date."""
+    stock_dates = (
+        mcal.get_calendar("NYSE")
+        .schedule(start_date="2021-12-01", end_date="2022-06-01")
+        .index.date
+    )
+    tx_df = pd.DataFrame(
+        {"date": pd.date_range("2022-01-01", date, freq="D").date.repeat(3), "units": 1}
+    )
+
+    check = helper.check_stock_dates(tx_df, fix=True, warning=False)
+    test_dates = [
+        max(stock_date for stock_date in stock_dates if stock_date <= day)
+        for day in tx_df["date"]
+    ]
+    assert list(check["fix_tx_df"]["date"]) == test_dates, "Expected fixed dates"
+    assert check["invalid_dt"] == [], "Expected no invalid dates after fixing"
+    assert check["fix_dt"] == {
+        day: fix_dt
+        for day, fix_dt in zip(tx_df["date"], test_dates, strict=True)
+        if day != fix_dt
+    }, "Expected mapping of invalid dates to fixed dates"
+
+    check = helper.check_stock_dates(tx_df, fix=False)
+    assert len(check["invalid_dt"]) == 3 * sum(
+        day not in stock_dates for day in tx_df["date"].unique()
+    ), "Expected invalid dates when not fixing"
+
+
+def test_get_views():
+    """Checks the cached views match the views of the transactions history."""
+    views = ["return", "cumulative_cost", "market_value"]
+    for lookback in [None, 30]:
+        cached_views = pf.get_views(views=views, lookback=lookback)
+        for view in views:
+            test_view = pf.get_view(
+                view=view, tx_hist_df=pf.transactions_history, lookback=lookback
+            )
+            assert cached_views[view].equals(
+                test_view
+            ), f"Expected cached {view} view to match"
+            assert pf.get_view(view=view, lookback=lookback).equals(
+                test_view
+            ), f"Expected cached {view} view to be reused"
+
+    view_cache = pf._view_cache
+    pf.transactions_history = pf.transactions_history
+    assert (
+        len(pf._view_cache) == 0 and len(view_cache) > 0
+    ), "Expected views to be cleared when the transactions history changes"
+
+
+def test_prettify_performance():
+    """Checks the prettified performance formats the cached numeric performance."""
+    performance = pf.get_performance(date=date, prettify=False)
+    pretty_performance = pf.get_performance(date=date)
+    cache_key = (pd.to_datetime(date), None, pf._history_version)
+    assert (
+        cache_key in pf._performance_cache
+    ), "Expected numeric performance to be cached"
+
+    pct_cols = performance.filter(like="pct").columns
+    for pct_col in pct_cols:
+        test_pcts = performance[pct_col].apply("{:.2%}".format)
+        assert pretty_performance[pct_col].equals(
+            test_pcts
+        ), f"Expected {pct_col} to be formatted as a percentage"
+    assert pf.get_performance(date=date, prettify=False).equals(
+        performance
+    ), "Expected prettify to not change the cached performance"
+    assert helper.format_pct(pd.Series([0.1234, None], dtype=object)).tolist() == [
+        "12.34%",
+        "NaN",
+    ], "Expected None to be formatted as NaN"
+
+
+def test_twrr_series():
+    """Checks the time weighted return follows market value without cash flows."""
+    twrr_series = pf.get_twrr_series()
+    assert twrr_series.columns[0] == "portfolio" and all(
+        "benchmark" in col for col in twrr_series.columns[1:]
+    ), "Expected the portfolio and benchmarks"
+    assert (
+        pf._get_twrr_returns() is pf._twrr_returns
+    ), "Expected the daily returns to be cached"
+
+    views = pf.get_views(views=["market_value", "cost"])
+    for ticker in twrr_series.columns:
+        market_value = views["market_value"][ticker].fillna(0)
+        no_flows = (views["cost"][ticker].fillna(0) == 0) & (market_value.shift(1) > 0)
+        growth = (1 + twrr_series[ticker]) / (1 + twrr_series[ticker].shift(1))
+        assert np.allclose(
+            growth[no_flows], (market_value / market_value.shift(1))[no_flows]
+        ), f"Expected {ticker} return to be the market value change without flows"
+
+    lookback_series = pf.get_twrr_series(lookback=30)
+    assert (
+        lookback_series.iloc[0] == 0
+    ).all(), "Expected lookback return to start at 0"
+    assert np.allclose(
+        1 + lookback_series.iloc[-1],
+        (1 + twrr_series.iloc[-1]) / (1 + twrr_series.loc[lookback_series.index[0]]),
+    ), "Expected lookback return to be linked from the lookback date"
+
+
+def test_compact_dtypes():
+    """Checks the compact portfolio matches the portfolio with less memory."""
+    pf_compact = portfolio.Portfolio(
+        config_path=config_path, portfolio="test", build=False
+    )
+    pf_compact.compact_dtypes = "float32"
+    pf_compact._build()
+
+    assert isinstance(
+        pf_compact.transactions_history["ticker"].dtype, pd.CategoricalDtype
+    ), "Expected tickers to be categories"
+    assert (
+        pf_compact.transactions_history["last_price"].dtype == "float32"
+    ), "Expected prices to be float32"
+    assert (
+        pf_compact.memory_usage()["bytes"].sum() < pf.memory_usage()["bytes"].sum()
+    ), "Expected compact portfolio to use less memory"
+
+    performance = pf.get_performance(date=date, prettify=False)
+    compact_performance = pf_compact.get_performance(date=date, prettify=False)
+    assert np.allclose(
+        compact_performance[["market_value", "return", "dwrr_pct"]].astype(float),
+        performance[["market_value", "return", "dwrr_pct"]].astype(float),
+        rtol=1e-5,
+        equal_nan=True,
+    ), "Expected compact portfolio performance to match"
+
+
+def test_sparse_history():
+    """Checks the sparse portfolio matches the portfolio with fewer rows."""
+    pf_sparse = portfolio.Portfolio(
+        config_path=config_path, portfolio="test", build=False
+    )
+    pf_sparse.sparse_history = True
+    pf_sparse._build()
+
+    tx_hist_df = pf_sparse.transactions_history
+    assert len(tx_hist_df) < len(
+        pf.transactions_history
+    ), "Expected sparse history to have fewer rows"
+    assert tx_hist_df[tx_hist_df["ticker"] == "CCIV"]["date"].max() == pd.Timestamp(
+        "2021-10-20"
+    ), "Expected closed ticker history to end at the closing transaction"
+
+    for lookback in [None, 30]:
+        performance = pf.get_performance(date=date, lookback=lookback, prettify=False)
+        sparse_performance = pf_sparse.get_performance(
+            date=date, lookback=lookback, prettify=False
+        )
+        assert "CCIV" in sparse_performance.index, "Expected closed ticker"
+        performance = performance.loc[sparse_performance.index]
+        cols = ["market_value", "return", "realized", "dwrr_pct"]
+        assert np.allclose(
+            sparse_performance[cols].astype(float),
+            performance[cols].astype(float),
+            equal_nan=True,
+        ), f"Expected sparse performance to match for lookback {lookback}"
+
+    assert np.allclose(
+        pf_sparse.get_view(view="return")["portfolio"],
+        pf.get_view(view="return")["portfolio"].loc[
+            pf_sparse.get_view(view="return").index
+        ],
+    ), "Expected sparse portfolio view to match"
+
+
+def test_adjust_lookback_vars():
+    """Checks the lookback variables start at 0 for each ticker."""
+    variables = ["return", "unrealized", "realized", "cumulative_dividend"]
+    for lookback in [3, 10, 30, 90, 365]:
+        lookback_df = pf._filter_lookback(lookback=lookback)
+        adjusted_df = pf._adjust_lookback_vars(lookback_df.copy())
+
+        test_df = lookback_df.copy()
+        for variable in variables:
+            test_df[variable] = (
+                test_df.groupby("ticker")[variable]
+                .transform(
+                    lambda x: (
+                        np.nan if x.dropna().empty else x - x.loc[x.last_valid_index()]
+                    )
+                )
+                .fillna(0)
+            )
+
+        assert adjusted_df.equals(
+            test_df
+        ), f"Expected adjusted variables to match for lookback {lookback}"
+
+
+def test_lookback_changes():
+    """Checks the lookback index matches the lookback performance."""
+    variables = ["return", "unrealized", "realized", "cumulative_dividend"]
+    lookbacks = [3, 10, 30, 365]
+    changes = pf.get_lookback_changes(lookbacks=lookbacks, date=date)
+    for lookback in lookbacks:
+        performance = pf.get_performance(date=date, lookback=lookback, prettify=False)
+        lookback_changes = changes.xs(lookback, level="lookback")
+        assert set(lookback_changes.index) == set(
+            performance.index
+        ), f"Expected the same tickers for lookback {lookback}"
+        assert np.allclose(
+            lookback_changes.loc[performance.index, variables],
+            performance[variables].astype(float),
+        ), f"Expected lookback changes to match for lookback {lookback}"
+
+
 def test_lookback():
     """Checks calculations of fund transactions."""
     lookback = 10
@@ -353,3 +831,454 @@ def test_yf_download():
     assert test_price_history.equals(
         price_history
     ), "Expected the downloaded price history to match the offline file."
+
+
+def test_get_transactions_filter():
+    """Checks the transactions are filtered to the brokers as the file is read."""
+    broker_transactions = [
+        portfolio.Portfolio(
+            config_path=config_path, portfolio=broker, build=False
+        ).transactions
+        for broker in ["company_a", "company_b"]
+    ]
+    test_df = pd.read_csv(pf.file)
+
+    for broker, transactions in zip(
+        ["company_a", "company_b"], broker_transactions, strict=True
+    ):
+        assert (
+            len(transactions) == (test_df["broker"] == broker).sum()
+        ), f"Expected only the transactions of {broker}"
+    assert list(broker_transactions[0].columns) == [
+        *portfolio.TX_COLUMNS,
+        "price",
+    ], "Expected only the fields of the portfolio to be read"
+    assert (
+        broker_transactions[0]["date"].dtype == pf.transactions["date"].dtype
+    ), "Expected dates to be parsed"
+
+
+def test_columnar_ledger(tmp_path):
+    """Checks converted parquet and feather files load the same transactions."""
+    for suffix in ["parquet", "feather"]:
+        output_file = portfolio.convert_ledger(
+            tx_file=pf.file, output_file=str(tmp_path / f"transactions.{suffix}")
+        )
+        pf_columnar = portfolio.Portfolio(
+            config_path=config_path, portfolio="test", build=False
+        )
+        pf_columnar.file = output_file
+        transactions = pf_columnar.get_transactions(
+            filter_type=pf_columnar.filter_type,
+            filter_broker=pf_columnar.filter_broker,
+            other_fields=pf_columnar.other_fields,
+        )
+        assert transactions.equals(
+            pf_columnar.transactions
+        ), f"Expected {suffix} transactions to match the csv transactions"
+
+        broker_transactions = portfolio._read_transactions(
+            file_path=output_file,
+            cols=portfolio.TX_COLUMNS,
+            filter_type=["DIVIDEND"],
+            filter_broker=["company_b"],
+        )
+        assert (
+            len(broker_transactions) > 0
+            and (broker_transactions["broker"] == "company_b").all()
+            and (broker_transactions["type"] != "DIVIDEND").all()
+        ), f"Expected {suffix} filters to be applied by the reader"
+
+
+def test_snapshot(tmp_path, monkeypatch):
+    """Checks a snapshot reloads the portfolio without building it."""
+    snapshot_path = pf.save_snapshot(tmp_path / "snapshot")
+
+    def failing_build(self, stock_history=None):
+        raise RuntimeError("portfolio should not be built")
+
+    with monkeypatch.context() as m:
+        m.setattr(portfolio.Portfolio, "_build", failing_build)
+        pf_snapshot = portfolio.Portfolio.load_snapshot(
+            path=snapshot_path, config_path=config_path, portfolio="test"
+        )
+    for frame in portfolio.SNAPSHOT_FRAMES:
+        assert getattr(pf_snapshot, frame).equals(
+            getattr(pf, frame)
+        ), f"Expected the {frame} of the snapshot to match"
+    assert pf_snapshot.get_performance(date=date, prettify=False).equals(
+        pf.get_performance(date=date, prettify=False)
+    ), "Expected the performance of the snapshot to match"
+
+    # a snapshot that does not match the inputs is built and saved again
+    manifest_file = snapshot_path / portfolio.SNAPSHOT_MANIFEST
+    manifest = json.loads(manifest_file.read_text())
+    manifest["fingerprints"]["tx_file"]["hash"] = "changed"
+    manifest_file.write_text(json.dumps(manifest))
+    builds = []
+    build = portfolio.Portfolio._build
+
+    def counted_build(self, stock_history=None):
+        builds.append(self.name)
+        build(self, stock_history=stock_history)
+
+    monkeypatch.setattr(portfolio.Portfolio, "_build", counted_build)
+    portfolio.Portfolio.load_snapshot(
+        path=snapshot_path, config_path=config_path, portfolio="test"
+    )
+    assert builds == ["test"], "Expected a stale snapshot to be built"
+    assert (
+        json.loads(manifest_file.read_text())["fingerprints"] == pf._fingerprints
+    ), "Expected the snapshot to be saved again"
+
+
+def test_refresh(tmp_path, monkeypatch):
+    """Checks refresh builds again only the stages whose inputs changed."""
+    tx_file = tmp_path / "transactions.csv"
+    history_file = tmp_path / "price_history.csv"
+    tx_file.write_text(open(pf.file).read())
+    history_file.write_text(open(config_dict["history_offline"]).read())
+    refresh_config = tmp_path / "refresh_config.yml"
+    refresh_config.write_text(
+        open(config_path)
+        .read()
+        .replace("tests/files/test_transactions.csv", str(tx_file))
+        .replace("tests/files/price_history.csv", str(history_file))
+    )
+    pf_refresh = portfolio.Portfolio(config_path=refresh_config, portfolio="test")
+
+    # saving the file without changes does not change the content hash
+    tx_file.write_text(tx_file.read_text())
+    assert not pf_refresh.is_stale(), "Expected unchanged files to not be stale"
+    assert pf_refresh.refresh() == [], "Expected nothing to be refreshed"
+
+    # new transactions do not read the offline price history again
+    with open(tx_file, "a") as f:
+        f.write("company_a,5/3/2022,BUY,AMD,1,95,-95,\n")
+    assert pf_refresh.is_stale(), "Expected a new transaction to be stale"
+    with monkeypatch.context() as m:
+        m.setattr(portfolio.Portfolio, "_get_price_history", None)
+        assert pf_refresh.refresh() == [
+            "transactions"
+        ], "Expected the transactions to be refreshed"
+    test_pf = portfolio.Portfolio(config_path=refresh_config, portfolio="test")
+    assert pf_refresh.transactions_history.equals(
+        test_pf.transactions_history
+    ), "Expected refreshed transactions to match a new portfolio"
+
+    # new prices do not read the transactions or adjust stock splits again
+    price_history = pd.read_csv(history_file, index_col=0)
+    price_history.loc[price_history["ticker"] == "AMD", "last_price"] *= 1.01
+    price_history.to_csv(history_file)
+    with monkeypatch.context() as m:
+        m.setattr(portfolio.Portfolio, "get_transactions", None)
+        m.setattr(portfolio.Portfolio, "_add_stock_splits", None)
+        assert pf_refresh.refresh() == ["prices"], "Expected prices to be refreshed"
+    test_pf = portfolio.Portfolio(config_path=refresh_config, portfolio="test")
+    assert pf_refresh.transactions_history.equals(
+        test_pf.transactions_history
+    ), "Expected refreshed prices to match a new portfolio"
+    assert not pf_refresh.is_stale(), "Expected the portfolio to be up to date"
+
+
+def test_fingerprint_cache(tmp_path, monkeypatch):
+    """Checks portfolios created from the same files hash them once."""
+    tx_file = tmp_path / "transactions.csv"
+    tx_file.write_text(open(pf.file).read())
+    cache_config = tmp_path / "cache_config.yml"
+    cache_config.write_text(
+        open(config_path)
+        .read()
+        .replace("tests/files/test_transactions.csv", str(tx_file))
+    )
+    hashes = []
+    hash_file = helper.hash_file
+
+    def counted_hash_file(path, chunk_size=1 << 20):
+        hashes.append(str(path))
+        return hash_file(path, chunk_size=chunk_size)
+
+    monkeypatch.setattr(helper, "hash_file", counted_hash_file)
+    pf_cache = portfolio.Portfolio(config_path=cache_config, portfolio="test")
+    portfolio.Portfolio(config_path=cache_config, portfolio="test", build=False)
+    assert not pf_cache.is_stale(), "Expected the portfolio to be up to date"
+    assert hashes.count(str(tx_file)) == 1, "Expected the file to be hashed once"
+
+    with open(tx_file, "a") as f:
+        f.write("company_a,5/3/2022,BUY,AMD,1,95,-95,\n")
+    assert pf_cache.is_stale(), "Expected a changed file to be hashed again"
+    assert hashes.count(str(tx_file)) == 2, "Expected the changed file to be hashed"
+
+
+def test_extend_prices(tmp_path):
+    """Checks extending prices matches a portfolio built with the prices."""
+    price_history = pd.read_csv(
+        config_dict["history_offline"], index_col=0, parse_dates=["date"]
+    )
+    new_dates = np.sort(price_history["date"].unique())[-3:]
+    history_file = tmp_path / "price_history.csv"
+    price_history[price_history["date"] < new_dates[0]].to_csv(history_file)
+    extend_config = tmp_path / "extend_config.yml"
+    extend_config.write_text(
+        open(config_path)
+        .read()
+        .replace("tests/files/price_history.csv", str(history_file))
+    )
+    pf_extend = portfolio.Portfolio(config_path=extend_config, portfolio="test")
+    performance = pf_extend.get_performance(date=date, prettify=False)
+
+    pf_extend.extend_prices(
+        price_history.loc[
+            price_history["date"].isin(new_dates), ["ticker", "date", "last_price"]
+        ]
+    )
+    tx_hist = pf_extend.transactions_history
+    test_tx_hist = pf.transactions_history
+    assert tx_hist[["ticker", "date"]].equals(
+        test_tx_hist[["ticker", "date"]]
+    ), "Expected the extended rows to be in the history order"
+    numeric_cols = test_tx_hist.select_dtypes("number").columns
+    assert np.allclose(
+        tx_hist[numeric_cols], test_tx_hist[numeric_cols], equal_nan=True
+    ), "Expected extended prices to match a built portfolio"
+    assert np.allclose(
+        pf_extend.return_view, pf.return_view, equal_nan=True
+    ), "Expected the return view to be extended"
+    cached = pf_extend._performance_cache[
+        (pd.to_datetime(date), None, pf_extend._history_version)
+    ]
+    assert cached.equals(
+        performance
+    ), "Expected the performance of an earlier date to stay cached"
+
+
+def test_apply_transactions(tmp_path):
+    """Checks applying transactions matches a portfolio built with them."""
+    new_tx = pd.DataFrame(
+        {
+            "broker": ["company_a", "company_a", "company_a"],
+            "date": ["5/3/2022", "5/3/2022", "7/1/2021"],
+            "type": ["Cash", "BUY", "BUY"],
+            "ticker": ["Cash", "AMD", "AMD"],
+            "units": [100.0, 1.0, 1.0],
+            "price": [1.0, 95.0, 93.0],
+            "cost": [100.0, -95.0, -93.0],
+        }
+    )
+    pf_apply = portfolio.Portfolio(config_path=config_path, portfolio="test")
+    performance = pf_apply.get_performance(date="05-03-2021", prettify=False)
+    pf_apply.apply_transactions(new_tx)
+
+    tx_file = tmp_path / "transactions.csv"
+    tx_df = pd.read_csv(pf.file)
+    pd.concat([tx_df, new_tx]).to_csv(tx_file, index=False)
+    apply_config = tmp_path / "apply_config.yml"
+    apply_config.write_text(
+        open(config_path)
+        .read()
+        .replace("tests/files/test_transactions.csv", str(tx_file))
+    )
+    test_pf = portfolio.Portfolio(config_path=apply_config, portfolio="test")
+
+    tx_hist = pf_apply.transactions_history
+    test_tx_hist = test_pf.transactions_history
+    assert tx_hist[["ticker", "date"]].equals(
+        test_tx_hist[["ticker", "date"]]
+    ), "Expected the applied rows to be in the history order"
+    numeric_cols = test_tx_hist.select_dtypes("number").columns
+    assert np.allclose(
+        tx_hist[numeric_cols], test_tx_hist[numeric_cols], equal_nan=True
+    ), "Expected applied transactions to match a built portfolio"
+    assert np.allclose(
+        pf_apply.return_view, test_pf.return_view, equal_nan=True
+    ), "Expected the return view to be updated"
+    cached = pf_apply._performance_cache[
+        (pd.to_datetime("05-03-2021"), None, pf_apply._history_version)
+    ]
+    assert cached.equals(
+        performance
+    ), "Expected the performance before the transactions to stay cached"
+
+
+def test_apply_transactions_extend_split(tmp_path):
+    """Checks extending prices with a split keeps the applied transactions."""
+    price_history = pd.read_csv(
+        config_dict["history_offline"], index_col=0, parse_dates=["date"]
+    )
+    new_dates = np.sort(price_history["date"].unique())[-3:]
+    is_split = (price_history["ticker"] == "AMD") & (
+        price_history["date"] == new_dates[1]
+    )
+    price_history.loc[is_split, "stock_splits"] = 2
+    is_adjusted = (price_history["ticker"] == "AMD") & (
+        price_history["date"] < new_dates[1]
+    )
+    price_history.loc[is_adjusted, "last_price"] /= 2
+    history_file = tmp_path / "price_history.csv"
+    price_history[price_history["date"] < new_dates[0]].to_csv(history_file)
+    new_tx = pd.DataFrame(
+        {
+            "broker": ["company_a", "company_a"],
+            "date": ["5/3/2022", "5/3/2022"],
+            "type": ["Cash", "BUY"],
+            "ticker": ["Cash", "AMD"],
+            "units": [100.0, 1.0],
+            "price": [1.0, 95.0],
+            "cost": [100.0, -95.0],
+        }
+    )
+    tx_file = tmp_path / "transactions.csv"
+    pd.concat([pd.read_csv(pf.file), new_tx]).to_csv(tx_file, index=False)
+    extend_config = tmp_path / "extend_config.yml"
+    extend_config.write_text(
+        open(config_path)
+        .read()
+        .replace("tests/files/price_history.csv", str(history_file))
+    )
+    pf_extend = portfolio.Portfolio(config_path=extend_config, portfolio="test")
+    pf_extend.apply_transactions(new_tx)
+    pf_extend.extend_prices(
+        price_history.loc[
+            price_history["date"].isin(new_dates),
+            ["ticker", "date", "last_price", "stock_splits"],
+        ]
+    )
+
+    is_adjusted = (price_history["ticker"] == "AMD") & (
+        price_history["date"] <= new_dates[1]
+    )
+    price_history.loc[is_adjusted, "cumulative_stock_splits"] *= 2
+    history_file = tmp_path / "split_history.csv"
+    price_history.to_csv(history_file)
+    test_config = tmp_path / "test_config.yml"
+    test_config.write_text(
+        open(config_path)
+        .read()
+        .replace("tests/files/price_history.csv", str(history_file))
+        .replace("tests/files/test_transactions.csv", str(tx_file))
+    )
+    test_pf = portfolio.Portfolio(config_path=test_config, portfolio="test")
+
+    tx_hist = pf_extend.transactions_history
+    test_tx_hist = test_pf.transactions_history
+    assert tx_hist[["ticker", "date"]].equals(
+        test_tx_hist[["ticker", "date"]]
+    ), "Expected the extended rows to be in the history order"
+    numeric_cols = test_tx_hist.select_dtypes("number").columns
+    assert np.allclose(
+        tx_hist[numeric_cols], test_tx_hist[numeric_cols], equal_nan=True
+    ), "Expected the split to adjust the applied transactions"
+
+
+def _manager_config(tmp_path, monkeypatch, downloads):
+    """Create a manager config with two portfolios that download prices."""
+    offline_history = pd.read_csv(
+        config_dict["history_offline"], index_col=0, parse_dates=["date"]
+    )
+    offline_history = offline_history[["ticker", "date", "last_price", "stock_splits"]]
+
+    def stock_history(self, tickers, min_year=None, start=None, end=None):
+        downloads.append(list(tickers))
+        return offline_history[
+            offline_history["ticker"].isin(tickers)
+            & (offline_history["date"] >= f"{min_year}-01-01")
+        ]
+
+    monkeypatch.setattr(portfolio.Yahoo, "stock_history", stock_history)
+    manager_config = tmp_path / "manager_config.yml"
+    portfolio_config = "\n".join(
+        [
+            f"    tx_file: {config_helper.ROOT_PATH / pf.file}",
+            "    filter_type: []",
+            "    filter_broker: []",
+            f"    funds: {config_dict['funds']}",
+            f"    delisted: {config_dict['delisted']}",
+            f"    benchmarks: {config_dict['benchmarks']}",
+            "    other_fields: []",
+            "    stock_splits: True",
+        ]
+    )
+    manager_config.write_text(
+        f"investments:\n  first:\n{portfolio_config}\n  second:\n{portfolio_config}\n"
+    )
+
+    return str(manager_config)
+
+
+def test_manager_shared_history(tmp_path, monkeypatch):
+    """Checks the manager downloads the price history once for portfolios."""
+    downloads = []
+    manager_config = _manager_config(tmp_path, monkeypatch, downloads)
+    reads = []
+    read_transactions = portfolio._read_transactions
+
+    def counted_read_transactions(*args, **kwargs):
+        reads.append(kwargs["file_path"])
+        return read_transactions(*args, **kwargs)
+
+    monkeypatch.setattr(portfolio, "_read_transactions", counted_read_transactions)
+    manager = portfolio.Manager(config_path=manager_config)
+
+    assert len(downloads) == 1, "Expected a single download for the portfolios"
+    assert len(reads) == 1, "Expected a single read of the transactions file"
+    for manager_pf in manager.portfolios:
+        assert np.allclose(
+            manager_pf.transactions_history["market_value"],
+            pf.transactions_history["market_value"],
+            equal_nan=True,
+        ), f"Expected {manager_pf.name} to match the portfolio history"
+        assert manager_pf.transactions.equals(
+            pf.transactions
+        ), f"Expected {manager_pf.name} to match the portfolio transactions"
+
+
+def test_manager_workers(tmp_path, monkeypatch):
+    """Checks the manager builds portfolios in processes."""
+    manager_config = _manager_config(tmp_path, monkeypatch, [])
+
+    # the portfolios are sent to spawned workers without the patches
+    monkeypatch.setattr(
+        portfolio,
+        "ProcessPoolExecutor",
+        partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context("spawn")),
+    )
+    manager = portfolio.Manager(config_path=manager_config, workers=2)
+    assert [manager_pf.name for manager_pf in manager.portfolios] == [
+        "first",
+        "second",
+    ], "Expected the portfolios in the configured order"
+    assert np.allclose(
+        manager.portfolios[1].transactions_history["market_value"],
+        pf.transactions_history["market_value"],
+        equal_nan=True,
+    ), "Expected the portfolio built in a spawned process to match"
+
+    # only forked workers see the patched build of the second portfolio
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("forked workers are not available")
+    monkeypatch.setattr(
+        portfolio,
+        "ProcessPoolExecutor",
+        partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context("fork")),
+    )
+    calc_tx_metrics = portfolio.Portfolio._calc_tx_metrics
+
+    def failing_calc_tx_metrics(self, tx_hist_df):
+        if self.name == "second":
+            raise ValueError("failed to build")
+        return calc_tx_metrics(self, tx_hist_df)
+
+    monkeypatch.setattr(
+        portfolio.Portfolio, "_calc_tx_metrics", failing_calc_tx_metrics
+    )
+    manager = portfolio.Manager(config_path=manager_config, workers=2)
+
+    assert [manager_pf.name for manager_pf in manager.portfolios] == [
+        "first"
+    ], "Expected the portfolio that failed to be left out"
+    assert "second" in manager.errors, "Expected the error of the portfolio"
+    assert np.allclose(
+        manager.portfolios[0].transactions_history["market_value"],
+        pf.transactions_history["market_value"],
+        equal_nan=True,
+    ), "Expected the portfolio built in a process to match the portfolio history"
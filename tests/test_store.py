@@ -0,0 +1,218 @@
+"""Tests the price store."""
+
+import numpy as np
+import pandas as pd
+
+from folioflex.portfolio import store
+from folioflex.utils import config_helper
+
+price_history_file = config_helper.TESTS_PATH / "price_history.csv"
+offline_history = pd.read_csv(price_history_file, index_col=0, parse_dates=["date"])
+offline_history = offline_history[["ticker", "date", "last_price", "stock_splits"]]
+
+
+def _fake_stock_history(downloads, source=None):
+    """Create a stock history function that uses the offline price history."""
+
+    def stock_history(self, tickers, min_year=None, start=None, end=None):
+        downloads.append((list(tickers), start, end))
+        history = offline_history if source is None else source["history"]
+        stock_data = history[history["ticker"].isin(tickers)]
+        stock_data = stock_data[stock_data["date"] >= start]
+        if end is not None:
+            stock_data = stock_data[stock_data["date"] < end]
+        return stock_data
+
+    return stock_history
+
+
+def test_price_store(tmp_path, monkeypatch):
+    """Checks the price store only downloads the missing prices."""
+    downloads = []
+    monkeypatch.setattr(store.Yahoo, "stock_history", _fake_stock_history(downloads))
+    monkeypatch.setattr(
+        store, "most_recent_stock_date", lambda: pd.Timestamp("2023-10-27").date()
+    )
+    tickers = ["AMD", "IVV"]
+
+    # first call downloads the full history
+    price_store = store.PriceStore(path=tmp_path)
+    price_history = price_store.stock_history(tickers=tickers, min_year=2022)
+    assert len(downloads) == 1, "Expected the full history to be downloaded"
+
+    test_history = offline_history[
+        (offline_history["ticker"].isin(tickers))
+        & (offline_history["date"] >= "2022-01-01")
+    ]
+    assert len(price_history) == len(test_history), "Expected all prices stored"
+
+    # second call uses the store
+    price_store = store.PriceStore(path=tmp_path)
+    price_store.stock_history(tickers=tickers, min_year=2022)
+    assert len(downloads) == 1, "Expected no download when the store is current"
+
+    # earlier start only downloads the earlier dates
+    price_history = price_store.stock_history(tickers=tickers, min_year=2021)
+    assert len(downloads) == 2, "Expected a single download of the earlier dates"
+    assert downloads[-1][2] == pd.Timestamp("2022-01-01"), "Expected a backfill"
+    assert price_history["date"].min() < pd.Timestamp(
+        "2022-01-01"
+    ), "Expected earlier prices to be added"
+
+
+def _set_stock_date(monkeypatch, stock_date):
+    """Set the most recent stock date of the store."""
+    monkeypatch.setattr(
+        store, "most_recent_stock_date", lambda: pd.Timestamp(stock_date).date()
+    )
+
+
+def test_price_store_update(tmp_path, monkeypatch):
+    """Checks the price store only downloads the new trading days."""
+    downloads = []
+    source = {"history": offline_history[offline_history["date"] <= "2023-10-20"]}
+    monkeypatch.setattr(
+        store.Yahoo, "stock_history", _fake_stock_history(downloads, source)
+    )
+    _set_stock_date(monkeypatch, "2023-10-20")
+    tickers = ["AMD", "IVV"]
+
+    price_store = store.PriceStore(path=tmp_path)
+    price_store.stock_history(tickers=tickers, min_year=2022)
+    assert not price_store._is_outdated(
+        "AMD", pd.Timestamp("2023-10-20")
+    ), "Expected the ticker to be current"
+    assert price_store._is_outdated(
+        "AMD", pd.Timestamp("2023-10-27")
+    ), "Expected the ticker to be missing the new trading days"
+    close = pd.Timestamp(price_store.manifest["AMD"]["close"])
+    price_store.manifest["AMD"]["updated"] = str(close - pd.Timedelta(hours=1))
+    assert price_store._is_outdated(
+        "AMD", pd.Timestamp("2023-10-20")
+    ), "Expected intraday prices to be downloaded again"
+
+    # new trading days are downloaded from the check date
+    source["history"] = offline_history
+    _set_stock_date(monkeypatch, "2023-10-27")
+    price_history = price_store.stock_history(tickers=tickers, min_year=2022)
+    assert len(downloads) == 2, "Expected a single download of the new trading days"
+    assert downloads[-1][1] == pd.Timestamp("2023-10-19"), "Expected an update"
+
+    test_history = offline_history[
+        (offline_history["ticker"].isin(tickers))
+        & (offline_history["date"] >= "2022-01-01")
+    ]
+    assert np.allclose(
+        price_history.sort_values(["ticker", "date"])["last_price"],
+        test_history.sort_values(["ticker", "date"])["last_price"],
+    ), "Expected the updated prices to match the full history"
+
+
+def test_price_store_consistent(tmp_path, monkeypatch):
+    """Checks the price store downloads again when adjusted prices change."""
+    downloads = []
+    source = {"history": offline_history[offline_history["date"] <= "2023-10-20"]}
+    monkeypatch.setattr(
+        store.Yahoo, "stock_history", _fake_stock_history(downloads, source)
+    )
+    _set_stock_date(monkeypatch, "2023-10-20")
+    price_store = store.PriceStore(path=tmp_path)
+    price_store.stock_history(tickers=["AMD"], min_year=2022)
+    stored = price_store._read("AMD")
+    check_date = price_store._check_date(stored)
+
+    new_rows = offline_history[
+        (offline_history["ticker"] == "AMD") & (offline_history["date"] >= check_date)
+    ].copy()
+    assert price_store._is_consistent(
+        stored, new_rows, check_date
+    ), "Expected the same prices to be consistent"
+    adjusted_rows = new_rows.assign(last_price=new_rows["last_price"] * 0.99)
+    assert not price_store._is_consistent(
+        stored, adjusted_rows, check_date
+    ), "Expected a changed adjusted price to be inconsistent"
+
+    # a new stock split downloads the full history again
+    split_history = offline_history.copy()
+    is_amd = split_history["ticker"] == "AMD"
+    split_history.loc[
+        is_amd & (split_history["date"] == "2023-10-23"), "stock_splits"
+    ] = 2
+    split_history.loc[
+        is_amd & (split_history["date"] < "2023-10-23"), "last_price"
+    ] /= 2
+    source["history"] = split_history
+    _set_stock_date(monkeypatch, "2023-10-27")
+    price_history = price_store.stock_history(tickers=["AMD"], min_year=2022)
+    assert len(downloads) == 3, "Expected an update and a full download"
+    assert downloads[-1][1] == pd.Timestamp("2022-01-01"), "Expected a full download"
+    test_history = split_history[is_amd & (split_history["date"] >= "2022-01-01")]
+    assert np.allclose(
+        price_history["last_price"], test_history.sort_values("date")["last_price"]
+    ), "Expected the stored prices to be adjusted for the split"
+
+
+def test_price_store_no_prices(tmp_path, monkeypatch):
+    """Checks the price store records downloads that have no prices."""
+    downloads = []
+    source = {"history": offline_history[offline_history["date"] <= "2023-10-20"]}
+    monkeypatch.setattr(
+        store.Yahoo, "stock_history", _fake_stock_history(downloads, source)
+    )
+    _set_stock_date(monkeypatch, "2023-10-20")
+    tickers = ["AMD", "IVV", "MISSING"]
+    price_store = store.PriceStore(path=tmp_path)
+    price_store.stock_history(tickers=tickers, min_year=2022)
+    price_store.stock_history(tickers=tickers, min_year=2022)
+    assert len(downloads) == 1, "Expected a ticker without prices to be stored"
+
+    # a ticker that is no longer traded keeps its stored prices
+    source["history"] = offline_history[offline_history["ticker"] != "IVV"]
+    _set_stock_date(monkeypatch, "2023-10-27")
+    price_history = price_store.stock_history(tickers=tickers, min_year=2022)
+    assert [download[1] for download in downloads[1:]] == [
+        pd.Timestamp("2023-10-19"),
+        pd.Timestamp("2022-01-01"),
+    ], "Expected an update and a download of the ticker without prices"
+    assert price_store.manifest["IVV"]["end"] == "2023-10-20", "Expected stored IVV"
+    assert (
+        price_history.loc[price_history["ticker"] == "IVV", "last_price"].notna().sum()
+        > 0
+    ), "Expected the stored prices of IVV"
+
+    price_store = store.PriceStore(path=tmp_path)
+    price_store.stock_history(tickers=tickers, min_year=2022)
+    assert len(downloads) == 3, "Expected no download when the store is current"
+
+
+def test_price_store_close(tmp_path, monkeypatch):
+    """Checks prices downloaded after the market close are not downloaded again."""
+    downloads = []
+    source = {"history": offline_history[offline_history["date"] <= "2023-10-20"]}
+    monkeypatch.setattr(
+        store.Yahoo, "stock_history", _fake_stock_history(downloads, source)
+    )
+    _set_stock_date(monkeypatch, "2023-10-20")
+    price_store = store.PriceStore(path=tmp_path)
+    price_store.stock_history(tickers=["AMD"], min_year=2022)
+    close = pd.Timestamp(price_store.manifest["AMD"]["close"])
+    test_close = (
+        pd.Timestamp("2023-10-20 16:00", tz="America/New_York")
+        .tz_convert(store.config_helper.LOCAL_TIMEZONE)
+        .tz_localize(None)
+    )
+    assert close == test_close, "Expected the market close of the end date"
+
+    # prices downloaded on the end date after the close are final
+    price_store.manifest["AMD"]["updated"] = str(close + pd.Timedelta(minutes=5))
+    price_store._save_manifest()
+    price_store = store.PriceStore(path=tmp_path)
+    price_store.stock_history(tickers=["AMD"], min_year=2022)
+    assert len(downloads) == 1, "Expected no download after the market close"
+
+    # prices downloaded before the close may be intraday
+    price_store.manifest["AMD"]["updated"] = str(close - pd.Timedelta(minutes=5))
+    price_store._save_manifest()
+    price_store = store.PriceStore(path=tmp_path)
+    price_store.stock_history(tickers=["AMD"], min_year=2022)
+    assert len(downloads) == 2, "Expected intraday prices to be downloaded again"